@@ -1,353 +1,523 @@
-from dataclasses import dataclass
-from enum import Enum
-from typing import Callable, Dict, List, Tuple
-from queue import PriorityQueue
+import sys
+import json
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from argparse import ArgumentParser, Namespace
 
+from grid import BLOCKED, CAPTAIN_MARVEL, EMPTY, HULK, N, PERCEPTION, SHIELD, THOR, Grid
+from open_list import OPEN_LISTS
+from protocol import Channel, Connection, TELEMETRY, serve
+from parent_tree import ParentTree
 
-N = 9  # size of the map (NxN)
-INF = N**3
 
+# policies for choosing the next cell to expand:
+#   fscore - the cell with the lowest f-score (ties are broken by the open list)
+#   travel - among cells with the lowest f-score the one closest to Thanos along expanded cells
+POLICIES = ("fscore", "travel")
 
-class Character(str, Enum):
-    """
-    Enum for characters that can be found on the map:
-        Hulk, Thor, Captain Marvel, Infinity Stone, Shield, and Perception Zone.
-    Note: EMPTY and PATH are technical entities.
-    """
-
-    HULK = "H"
-    INFINITY_STONE = "I"
-    THOR = "T"
-    CAPTAIN_MARVEL = "M"
-    SHIELD = "S"
-    PERCEPTION = "P"
-    EMPTY = "."
-    PATH = "*"
-
-    def __str__(self):
-        return self.value
-
-    def __repr__(self):
-        return self.value
-
-
-@dataclass(order=True, unsafe_hash=True)
-class Cell:
-    """
-    Dataclass that represents the coordinates (x, y) for a cell.
-    """
-
-    x: int
-    y: int
-
-    def __add__(self, other: "Cell") -> "Cell":
-        return Cell(self.x + other.x, self.y + other.y)
-
-    def manhattan(self, other: "Cell") -> int:
-        """Returns manhattan distance from current cell to `other`.
-
-        Args:
-            other (Cell): Another cell for calculating distance to.
-
-        Returns:
-            int: Manhattan distance to `other`.
-        """
-        return abs(self.x - other.x) + abs(self.y - other.y)
-
-
-def move_in_map(pos: Cell) -> bool:
-    """Checks whether `pos` is in the map.
-
-    Args:
-        pos (Cell): Cell that needs to be checked.
-
-    Returns:
-        bool: Whether `pos` is in the map.
-    """
-    return 0 <= pos.x < N and 0 <= pos.y < N
+# counters reported with `--stats` (see `protocol.TELEMETRY`)
+statistics: Dict[str, float] = dict.fromkeys((key for key in TELEMETRY if key != "pruned"), 0)
 
 
-def can_move(map_: List[List[Character]], pos: Cell) -> bool:
+def can_move(grid: Grid, pos: int) -> bool:
     """Returns whether one can move into `pos`.
 
     Args:
-        map_ (List[List[Entity]]): Map.
-        pos (Cell): Cell that one wants to move into.
+        grid (Grid): Map.
+        pos (int): Index of the cell that one wants to move into.
 
     Returns:
         bool: Whether one can move into `pos`.
     """
     # we can move into a cell which does not contain obstacles
-    return map_[pos.x][pos.y] not in (Character.CAPTAIN_MARVEL, Character.HULK, Character.THOR, Character.PERCEPTION)
+    return not BLOCKED[grid.cells[pos]]
 
 
-def ask_to_move(map_: List[List[Character]], pos: Cell, variant: int, with_shield: bool) -> None:
-    """Ask the interactor to move into `pos` and gather information about surroundings.
+def put_surroundings(grid: Grid, reported: List[Tuple[int, int]], variant: int, with_shield: bool) -> None:
+    """Puts the surroundings reported by the interactor after one move onto the map.
 
     Args:
-        map_ (List[List[Entity]]): Map.
-        pos (Cell): Cell that one wants to move into.
+        grid (Grid): Map.
+        reported (List[Tuple[int, int]]): Index and code of every reported cell.
         variant (int): Thanos' perception variant.
         with_shield (bool): Whether we are with the Shield.
     """
-    print(f"m {pos.x} {pos.y}")
-    n = int(input())
-    for _ in range(n):
-        x_, y_, e_ = input().split()
-        x, y, e = int(x_), int(y_), Character(e_)
+    cells = grid.cells
+    for cell, e in reported:
         # if we put the character the first time
-        if map_[x][y] == Character.EMPTY:
+        if cells[cell] == EMPTY:
             # for variant 1 we can be sure only for Hulk
             if variant == 1:
                 if not with_shield:
-                    if e == Character.HULK:
-                        build_hulk_perception(map_, Cell(x, y))
+                    if e == HULK:
+                        build_perception(grid, grid.hulk_zone[cell])
             elif variant == 2:
                 # for variant 2 we are sure about everyone
-                if e == Character.CAPTAIN_MARVEL:
-                    build_marvel_perception(map_, Cell(x, y))
+                if e == CAPTAIN_MARVEL:
+                    build_perception(grid, grid.marvel_zone[cell])
                 if not with_shield:
-                    if e == Character.HULK:
-                        build_hulk_perception(map_, Cell(x, y))
-                    elif e == Character.THOR:
-                        build_thor_perception(map_, Cell(x, y))
-            map_[x][y] = e
+                    if e == HULK:
+                        build_perception(grid, grid.hulk_zone[cell])
+                    elif e == THOR:
+                        build_perception(grid, grid.thor_zone[cell])
+            cells[cell] = e
 
 
-def build_thor_perception(map_: List[List[Character]], center: Cell) -> None:
-    """Put Thor's perception zones onto the map.
+def build_perception(grid: Grid, zone: Tuple[int, ...]) -> None:
+    """Put perception zone of an Avenger onto the map.
 
     Args:
-        map_ (List[List[Character]]): Map itself.
-        center (Cell): Cell with Thor.
+        grid (Grid): Map itself.
+        zone (Tuple[int, ...]): Precomputed perception zone (e.g. `grid.thor_zone[center]`).
     """
-    for direction in (
-        Cell(1, 0),
-        Cell(1, 1),
-        Cell(0, 1),
-        Cell(-1, 1),
-        Cell(-1, 0),
-        Cell(-1, -1),
-        Cell(0, -1),
-        Cell(1, -1),
-    ):
-        cell = center + direction
-        if move_in_map(cell) and map_[cell.x][cell.y] == Character.EMPTY:
-            map_[cell.x][cell.y] = Character.PERCEPTION
+    cells = grid.cells
+    for cell in zone:
+        if cells[cell] == EMPTY:
+            cells[cell] = PERCEPTION
 
 
-def build_hulk_perception(map_: List[List[Character]], center: Cell) -> None:
-    """Put Hulk's perception zones onto the map.
+def heuristics(grid: Grid, start: int, goal: int) -> int:
+    """Heuristics function for A*. Returns manhattan distance between `start` and `goal`.
 
     Args:
-        map_ (List[List[Character]]): Map itself.
-        center (Cell): Cell with Hulk.
+        grid (Grid): Map.
+        start (int): Index of the start cell.
+        goal (int): Index of the goal cell.
+
+    Returns:
+        int: Manhattan distance between `start` and `goal`.
     """
-    for direction in (
-        Cell(1, 0),
-        Cell(0, 1),
-        Cell(-1, 0),
-        Cell(0, -1),
-    ):
-        cell = center + direction
-        if move_in_map(cell) and map_[cell.x][cell.y] == Character.EMPTY:
-            map_[cell.x][cell.y] = Character.PERCEPTION
+    return grid.manhattan(start, goal)
+
+
+def pop_nearest(
+    open_set,
+    f: int,
+    current: int,
+    previous: int,
+    tree: ParentTree,
+    parent: List[int],
+    closed: bytearray,
+    f_score: List[int],
+) -> int:
+    """Chooses among the cells with the lowest f-score the one that is the closest to Thanos.
+    Other cells are returned to the open list.
 
+    Args:
+        open_set: Open list (`current` is already popped from it).
+        f (int): The lowest f-score.
+        current (int): Index of the popped cell with f-score `f`.
+        previous (int): Index of the cell Thanos is standing in.
+        tree (ParentTree): Tree of expanded cells.
+        parent (List[int]): Parent of every cell.
+        closed (bytearray): Whether every cell was already expanded.
+        f_score (List[int]): F-score of every cell.
 
-def build_marvel_perception(map_: List[List[Character]], center: Cell) -> None:
-    """Put Captain Marvel's perception zones onto the map.
+    Returns:
+        int: Index of the cell to expand.
+    """
+    ties = [current]
+    while open_set and open_set.peek() == f:
+        cell = open_set.pop()[1]
+        statistics["pops"] += 1
+        # skip outdated entries
+        if not closed[cell] and f_score[cell] == f and cell not in ties:
+            ties.append(cell)
+        else:
+            statistics["stale_pops"] += 1
+    if len(ties) == 1:
+        return current
+    # the parent of every cell in the open list is expanded, so the travel goes along the tree
+    nearest = min(ties, key=lambda cell: tree.distance(previous, parent[cell]))
+    for cell in ties:
+        if cell != nearest:
+            open_set.push(f, cell)
+    statistics["pushes"] += len(ties) - 1
+    return nearest
+
+
+class AStar:
+    """
+    Incremental A* that keeps its search state between queries.
+    Based on pseudocode from https://en.wikipedia.org/wiki/A*_search_algorithm
 
-    Args:
-        map_ (List[List[Character]]): Map itself.
-        center (Cell): Cell with Captain Marvel.
+    Queries from the same start reuse expanded cells (their g-scores do not depend on the goal),
+    so only cells in the open list are re-keyed for a new goal.
+    A cell is expanded without moving Thanos there when all of its neighbours are already known,
+    so knowledge of the map gathered by earlier queries is not explored again.
+    Newly revealed obstacles can not invalidate expanded cells: they are only expanded from known neighbours.
     """
-    for direction in (
-        Cell(1, 0),
-        Cell(1, 1),
-        Cell(0, 1),
-        Cell(-1, 1),
-        Cell(-1, 0),
-        Cell(-1, -1),
-        Cell(0, -1),
-        Cell(1, -1),
-        Cell(2, 0),
-        Cell(0, 2),
-        Cell(-2, 0),
-        Cell(0, -2),
+
+    def __init__(
+        self,
+        grid: Grid,
+        start: int,
+        variant_number: int,
+        h: Callable[[Grid, int, int], int] = heuristics,
+        open_list: str = "bucket",
+        policy: str = "fscore",
+        connection: Optional[Channel] = None,
     ):
-        cell = center + direction
-        if move_in_map(cell) and map_[cell.x][cell.y] == Character.EMPTY:
-            map_[cell.x][cell.y] = Character.PERCEPTION
+        """
+        Args:
+            grid (Grid): Map (knowledge of Thanos).
+            start (int): Index of the start cell (Thanos is standing there).
+            variant_number (int): Thanos' vision variant.
+            h (Callable[[Grid, int, int], int]): Function for heuristics.
+            open_list (str): Name of the open list implementation (see `OPEN_LISTS`).
+            policy (str): How to choose the next cell to expand (see `POLICIES`).
+            connection (Optional[Channel]): Interactor (the standard streams by default).
+        """
+        self.grid = grid
+        self.connection = connection if connection is not None else Connection(grid.n)
+        self.variant_number = variant_number
+        self.h = h
+        self.open_list = open_list
+        self.policy = policy
+        self.with_shield = False
+        # observed[i] is 1 if the content of cell `i` was seen by Thanos
+        self.observed = bytearray(grid.n * grid.n)
+        # cell Thanos is standing in
+        self.position = start
+        self.reset(start)
+        self.move(start)
+
+    def reset(self, start: int) -> None:
+        """Drops the search state and starts a new search tree from `start`.
 
+        Args:
+            start (int): Index of the new start cell.
+        """
+        size = self.grid.n * self.grid.n
+        inf = self.grid.n**3
+        self.start = start
+        self.goal = -1
 
-def heuristics(start: Cell, goal: Cell) -> int:
-    """Heuristics function for A*. Returns manhattan distance between `start` and `goal`.
+        # set of discovered cells that may need to be expanded
+        self.open_set = OPEN_LISTS[self.open_list]()
+        self.open_set.push(0, start)
+        statistics["pushes"] += 1
 
-    Args:
-        start (Cell): Start cell.
-        goal (Cell): Goal cell.
+        # closed[i] is 1 if cell `i` was already expanded
+        self.closed = bytearray(size)
 
-    Returns:
-        int: Manhattan distance between `start` and `goal`.
-    """
-    return start.manhattan(goal)
+        # parent list (stores the closest parent)
+        self.parent: List[int] = [-1] * size
 
+        # g_score[i] is the shortest distance from `start` to cell `i`
+        self.g_score: List[int] = [inf] * size
+        self.g_score[start] = 0
 
-def path_from_parents(parent: Dict[Cell, Cell], current: Cell) -> List[Cell]:
-    """Reconstructs the path based on `parent` dictionary and the `goal` cell.
+        # f_score[i] is the guess for the shortest distance from `start` to `goal` through cell `i`
+        self.f_score: List[int] = [0] * size
 
-    Args:
-        parent (Dict[Cell, Cell]): Parent dictionary.
-        current (Cell): `goal` cell.
+        # tree of expanded cells (their parents and g-scores are final)
+        self.tree = ParentTree(size, start)
 
-    Returns:
-        List[Cell]: Path from `start` to `goal`.
-    """
-    total_path: List[Cell] = [current]
-    while current in parent.keys():
-        current = parent[current]
-        total_path = [current] + total_path
-    return total_path
-
-
-def a_star(
-    map_: List[List[Character]],
-    start: Cell,
-    goal: Cell,
-    h: Callable[[Cell, Cell], int],
-    grab_shield: bool,
-    go_to_start_after_finish: bool,
-    variant_number: int,
-) -> List[Cell]:
-    """A* search algorithm implementation.
-    Based on pseudocode from https://en.wikipedia.org/wiki/A*_search_algorithm
+    def move(self, cell: int) -> None:
+        """Moves Thanos into an adjacent `cell` and remembers what he sees there.
 
-    Args:
-        map_ (List[List[Entity]]): Map.
-        start (Cell): Start cell.
-        goal (Cell): Goal cell.
-        h (Callable[[Cell, Cell], int]): Function for heuristics.
-        grab_shield (bool): Whether to grab the shield.
-        go_to_start_after_finish (bool): Whether to go back to the start after finishing.
-        variant_number (int): Thanos' vision variant.
+        Args:
+            cell (int): Index of the cell.
+        """
+        self.walk([cell])
 
-    Returns:
-        List[Cell]: Shortest path from `start` to `goal` (empty list if not found)
-    """
-    # set of discovered cells that may need to be (re-)expanded
-    open_set: PriorityQueue[Tuple[int, Cell]] = PriorityQueue()
-    open_set.put((0, start))
-
-    # parent dictionary (stores the closest parent)
-    parent: Dict[Cell, Cell] = {}
-
-    # g_score[x][y] is the shortest distance from `start` to `Cell(x, y)`
-    g_score: Dict[Cell, int] = {}
-    g_score[start] = 0
-
-    # f_score[x][y] is the guess for the shortest distance from `start` to `goal` through `Cell(x, y)`
-    f_score: Dict[Cell, int] = {}
-    f_score[start] = h(start, goal)
-
-    # previous visited cell
-    previous = start
-    while not open_set.empty():
-        # get the cell with the lowest f_score
-        current: Cell = open_set.get()[1]
-
-        # move the interactor from the previous cell to the current one to prevent teleportation
-        if current.manhattan(previous) != 1:
-            # move through cells from `previous` to `start`
-            for cell in path_from_parents(parent, previous)[::-1]:
-                ask_to_move(map_, cell, variant_number, grab_shield)
-            # move through cells from `start` to preceding of current
-            for cell in path_from_parents(parent, current)[1:]:
-                ask_to_move(map_, cell, variant_number, grab_shield)
-        # move to the current cell
-        ask_to_move(map_, current, variant_number, grab_shield)
-
-        # when we reach the destination we can reconstruct the path
-        if current == goal:
-            if go_to_start_after_finish:
-                for cell in path_from_parents(parent, current)[::-1]:
-                    ask_to_move(map_, cell, variant_number, grab_shield)
-            return path_from_parents(parent, current)
-
-        previous = current
-
-        # check the neighbors
-        for direction in Cell(1, 0), Cell(0, 1), Cell(-1, 0), Cell(0, -1):
-            neighbor = current + direction
-            # check that we can move there and not meet enemies
-            if not move_in_map(neighbor):
-                continue
-            if not can_move(map_, neighbor):
-                continue
-            if map_[neighbor.x][neighbor.y] == Character.SHIELD and not grab_shield:
-                continue
+    def walk(self, path: List[int]) -> None:
+        """Moves Thanos along `path` with a single request to the interactor.
+        The last move explores a cell, the others go through the expanded cells.
+
+        Args:
+            path (List[int]): Indices of the cells to move into one after another (each is adjacent to the previous).
+        """
+        if self.with_shield:
+            statistics["moves_shield"] += len(path)
+        else:
+            statistics["moves_back"] += len(path) - 1
+            statistics["moves_explore"] += 1
+        self.connection.send_moves(path)
+        for cell in path:
+            self.arrive(cell)
+
+    def arrive(self, cell: int) -> None:
+        """Remembers what Thanos sees after the requested move into `cell`.
+
+        Args:
+            cell (int): Index of the cell.
+        """
+        put_surroundings(self.grid, self.connection.receive(), self.variant_number, self.with_shield)
+        for seen in self.grid.vision[self.variant_number][cell]:
+            self.observed[seen] = 1
+        self.position = cell
+
+    def route(self, cell: int) -> List[int]:
+        """Returns the moves into `cell` whose parent is expanded along the expanded cells.
 
-            # distance from `start` to the `neighbor` through `current`
-            g_score_neighbor = g_score.get(current, INF) + 1
-            # if we found a shorter path
-            if g_score_neighbor < g_score.get(neighbor, INF):
-                # update the parent
-                parent[neighbor] = current
-                # update the `g_score`
-                g_score[neighbor] = g_score_neighbor
-                # update the `f_score`
-                f_score[neighbor] = g_score_neighbor + h(neighbor, goal)
-                # add the neighbor for future exploration
-                open_set.put((f_score[neighbor], neighbor))
+        Args:
+            cell (int): Index of the cell.
+
+        Returns:
+            List[int]: Cells to move into one after another (ending with `cell`).
+        """
+        if self.grid.manhattan(cell, self.position) == 1:
+            return [cell]
+        # move through expanded cells from the current position to the parent of `cell`
+        # via their nearest common ancestor
+        return self.tree.path(self.position, self.parent[cell]) + [cell]
+
+    def walk_to(self, cell: int) -> None:
+        """Moves Thanos into `cell` whose parent is expanded along the expanded cells.
+        The route goes through known cells, so it is sent to the interactor as a whole.
+
+        Args:
+            cell (int): Index of the cell.
+        """
+        if cell != self.position:
+            self.walk(self.route(cell))
+
+    def known(self, cell: int) -> bool:
+        """Returns whether the content of `cell` is known (seen or inferred from perception zones)."""
+        return bool(self.observed[cell]) or self.grid.cells[cell] != EMPTY
+
+    def pick_up_shield(self, shield: int) -> None:
+        """Walks into the shield and restarts the search from there.
+        Perception zones of all the Avengers but Captain Marvel disappear, so they become unknown.
+
+        Args:
+            shield (int): Index of the cell with the shield (its g-score should be known).
+        """
+        cells = self.grid.cells
+        route = self.route(shield)
+        statistics["moves_shield"] += len(route)
+        self.connection.send_moves(route)
+        for step in route[:-1]:
+            self.arrive(step)
+        for cell in range(len(cells)):
+            if cells[cell] == PERCEPTION:
+                cells[cell] = EMPTY
+                self.observed[cell] = 0
+        self.with_shield = True
+        # for variant 2 we are sure about Captain Marvel's perception zone
+        if self.variant_number == 2:
+            captain_marvel = cells.find(CAPTAIN_MARVEL)
+            while captain_marvel != -1:
+                build_perception(self.grid, self.grid.marvel_zone[captain_marvel])
+                captain_marvel = cells.find(CAPTAIN_MARVEL, captain_marvel + 1)
+        # the interactor picks up the shield before reporting the surroundings of the last move
+        self.arrive(shield)
+        self.reset(shield)
+
+    def retarget(self, goal: int) -> None:
+        """Changes the goal and re-keys the cells in the open list.
 
-    # path from `start` to `goal` does not exist
-    if go_to_start_after_finish:
-        for cell in path_from_parents(parent, previous)[::-1]:
-            ask_to_move(map_, cell, variant_number, grab_shield)
+        Args:
+            goal (int): Index of the new goal cell.
+        """
+        grid, h = self.grid, self.h
+        self.goal = goal
+        cells: List[int] = []
+        while self.open_set:
+            f, cell = self.open_set.pop()
+            statistics["pops"] += 1
+            if not self.closed[cell] and f == self.f_score[cell] and cell not in cells:
+                cells.append(cell)
+            else:
+                statistics["stale_pops"] += 1
+        # the goal may be not reachable by usual expansions (e.g. the shield), so relax it from expanded cells
+        if not self.closed[goal]:
+            for neighbor in grid.neighbours[goal]:
+                if self.closed[neighbor] and self.g_score[neighbor] + 1 < self.g_score[goal]:
+                    self.parent[goal] = neighbor
+                    self.g_score[goal] = self.g_score[neighbor] + 1
+            if self.g_score[goal] < grid.n**3 and goal not in cells:
+                cells.append(goal)
+        for cell in cells:
+            self.f_score[cell] = self.g_score[cell] + h(grid, cell, goal)
+            self.open_set.push(self.f_score[cell], cell)
+        statistics["pushes"] += len(cells)
+
+    def search(self, goal: int, limit: int) -> int:
+        """Finds the shortest distance from the start to `goal` if it is less than `limit`.
 
-    return []
+        Args:
+            goal (int): Index of the goal cell.
+            limit (int): Distances not less than `limit` are not interesting.
 
+        Returns:
+            int: Shortest distance from the start to `goal` (-1 if not found or not less than `limit`).
+        """
+        grid = self.grid
+        cells = grid.cells
+        neighbours = grid.neighbours
+        closed, parent, g_score, f_score = self.closed, self.parent, self.g_score, self.f_score
+        open_set = self.open_set
+
+        if goal != self.goal:
+            self.retarget(goal)
+        if closed[goal]:
+            return g_score[goal] if g_score[goal] < limit else -1
+
+        while open_set:
+            # get the cell with the lowest f_score
+            f, current = open_set.pop()
+            statistics["pops"] += 1
+            # skip outdated entries before moving there:
+            # the cell was already expanded or a better path to it was found after the push
+            if closed[current] or f > f_score[current]:
+                statistics["stale_pops"] += 1
+                continue
+            if f >= limit:
+                # return the cell so the search can be continued with another limit
+                open_set.push(f, current)
+                statistics["pushes"] += 1
+                return -1
+            if self.policy == "travel" and current != self.start:
+                current = pop_nearest(open_set, f, current, self.position, self.tree, parent, closed, f_score)
+
+            # the goal is not expanded, so the search can be continued for another goal
+            if current == goal:
+                open_set.push(f, current)
+                statistics["pushes"] += 1
+                return g_score[current]
+
+            closed[current] = 1
+            statistics["expanded"] += 1
+            if current != self.start:
+                self.tree.add(current, parent[current])
+
+            # move Thanos to the current cell only if he does not know what is around it
+            if not all(self.known(neighbor) for neighbor in neighbours[current]):
+                self.walk_to(current)
+
+            # check the neighbors
+            g_score_neighbor = g_score[current] + 1
+            for neighbor in neighbours[current]:
+                # check that we can move there and not meet enemies
+                if closed[neighbor]:
+                    continue
+                if not can_move(grid, neighbor):
+                    continue
+                if cells[neighbor] == SHIELD and not self.with_shield and neighbor != goal:
+                    continue
+
+                # if we found a shorter path through `current`
+                if g_score_neighbor < g_score[neighbor]:
+                    # update the parent
+                    parent[neighbor] = current
+                    # update the `g_score`
+                    g_score[neighbor] = g_score_neighbor
+                    # update the `f_score`
+                    f_score[neighbor] = g_score_neighbor + self.h(grid, neighbor, goal)
+                    # add the neighbor for future exploration
+                    open_set.push(f_score[neighbor], neighbor)
+                    statistics["pushes"] += 1
+
+        # path from the start to `goal` does not exist
+        return -1
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--size",
+        dest="n",
+        type=int,
+        help="Size of the map (NxN) for a single test (in a session it is given by the interactor)",
+        default=N,
+    )
+    parser.add_argument(
+        "-ol",
+        "--open-list",
+        type=str,
+        choices=sorted(OPEN_LISTS),
+        help="Open list implementation to use in A*",
+        default="bucket",
+    )
+    parser.add_argument(
+        "-p",
+        "--policy",
+        type=str,
+        choices=POLICIES,
+        help="How to choose the next cell to expand in A*",
+        default="fscore",
+    )
+    parser.add_argument(
+        "-st",
+        "--stats",
+        action="store_true",
+        help="Whether to print search statistics as JSON to stderr at exit",
+    )
+    return parser.parse_args()
+
+
+def main(
+    n: int = N,
+    open_list: str = "bucket",
+    policy: str = "fscore",
+    stats: bool = False,
+    connection: Optional[Channel] = None,
+):
+    """Main function of the solution.
+
+    Args:
+        n (int): Size of the map (NxN).
+        open_list (str): Name of the open list implementation (see `OPEN_LISTS`).
+        policy (str): How to choose the next cell to expand (see `POLICIES`).
+        stats (bool): Whether to print search statistics as JSON to stderr at exit.
+        connection (Optional[Channel]): Interactor (the standard streams by default).
+    """
+    grid = Grid(n)
+    if connection is None:
+        connection = Connection(n)
+    statistics.update(dict.fromkeys(statistics, 0))
+    start_time = time.perf_counter()
+    shield_time: Optional[float] = None
+    # bytes exchanged before this test (a session goes on over the same connection)
+    sent, received = (connection.sent, connection.received) if isinstance(connection, Connection) else (0, 0)
 
-def main():
-    """Main function of the solution."""
-    map_: List[List[Character]] = [[Character.EMPTY for _ in range(N)] for _ in range(N)]
+    variant_number, goal = connection.read_task()
+    start = grid.index(0, 0)
+    no_path = n**3
 
-    variant_number = int(input())
-    x, y = map(int, input().split())
-    goal = Cell(x, y)
-    start = Cell(0, 0)
+    planner = AStar(grid, start, variant_number, heuristics, open_list, policy, connection)
 
-    # find the shortest path from the start to the goal without grabbing the shield
-    min_path = a_star(map_, start, goal, heuristics, False, True, variant_number)
+    # find the shortest distance from the start to the goal without grabbing the shield
+    min_dist = planner.search(goal, no_path)
 
     # find shield if it was spotted
-    shield = Cell(-1, -1)
-    for i in range(N):
-        for j in range(N):
-            if map_[i][j] == Character.SHIELD:
-                shield = Cell(i, j)
+    shield = grid.find(SHIELD)
 
     # if the shield was spotted
-    if shield != Cell(-1, -1):
-        # find the shortest path from the start to the shield
-        min_path_to_shield = a_star(map_, start, shield, heuristics, True, False, variant_number)
-        if min_path_to_shield:
-            # remove perception zones from the map
+    if shield != -1:
+        limit = min_dist if min_dist != -1 else no_path
+        # find the shortest distance from the start to the shield continuing the same search
+        # (it is worth only if the path through the shield can be shorter)
+        dist_to_shield = planner.search(shield, limit - grid.manhattan(shield, goal))
+        if dist_to_shield != -1:
+            shield_time = time.perf_counter()
+            statistics["time_search"] = shield_time - start_time
+            # perception zones change, so the search starts from the shield
             # (ones for Captain Marvel will reappear during further exploration)
-            for i in range(N):
-                for j in range(N):
-                    if map_[i][j] == Character.PERCEPTION:
-                        map_[i][j] = Character.EMPTY
-            # find the shortest path from the shield to the goal
-            min_path_from_shield = a_star(map_, shield, goal, heuristics, True, False, variant_number)
-            if min_path_from_shield:
-                # update the shortest path if neccessary
-                min_path_with_shield = min_path_to_shield[:-1] + min_path_from_shield
-                if not min_path or len(min_path_with_shield) < len(min_path):
-                    min_path = min_path_with_shield
+            planner.pick_up_shield(shield)
+            # find the shortest distance from the shield to the goal
+            dist_from_shield = planner.search(goal, limit - dist_to_shield)
+            if dist_from_shield != -1:
+                # the limit guarantees that the path through the shield is shorter
+                min_dist = dist_to_shield + dist_from_shield
     # print the length of the shortest path from `start` to `goal`
-    # note: if path_to_goal is empty, then -1 will be printed
-    print(f"e {len(min_path) - 1}")
+    # note: if the path does not exist, then -1 will be printed
+    connection.answer(min_dist)
+    if shield_time is None:
+        statistics["time_search"] = time.perf_counter() - start_time
+    else:
+        statistics["time_shield"] = time.perf_counter() - shield_time
+    if isinstance(connection, Connection):
+        statistics["bytes_sent"] = connection.sent - sent
+        statistics["bytes_received"] = connection.received - received
+    if stats:
+        print(json.dumps(statistics), file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    serve(args.n, lambda n, connection: main(n, args.open_list, args.policy, args.stats, connection))
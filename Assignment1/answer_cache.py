@@ -0,0 +1,143 @@
+import os
+import struct
+import hashlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from corpus import UNKNOWN, load_test
+from oracle import incorrect_maps, shortest_paths
+from oracle_table import TABLE_N, TABLE_PATH, open_table
+
+
+# persistent cache shared by all the tools (next to the scripts)
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "answers.cache")
+# a record of the cache file: the key of the map and its answer
+RECORD = struct.Struct("<16si")
+# number of maps solved at once by the oracle
+BATCH_SIZE = 1024
+
+
+def map_key(n: int, cells: bytes) -> bytes:
+    """Returns the key of the map: a hash of its size and the codes of its cells.
+    The codes do not depend on how the map is written, so the same map in a text test and in a corpus has the same key.
+
+    Args:
+        n (int): Size of the map.
+        cells (bytes): Codes of the cells.
+
+    Returns:
+        bytes: 16 bytes of the hash.
+    """
+    return hashlib.blake2b(struct.pack("<H", n) + cells, digest_size=16).digest()
+
+
+class AnswerCache:
+    """
+    Answers of the maps by their contents, persistent between the runs.
+    The file is a log of `RECORD`s, it is read into a dictionary once (O(1) lookups)
+    and new answers are appended to it by `flush`.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, table_path: str = TABLE_PATH):
+        """
+        Args:
+            path (str): Path to the cache file (created on the first `flush`).
+            table_path (str): Path to the oracle table of 9x9 maps (used for the misses if it is built).
+        """
+        self.path = path
+        self.table = open_table(table_path)
+        self.answers: Dict[bytes, int] = {}
+        if os.path.exists(path):
+            with open(path, "rb") as fp:
+                data = fp.read()
+            # a record cut by an interrupted write is skipped
+            data = data[: len(data) - len(data) % RECORD.size]
+            self.answers.update(RECORD.iter_unpack(data))
+        self._new: List[Tuple[bytes, int]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def __enter__(self) -> "AnswerCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        """Appends the new answers to the file."""
+        if not self._new:
+            return
+        with open(self.path, "ab") as fp:
+            fp.write(b"".join(RECORD.pack(key, answer) for key, answer in self._new))
+        self._new.clear()
+
+    def solve(self, n: int, maps: np.ndarray, batch_size: int = BATCH_SIZE) -> np.ndarray:
+        """Returns the answers of the maps, only the maps that are not in the cache are solved
+        (looked up in the oracle table if it covers them, by `oracle` otherwise).
+
+        Args:
+            n (int): Size of the maps.
+            maps (np.ndarray): Codes of the cells of shape (maps, n * n).
+            batch_size (int): Number of maps solved at once.
+
+        Returns:
+            np.ndarray: Answer of every map (int64), `corpus.UNKNOWN` for maps without the shield or the stone.
+        """
+        keys = [map_key(n, cells.tobytes()) for cells in maps]
+        answers = np.array([self.answers.get(key, UNKNOWN) for key in keys], dtype=np.int64)
+        missing = np.flatnonzero(answers == UNKNOWN)
+        self.hits += len(maps) - len(missing)
+        self.misses += len(missing)
+
+        unknown = maps[missing]
+        correct = np.ones(len(missing), dtype=bool)
+        correct[incorrect_maps(unknown)] = False
+        missing, unknown = missing[correct], unknown[correct]
+        for start in range(0, len(missing), batch_size):
+            batch = unknown[start : start + batch_size]
+            solved = (
+                self.table.lookup(batch) if self.table is not None and n == TABLE_N else np.full(len(batch), UNKNOWN)
+            )
+            uncovered = np.flatnonzero(solved == UNKNOWN)
+            if len(uncovered):
+                solved[uncovered] = shortest_paths(batch[uncovered], n)
+            answers[missing[start : start + batch_size]] = solved
+            for index, answer in zip(missing[start : start + batch_size].tolist(), solved.tolist()):
+                self.answers[keys[index]] = answer
+                self._new.append((keys[index], answer))
+        return answers
+
+    def solve_tests(self, tests: List[str], batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """Returns the answers of the tests (see `corpus.list_tests`), maps of the same size are solved together.
+
+        Args:
+            tests (List[str]): Paths to the tests.
+            batch_size (int): Number of maps solved at once.
+
+        Returns:
+            Dict[str, int]: Answer of every test, `corpus.UNKNOWN` for incorrect maps
+                (with an incorrect entity, not square, without the shield or without the stone).
+        """
+        answers: Dict[str, int] = {}
+        by_size: Dict[int, Tuple[List[str], List[bytes]]] = {}
+        for test in tests:
+            try:
+                n, cells = load_test(test)
+            except ValueError:
+                answers[test] = UNKNOWN
+                continue
+            names, maps = by_size.setdefault(n, ([], []))
+            names.append(test)
+            maps.append(cells)
+        for n, (names, maps) in by_size.items():
+            solved = self.solve(n, np.frombuffer(b"".join(maps), dtype=np.uint8).reshape(len(maps), n * n), batch_size)
+            answers.update(zip(names, solved.tolist()))
+        return answers
+
+    def status(self) -> str:
+        """Returns the line with the numbers of hits and misses."""
+        return f"[INFO] Answer cache: {self.hits} hits, {self.misses} misses ({len(self)} answers in {self.path})"
@@ -1,324 +1,578 @@
-from dataclasses import dataclass
-from enum import Enum
-from typing import List
+import sys
+import json
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from argparse import ArgumentParser, Namespace
 
+from grid import CAPTAIN_MARVEL, EMPTY, HULK, INFINITY_STONE, N, PERCEPTION, SHIELD, THOR, Grid
+from protocol import Channel, Connection, TELEMETRY, serve
 
-N = 9  # size of the map (NxN)
 
+# lower bounds of the remaining distance to the goal (see `BacktrackingSolver.lower_bound`)
+BOUNDS = ("none", "manhattan", "bfs")
 
-class Character(str, Enum):
-    """
-    Enum for characters that can be found on the map:
-        Hulk, Thor, Captain Marvel, Infinity Stone, Shield, and Perception Zone.
-    Note: EMPTY, and PATH are technical entities.
-    """
-
-    HULK = "H"
-    INFINITY_STONE = "I"
-    THOR = "T"
-    CAPTAIN_MARVEL = "M"
-    SHIELD = "S"
-    PERCEPTION = "P"
-    EMPTY = "."
-    PATH = "*"
-
-    def __str__(self):
-        return self.value
-
-    def __repr__(self):
-        return self.value
-
-
-@dataclass
-class Cell:
-    """
-    Dataclass that represents the coordinates (x, y) for a cell.
-    """
-
-    x: int
-    y: int
-
-    def __add__(self, other: "Cell") -> "Cell":
-        return Cell(self.x + other.x, self.y + other.y)
-
-    def manhattan(self, other: "Cell") -> int:
-        """Returns manhattan distance from current cell to `other`.
 
-        Args:
-            other (Cell): Another cell for calculating distance to.
-
-        Returns:
-            int: Manhattan distance to `other`.
-        """
-        return abs(self.x - other.x) + abs(self.y - other.y)
-
-
-def move_in_map(pos: Cell) -> bool:
-    """Checks whether `pos` is in the map.
-
-    Args:
-        pos (Cell): Cell that needs to be checked.
-
-    Returns:
-        bool: Whether `pos` is in the map.
-    """
-    return 0 <= pos.x < N and 0 <= pos.y < N
-
-
-def move_is_empty(map_: List[List[Character]], pos: Cell) -> bool:
+def move_is_empty(grid: Grid, pos: int) -> bool:
     """Checks whether one can move into `pos`.
 
     Args:
-        map_ (List[List[Entity]]): Map.
-        pos (Cell): Cell that one wants to move into.
+        grid (Grid): Map.
+        pos (int): Index of the cell that one wants to move into.
 
     Returns:
         bool: Whether one can move into `pos`.
     """
     # we can move into a cell which does not contain obstacles
-    return map_[pos.x][pos.y] in (Character.EMPTY, Character.INFINITY_STONE)
+    return grid.cells[pos] in (EMPTY, INFINITY_STONE)
 
 
-def ask_to_move(map_: List[List[Character]], pos: Cell, variant: int, with_shield: bool) -> None:
-    """Ask the interactor to move into `pos` and gather information about surroundings.
+def build_perception(grid: Grid, zone: Tuple[int, ...]) -> None:
+    """Put perception zone of an Avenger onto the map.
 
     Args:
-        map_ (List[List[Entity]]): Map.
-        pos (Cell): Cell that one wants to move into.
-        variant (int): Thanos' perception variant.
-        with_shield (bool): Whether we are with the Shield.
+        grid (Grid): Map itself.
+        zone (Tuple[int, ...]): Precomputed perception zone (e.g. `grid.thor_zone[center]`).
     """
-    print(f"m {pos.x} {pos.y}")
-    n = int(input())
-    for _ in range(n):
-        x_, y_, e_ = input().split()
-        x, y, e = int(x_), int(y_), Character(e_)
-        # if we put the character the first time
-        if map_[x][y] == Character.EMPTY:
-            # for variant 1 we can be sure only for Hulk
-            if variant == 1:
-                if not with_shield:
-                    if e == Character.HULK:
-                        build_hulk_perception(map_, Cell(x, y))
-            elif variant == 2:
-                # for variant 2 we are sure about everyone
-                if e == Character.CAPTAIN_MARVEL:
-                    build_marvel_perception(map_, Cell(x, y))
-                if not with_shield:
-                    if e == Character.HULK:
-                        build_hulk_perception(map_, Cell(x, y))
-                    elif e == Character.THOR:
-                        build_thor_perception(map_, Cell(x, y))
-            map_[x][y] = e
-
-
-def get_accessible_neighbours(pos: Cell) -> List[Cell]:
-    """Get accessible neighbours of `pos`.
+    cells = grid.cells
+    for cell in zone:
+        if cells[cell] == EMPTY:
+            cells[cell] = PERCEPTION
 
-    Args:
-        pos (Cell): Cell to use.
 
-    Returns:
-        List[Cell]: Neighbours of `pos`.
+class BacktrackingSolver:
+    """
+    Backtracking search for the shortest path that can solve many tests in the same process.
+    The buffers are allocated once for the size of the map. Visited cells and known distances are marked
+    with the number of the current search (generation), so a new search increments the generation
+    instead of clearing them.
+    A branch is cut when its length plus a lower bound of the remaining distance can not beat the best path.
+    The known distances are kept per cell: the searches before and after the shield is picked up
+    are of different generations, so they never share them.
+    The search is a loop over an explicit stack of frames, so its depth is not limited by the recursion limit.
+    Paths are nodes of a tree (a cell and the node of the previous cell), so the best paths are kept
+    as single nodes instead of copies of the current path.
+    With a time budget the search is anytime: when the budget runs out, the best path found so far is answered
+    as not proven to be the shortest.
     """
-    neighbours = []
-    # we can move in 4 directions
-    for direction in Cell(1, 0), Cell(0, 1), Cell(-1, 0), Cell(0, -1):
-        neighbour = pos + direction
-        if move_in_map(neighbour):
-            neighbours.append(neighbour)
-    # wishing a great day to whom ever is checking this work right now :)
-    return neighbours
 
+    def __init__(self, n: int = N, bound: str = "bfs", deepening: bool = False, budget: Optional[float] = None):
+        """
+        Args:
+            n (int): Size of the map (NxN).
+            bound (str): Lower bound of the remaining distance used to prune the search (see `BOUNDS`).
+            deepening (bool): Whether to search with iterative deepening on the bound.
+            budget (Optional[float]): Seconds given to every test (no limit by default).
+        """
+        self.n = n
+        self.bound = bound
+        self.deepening = deepening
+        self.budget = budget
+        # time (`time.perf_counter`) when the budget of the current test runs out (None without a budget)
+        self.deadline: Optional[float] = None
+        # whether the answer of the current test is proven to be the shortest (the search was not stopped)
+        self.proven = True
+        # length of a path that does not exist
+        self.no_path = n**3
+        # map (knowledge of Thanos)
+        self.grid = Grid(n)
+        self.empty = bytes(n * n)
+        # number of the current search
+        self.generation = 0
+        # visited[i] is the generation if cell i is on the current path
+        self.visited: List[int] = [0] * (n * n)
+        # distance[i] is the minimum distance from start to cell i if stamp[i] is the generation
+        self.distance: List[int] = [0] * (n * n)
+        self.stamp: List[int] = [0] * (n * n)
+        # seen[i] is 1 if cell i was seen by Thanos
+        self.seen = bytearray(n * n)
+        # lower bounds of the distance from every cell to the goal
+        self.bounds: List[int] = [0] * (n * n)
+        # whether the bounds have to be updated before they are used (a new test or the shield is picked up)
+        self.bounds_invalid = True
+        # whether obstacles were revealed since the last update: the bounds are still lower bounds then,
+        # only not the tightest ones, so they are updated once `n` cells are entered after the last update
+        # (the update searches the whole map)
+        self.bounds_outdated = False
+        self.bounds_age = 0
+        # depth limit of the current iteration of iterative deepening
+        # and the least bound that exceeded it (`no_path` if none did)
+        self.limit = self.no_path
+        self.exceeded = self.no_path
+        # whether Thanos is already in the start cell of the next iteration
+        self.returned = False
+        # goal the tables below are built for (-1 for none): only the current one is kept,
+        # since a solver in a session may meet as many goals as there are cells
+        self.goal = -1
+        # neighbours of every cell sorted by their distance to the goal
+        self.neighbours: List[Tuple[int, ...]] = []
+        # manhattan distances from every cell to the goal
+        self.to_goal: List[int] = []
+        # counters reported with `--stats` (see `protocol.TELEMETRY`, there is no open list to count)
+        self.statistics: Dict[str, float] = dict.fromkeys(
+            (key for key in TELEMETRY if key not in ("pushes", "pops", "stale_pops")), 0
+        )
+        # tree of the paths: node i is the cell node_cells[i] reached from node node_parents[i] (-1 for none)
+        self.node_cells: List[int] = []
+        self.node_parents: List[int] = []
+        # frames of the search: the cell on the current path, its node, and its neighbours that are not checked yet
+        self.frame_cells: List[int] = []
+        self.frame_nodes: List[int] = []
+        self.frame_neighbours: List[Iterator[int]] = []
+        # the last node and the number of cells of the minimum path from start to infinity stone (0 if none)
+        self.goal_node = -1
+        self.goal_length = 0
+        # the last node and the number of cells of the minimum path from start to shield (0 if none)
+        self.shield_node = -1
+        self.shield_length = 0
+        # moves back to already visited cells that are not sent to the interactor yet
+        # (they reveal nothing new, so they are sent together with the next move into a new cell)
+        self.pending_moves: List[int] = []
+        # interactor of the current test
+        self.channel: Optional[Channel] = None
+        self.variant_number = 1
+        self.with_shield = False
+
+    def reset(self) -> None:
+        """Starts a new search: every cell becomes not visited with an unknown distance."""
+        self.generation += 1
+
+    def ask_to_move(self, path: List[int], explore: int = 0) -> None:
+        """Ask the interactor to move along `path` and gather information about surroundings.
+        Several moves in a row are sent with a single request.
+
+        Args:
+            path (List[int]): Indices of the cells that one wants to move into one after another.
+            explore (int): Number of the last moves that enter cells of the search (the others go back).
+        """
+        grid = self.grid
+        cells = grid.cells
+        variant, with_shield = self.variant_number, self.with_shield
+        seen, vision = self.seen, grid.vision[variant]
+        # moves are asked only while a test is solved
+        channel = self.channel
+        assert channel is not None
+        if with_shield:
+            self.statistics["moves_shield"] += len(path)
+        else:
+            self.statistics["moves_back"] += len(path) - explore
+            self.statistics["moves_explore"] += explore
+        channel.send_moves(path)
+        # the surroundings are reported for every move in order
+        for pos in path:
+            for cell in vision[pos]:
+                seen[cell] = 1
+            for cell, e in channel.receive():
+                # if we put the character the first time
+                if cells[cell] == EMPTY:
+                    # new obstacles (or the shield) make the bounds greater
+                    self.bounds_outdated = True
+                    # for variant 1 we can be sure only for Hulk
+                    if variant == 1:
+                        if not with_shield:
+                            if e == HULK:
+                                build_perception(grid, grid.hulk_zone[cell])
+                    elif variant == 2:
+                        # for variant 2 we are sure about everyone
+                        if e == CAPTAIN_MARVEL:
+                            build_perception(grid, grid.marvel_zone[cell])
+                        if not with_shield:
+                            if e == HULK:
+                                build_perception(grid, grid.hulk_zone[cell])
+                            elif e == THOR:
+                                build_perception(grid, grid.thor_zone[cell])
+                    cells[cell] = e
+
+    def update_bounds(self, goal: int) -> None:
+        """Finds the lower bounds of the distance from every cell to the goal on the known map,
+        where the cells that were not seen are considered to be empty.
+        Without the shield a path through it may be shorter, so the bound is the least of the distance to the goal
+        and the distance to the shield (or to any cell not seen yet, if it is not found) plus
+        the manhattan distance from there to the goal.
 
-def build_thor_perception(map_: List[List[Character]], center: Cell) -> None:
-    """Put Thor's perception zones onto the map.
+        Args:
+            goal (int): Index of the goal cell.
+        """
+        grid, size = self.grid, self.n * self.n
+        cells, neighbours, to_goal = grid.cells, grid.neighbours, self.to_goal
+        # sources of the search with their initial distances
+        sources = [(goal, 0)]
+        if not self.with_shield:
+            shield = grid.find(SHIELD)
+            if shield != -1:
+                sources.append((shield, to_goal[shield]))
+            else:
+                seen = self.seen
+                sources.extend(
+                    (cell, to_goal[cell])
+                    for cell in range(size)
+                    if not seen[cell] and cells[cell] in (EMPTY, INFINITY_STONE)
+                )
+
+        # Dial's algorithm: buckets of cells by their distances
+        bounds = [self.no_path] * size
+        buckets: List[List[int]] = [[] for _ in range(2 * self.n + size)]
+        for cell, d in sources:
+            if d < bounds[cell]:
+                bounds[cell] = d
+                buckets[d].append(cell)
+        for d, bucket in enumerate(buckets):
+            for cell in bucket:
+                if bounds[cell] != d:
+                    continue
+                for neighbour in neighbours[cell]:
+                    if bounds[neighbour] <= d + 1:
+                        continue
+                    code = cells[neighbour]
+                    # the shield is not entered again, but the search with it starts there
+                    if code in (EMPTY, INFINITY_STONE, SHIELD):
+                        bounds[neighbour] = d + 1
+                        if code != SHIELD:
+                            buckets[d + 1].append(neighbour)
+        self.bounds = bounds
+        self.bounds_invalid = self.bounds_outdated = False
+        self.bounds_age = 0
+
+    def lower_bound(self, cell: int, goal: int) -> int:
+        """Returns a lower bound of the distance from `cell` to the goal (maybe through the shield).
 
-    Args:
-        map_ (List[List[Character]]): Map itself.
-        center (Cell): Cell with Thor.
-    """
-    for direction in (
-        Cell(1, 0),
-        Cell(1, 1),
-        Cell(0, 1),
-        Cell(-1, 1),
-        Cell(-1, 0),
-        Cell(-1, -1),
-        Cell(0, -1),
-        Cell(1, -1),
-    ):
-        cell = center + direction
-        if move_in_map(cell) and map_[cell.x][cell.y] == Character.EMPTY:
-            map_[cell.x][cell.y] = Character.PERCEPTION
-
-
-def build_hulk_perception(map_: List[List[Character]], center: Cell) -> None:
-    """Put Hulk's perception zones onto the map.
+        Args:
+            cell (int): Index of the cell.
+            goal (int): Index of the goal cell.
 
-    Args:
-        map_ (List[List[Character]]): Map itself.
-        center (Cell): Cell with Hulk.
-    """
-    for direction in (
-        Cell(1, 0),
-        Cell(0, 1),
-        Cell(-1, 0),
-        Cell(0, -1),
-    ):
-        cell = center + direction
-        if move_in_map(cell) and map_[cell.x][cell.y] == Character.EMPTY:
-            map_[cell.x][cell.y] = Character.PERCEPTION
+        Returns:
+            int: The bound (`no_path` if neither the goal nor the shield can be reached).
+        """
+        if self.bound == "manhattan":
+            return self.to_goal[cell]
+        if self.bound == "bfs":
+            if self.bounds_invalid or (self.bounds_outdated and self.bounds_age >= self.n):
+                self.update_bounds(goal)
+            return self.bounds[cell]
+        return 0
 
+    def send_pending_moves(self, explore: int = 0) -> None:
+        """Sends the pending moves to the interactor with a single request.
 
-def build_marvel_perception(map_: List[List[Character]], center: Cell) -> None:
-    """Put Captain Marvel's perception zones onto the map.
+        Args:
+            explore (int): Number of the last moves that enter cells of the search (the others go back).
+        """
+        if self.pending_moves:
+            self.ask_to_move(self.pending_moves, explore)
+            self.pending_moves.clear()
+
+    def add_node(self, cell: int, parent: int) -> int:
+        """Adds the node of `cell` reached from node `parent` and returns its index."""
+        self.node_cells.append(cell)
+        self.node_parents.append(parent)
+        return len(self.node_cells) - 1
+
+    def route(self, node: int) -> List[int]:
+        """Returns the cells of the path from the root of the tree to `node`."""
+        path = []
+        while node != -1:
+            path.append(self.node_cells[node])
+            node = self.node_parents[node]
+        return path[::-1]
+
+    def enter(self, current: int, goal: int, depth: int, parent: int, neighbours: Tuple[int, ...]) -> bool:
+        """Enters `current` if it may lead to a shorter path: pushes its frame and moves the interactor there.
+        Puts the path for the goal in `goal_node`.
+        The distance to the cell is checked by the caller.
 
-    Args:
-        map_ (List[List[Character]]): Map itself.
-        center (Cell): Cell with Captain Marvel.
-    """
-    for direction in (
-        Cell(1, 0),
-        Cell(1, 1),
-        Cell(0, 1),
-        Cell(-1, 1),
-        Cell(-1, 0),
-        Cell(-1, -1),
-        Cell(0, -1),
-        Cell(1, -1),
-        Cell(2, 0),
-        Cell(0, 2),
-        Cell(-2, 0),
-        Cell(0, -2),
-    ):
-        cell = center + direction
-        if move_in_map(cell) and map_[cell.x][cell.y] == Character.EMPTY:
-            map_[cell.x][cell.y] = Character.PERCEPTION
-
-
-# storing whether one has visited cell (i, j)
-visited: List[List[bool]] = [[False for _ in range(N)] for _ in range(N)]
-# storing the minimum distance from start to cell (i, j)
-distance: List[List[int]] = [[N**3 for _ in range(N)] for _ in range(N)]
-# storing the minimum path from start to infinity stone
-path_to_goal: List[Cell] = []
-# storing the minimum path from start to shield
-path_to_shield: List[Cell] = []
-
-
-def backtracking(
-    map_: List[List[Character]],
-    current: Cell,
-    goal: Cell,
-    path: List[Cell],
-    variant_number: int,
-    with_shield: bool,
+        Args:
+            current (int): Index of the cell.
+            goal (int): Index of the goal cell.
+            depth (int): Number of cells on the current path before `current`.
+            parent (int): Node of the previous cell (-1 for none).
+            neighbours (Tuple[int, ...]): Neighbours of `current` sorted by their distance to the goal.
+
+        Returns:
+            bool: Whether the cell was entered.
+        """
+        # do not check if even the bound of the distance to the goal is worse (or the goal can not be reached)
+        bound = depth + self.lower_bound(current, goal)
+        if bound >= self.no_path or (self.goal_length and bound >= self.goal_length - 1):
+            if bound > depth:
+                self.statistics["pruned"] += 1
+            return False
+        # do not check deeper than the limit of the current iteration
+        if bound > self.limit:
+            self.exceeded = min(self.exceeded, bound)
+            self.statistics["pruned"] += 1
+            return False
+        # if we reached the goal update the path
+        # as the path now is now shorter
+        if current == goal:
+            self.goal_node = self.add_node(current, parent)
+            self.goal_length = depth + 1
+            return False
+
+        # mark this cell as visited to not to visit it in the frames above
+        self.visited[current] = self.generation
+        # update the shortest path to here
+        self.distance[current] = depth + 1
+        self.stamp[current] = self.generation
+        # update the path with our current cell
+        self.frame_cells.append(current)
+        self.frame_nodes.append(self.add_node(current, parent))
+        self.frame_neighbours.append(iter(neighbours))
+        self.statistics["expanded"] += 1
+        self.bounds_age += 1
+        # move the interactor to the current cell (in later iterations of deepening it is already there)
+        if self.returned:
+            self.returned = False
+            self.send_pending_moves()
+        else:
+            self.pending_moves.append(current)
+            self.send_pending_moves(explore=1)
+        return True
+
+    def backtracking(self, start: int, goal: int, depth: int, parent: int, neighbours: List[Tuple[int, ...]]) -> None:
+        """Backtracking algorithm to find the shortest path between `start` and `goal`.
+        Puts the path for the goal in `goal_node`.
+        Puts the path for the shield in `shield_node`.
+
+        Args:
+            start (int): Index of the start cell.
+            goal (int): Index of the goal cell.
+            depth (int): Number of cells on the path before `start`.
+            parent (int): Node of the cell before `start` (-1 for none).
+            neighbours (List[Tuple[int, ...]]): Neighbours of every cell sorted by their distance to the goal.
+        """
+        generation, visited, distance, stamp = self.generation, self.visited, self.distance, self.stamp
+        cells = self.grid.cells
+        frame_cells, frame_nodes, frame_neighbours = self.frame_cells, self.frame_nodes, self.frame_neighbours
+        pending_moves = self.pending_moves
+        deadline = self.deadline
+        # distances of the new generation are unknown, so the start is not checked
+        if not self.enter(start, goal, depth, parent, neighbours[start]):
+            return
+
+        while frame_cells:
+            if deadline is not None and time.perf_counter() >= deadline:
+                # the budget ran out: the search is abandoned where it is, the best path stays in `goal_node`
+                self.proven = False
+                frame_cells.clear()
+                frame_nodes.clear()
+                frame_neighbours.clear()
+                pending_moves.clear()
+                return
+            current, node = frame_cells[-1], frame_nodes[-1]
+            length = depth + len(frame_cells)
+            # neighbours are already sorted by their distance to the goal
+            # (the loop goes on where it stopped before the frame of the last entered neighbour was pushed)
+            for neighbour in frame_neighbours[-1]:
+                # cell should not be visited
+                if visited[neighbour] == generation:
+                    continue
+                # process the shield
+                if cells[neighbour] == SHIELD:
+                    # update the path to it
+                    if not self.shield_length or length + 1 < self.shield_length:
+                        self.shield_node = self.add_node(neighbour, node)
+                        self.shield_length = length + 1
+                    # do not allow to move there
+                    continue
+                # check if the cell does not contain enemies
+                if not move_is_empty(self.grid, neighbour):
+                    continue
+
+                # do not check if we have worse distance
+                if stamp[neighbour] != generation or length + 1 < distance[neighbour]:
+                    # the frame of the neighbour goes on top of the stack
+                    if self.enter(neighbour, goal, length, node, neighbours[neighbour]):
+                        break
+                # the neighbour is not entered, but the move back is sent as if it was
+                pending_moves.append(current)
+                # do not check others if the goal can be reached from here
+                if neighbour == goal:
+                    frame_neighbours[-1] = iter(())
+                    break
+            else:
+                # unmark the cell so we can try to visit it later
+                visited[current] = 0
+                # remove the cell from the current path
+                frame_cells.pop()
+                frame_nodes.pop()
+                frame_neighbours.pop()
+                # move the interactor back so next neighbour can run
+                if frame_cells:
+                    pending_moves.append(frame_cells[-1])
+
+    def search(self, start: int, goal: int, depth: int, parent: int, neighbours: List[Tuple[int, ...]]) -> None:
+        """Runs backtracking from `start` with new visited cells and distances.
+        With iterative deepening it is repeated with the limit raised to the least bound that exceeded it,
+        until nothing exceeds the limit (every path that can be shorter than the found one was checked).
+
+        Args:
+            start (int): Index of the start cell.
+            goal (int): Index of the goal cell.
+            depth (int): Number of cells on the path before `start`.
+            parent (int): Node of the cell before `start` (-1 for none).
+            neighbours (List[Tuple[int, ...]]): Neighbours of every cell sorted by their distance to the goal.
+        """
+        if not self.deepening:
+            self.reset()
+            self.backtracking(start, goal, depth, parent, neighbours)
+            return
+        self.limit = depth + self.lower_bound(start, goal)
+        while self.limit < self.no_path and self.proven:
+            self.reset()
+            self.exceeded = self.no_path
+            self.backtracking(start, goal, depth, parent, neighbours)
+            self.limit = self.exceeded
+            # backtracking ends where it started
+            self.returned = True
+        self.returned = False
+
+    def solve(self, channel: Channel) -> int:
+        """Solves one test: reads the task, explores the map through the interactor and sends the answer.
+        If the budget runs out, the best path found so far is answered and `proven` is False.
+
+        Args:
+            channel (Channel): Interactor of the test (the map is of size `n`).
+
+        Returns:
+            int: The answer (-1 if there is no path).
+        """
+        start_time = time.perf_counter()
+        self.deadline = start_time + self.budget if self.budget is not None else None
+        self.proven = True
+        grid = self.grid
+        grid.cells[:] = self.empty
+        self.channel = channel
+        self.node_cells.clear()
+        self.node_parents.clear()
+        self.goal_node, self.goal_length = -1, 0
+        self.shield_node, self.shield_length = -1, 0
+        self.pending_moves.clear()
+        self.statistics.update(dict.fromkeys(self.statistics, 0))
+        # bytes exchanged before this test (a session goes on over the same connection)
+        sent, received = (channel.sent, channel.received) if isinstance(channel, Connection) else (0, 0)
+        self.seen[:] = self.empty
+        self.bounds_invalid = True
+        self.with_shield = False
+        self.variant_number, goal = channel.read_task()
+        start = grid.index(0, 0)
+        # neighbours are sorted by their distance to the goal once instead of every step
+        if goal != self.goal:
+            self.goal = goal
+            self.neighbours = grid.neighbours_towards(goal)
+            self.to_goal = [grid.manhattan(cell, goal) for cell in range(self.n * self.n)]
+        neighbours = self.neighbours
+
+        # run backtracking from start to goal without picking up the shield
+        self.search(start, goal, 0, -1, neighbours)
+
+        # if the shield was spotted and is accessible (and there is time left to check it)
+        shield_time: Optional[float] = None
+        if self.shield_length and self.proven:
+            shield_time = time.perf_counter()
+            self.statistics["time_search"] = shield_time - start_time
+            # move to the shield to pick it up
+            # (the shield itself is entered by the backtracking below)
+            self.with_shield = True
+            self.pending_moves.extend(self.route(self.shield_node)[1:-1])
+            self.send_pending_moves()
+            # remove perception zones
+            # captain marvels perception zone will be restore when asking interactor
+            grid.replace(PERCEPTION, EMPTY)
+            self.bounds_invalid = True
+            # run backtracking from shield to goal
+            shield = self.node_cells[self.shield_node]
+            self.search(shield, goal, self.shield_length - 1, self.node_parents[self.shield_node], neighbours)
+
+        # send the last moves back
+        self.send_pending_moves()
+        self.channel = None
+
+        # print the shortest path
+        # note: if there is no path to the goal then -1 will be printed
+        answer = self.goal_length - 1
+        channel.answer(answer, self.proven)
+        if shield_time is None:
+            self.statistics["time_search"] = time.perf_counter() - start_time
+        else:
+            self.statistics["time_shield"] = time.perf_counter() - shield_time
+        if isinstance(channel, Connection):
+            self.statistics["bytes_sent"] = channel.sent - sent
+            self.statistics["bytes_received"] = channel.received - received
+        return answer
+
+
+# solvers reused by the tests run in the same process (by the size of the map and the options)
+solvers: Dict[Tuple[int, str, bool, Optional[float]], BacktrackingSolver] = {}
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--size",
+        dest="n",
+        type=int,
+        help="Size of the map (NxN) for a single test (in a session it is given by the interactor)",
+        default=N,
+    )
+    parser.add_argument(
+        "-bd",
+        "--bound",
+        type=str,
+        choices=BOUNDS,
+        help="Lower bound of the remaining distance to prune the search: manhattan distance or BFS distance "
+        "on the known map (cells that were not seen are considered to be empty)",
+        default="bfs",
+    )
+    parser.add_argument(
+        "-id",
+        "--deepening",
+        action="store_true",
+        help="Whether to search with iterative deepening on the bound",
+    )
+    parser.add_argument(
+        "-bg",
+        "--budget",
+        type=float,
+        help="Seconds given to every test: when they run out, the best path found so far is answered "
+        "as not proven to be the shortest (no limit by default)",
+        default=None,
+    )
+    parser.add_argument(
+        "-st",
+        "--stats",
+        action="store_true",
+        help="Whether to print search statistics as JSON to stderr at exit",
+    )
+    return parser.parse_args()
+
+
+def main(
+    n: int = N,
+    bound: str = "bfs",
+    deepening: bool = False,
+    budget: Optional[float] = None,
+    stats: bool = False,
+    connection: Optional[Channel] = None,
 ) -> None:
-    """Backtracking algorithm to find the shortest path between `current` and `goal`.
-    Puts the path for the goal in global `path_to_goal`.
-    Puts the path for the shield in global `path_to_shield`.
+    """Main function of the solution.
 
     Args:
-        map_ (List[List[Character]]): Map to work on.
-        current (Cell): Start cell.
-        goal (Cell): Goal cell.
-        path (List[Cell]): Current path before entering `current`.
-        variant_number (int): Variant of Thanos' vision.
-        with_shield (bool): Whether Thanos is under shield's effects.
+        n (int): Size of the map (NxN).
+        bound (str): Lower bound of the remaining distance used to prune the search (see `BOUNDS`).
+        deepening (bool): Whether to search with iterative deepening on the bound.
+        budget (Optional[float]): Seconds given to every test (no limit by default).
+        stats (bool): Whether to print search statistics as JSON to stderr at exit.
+        connection (Optional[Channel]): Interactor (the standard streams by default).
     """
-    global path_to_goal, path_to_shield, visited, distance
-
-    # do not check if we have worse distance
-    if len(path) + 1 >= distance[current.x][current.y]:
-        return
-    # do not check if the distance to the goal is worse
-    if path_to_goal and len(path) + 1 >= len(path_to_goal):
-        return
-    # if we reached the goal update the path
-    # as the path now is now shorter
-    if current == goal:
-        path_to_goal = path.copy() + [current]
-        return
-
-    # mark this cell as visited to not to visit it in later recursive calls
-    visited[current.x][current.y] = True
-    # update the shortest path to here
-    distance[current.x][current.y] = len(path) + 1
-    # update the path with our current cell
-    path.append(current)
-    # move the interactor to the current cell
-    ask_to_move(map_, current, variant_number, with_shield)
-
-    # in variant 2 we can see into cells where thor and captain marvel are located
-
-    # get neighbours and sort them by their distance to the goal
-    neighbours = get_accessible_neighbours(current)
-    neighbours.sort(key=goal.manhattan)
-    for neighbour in neighbours:
-        # cell should not be visited
-        if visited[neighbour.x][neighbour.y]:
-            continue
-        # process the shield
-        if map_[neighbour.x][neighbour.y] == Character.SHIELD:
-            # update the path to it
-            if not path_to_shield or len(path) + 1 < len(path_to_shield):
-                path_to_shield = path.copy() + [neighbour]
-            # do not allow to move there
-            continue
-        # check if the cell does not contain enemies
-        if not move_is_empty(map_, neighbour):
-            continue
-
-        # recursive call on the neighbour
-        backtracking(map_, neighbour, goal, path, variant_number, with_shield)
-        # move the interactor back so next neighbour can run
-        ask_to_move(map_, current, variant_number, with_shield)
-
-        # do not check others if the goal can be reached from here
-        if neighbour == goal:
-            break
-
-    # unmark the cell so we can try to visit it later
-    visited[current.x][current.y] = False
-    # remove the cell from the current path
-    path.pop()
-
-
-def main() -> None:
-    """Main function of the solution."""
-    global visited, distance
-
-    variant_number = int(input())
-    x, y = map(int, input().split())
-    goal = Cell(x, y)
-    start = Cell(0, 0)
-    map_: List[List[Character]] = [[Character.EMPTY for _ in range(N)] for _ in range(N)]
-
-    # run backtracking from start to goal without picking up the shield
-    backtracking(map_, start, goal, [], variant_number, False)
-
-    # if the shield was spotted and is accessible
-    if path_to_shield:
-        # move to the shield to pick it up
-        for cell in path_to_shield[1:-1]:
-            ask_to_move(map_, cell, variant_number, True)
-        # remove perception zones
-        # captain marvels perception zone will be restore when asking interactor
-        for i in range(N):
-            for j in range(N):
-                if map_[i][j] == Character.PERCEPTION:
-                    map_[i][j] = Character.EMPTY
-        # reset visited and distances
-        visited = [[False for _ in range(N)] for _ in range(N)]
-        distance = [[N**3 for _ in range(N)] for _ in range(N)]
-        # run backtracking from shield to goal
-        backtracking(map_, path_to_shield[-1], goal, path_to_shield[:-1], variant_number, True)
-
-    # print the shortest path
-    # note: if path_to_goal is empty then -1 will be printed
-    print(f"e {len(path_to_goal) - 1}")
+    key = (n, bound, deepening, budget)
+    if key not in solvers:
+        solvers[key] = BacktrackingSolver(n, bound, deepening, budget)
+    solver = solvers[key]
+    solver.solve(connection if connection is not None else Connection(n))
+    if stats:
+        print(json.dumps(solver.statistics), file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    serve(args.n, lambda n, connection: main(n, args.bound, args.deepening, args.budget, args.stats, connection))
@@ -0,0 +1,124 @@
+import time
+from random import choice, randint
+from typing import List, Tuple
+from argparse import ArgumentParser, Namespace
+
+from grid import Grid
+from generate_tests import create_map
+from interactor import ENGINES, Interactor
+
+
+DASH_LENGTH = 50
+
+
+def random_walk(grid: Grid, variant_number: int, length: int) -> List[Tuple[int, int]]:
+    """Returns a random walk of Thanos made only of legal moves (he can step back and forth).
+
+    Args:
+        grid (Grid): Map with all the entities.
+        variant_number (int): Thanos' perception variant.
+        length (int): Maximum number of moves (the walk is shorter if Thanos is locked in).
+
+    Returns:
+        List[Tuple[int, int]]: Cells to move into one after another.
+    """
+    interactor = Interactor(grid, variant_number)
+    walk: List[Tuple[int, int]] = []
+    for _ in range(length):
+        x, y = interactor.position
+        options = [cell for cell in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)) if interactor.check(cell) is None]
+        if not options:
+            break
+        walk.append(choice(options))
+        interactor.step(walk[-1])
+    return walk
+
+
+def replay(engine: str, grid: Grid, variant_number: int, walk: List[Tuple[int, int]]) -> Tuple[float, list]:
+    """Moves Thanos along `walk` with the interactor on the map engine.
+
+    Args:
+        engine (str): Name of the map engine.
+        grid (Grid): Map with all the entities.
+        variant_number (int): Thanos' perception variant.
+        walk (List[Tuple[int, int]]): Cells to move into one after another.
+
+    Returns:
+        Tuple[float, list]: Wall time and the surroundings reported after every move.
+    """
+    start_time = time.perf_counter()
+    interactor = Interactor(grid, variant_number, engine)
+    reported = [interactor.step(cell) for cell in walk]
+    return time.perf_counter() - start_time, reported
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="Sizes of the maps (NxN) to benchmark",
+        default=[9, 25, 50, 100],
+    )
+    parser.add_argument(
+        "-k",
+        "--maps",
+        type=int,
+        help="Number of random maps for each size",
+        default=20,
+    )
+    parser.add_argument(
+        "-m",
+        "--moves",
+        type=int,
+        help="Number of random moves on each map",
+        default=5000,
+    )
+    parser.add_argument(
+        "-e",
+        "--engines",
+        type=str,
+        nargs="+",
+        choices=list(ENGINES),
+        help="Map engines of the interactor to benchmark",
+        default=["grid", "bitboard"],
+    )
+    parser.add_argument(
+        "-v",
+        "--variant",
+        type=int,
+        help="Which perception variant to use for Thanos (randomly chosen if not 1 or not 2)",
+        default=0,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print(f"{'N':>6} {'ENGINE':<10} {'MOVES':>10} {'TIME':>10} {'MOVES/S':>12}")
+    print("-" * DASH_LENGTH)
+    for n in args.sizes:
+        maps = [Grid.from_rows(create_map(n)) for _ in range(args.maps)]
+        variants = [args.variant if args.variant in (1, 2) else randint(1, 2) for _ in maps]
+        walks = [random_walk(grid, variant_number, args.moves) for grid, variant_number in zip(maps, variants)]
+        moves = sum(map(len, walks))
+        expected = None
+        for engine in args.engines:
+            total_time, answers = 0.0, []
+            for grid, variant_number, walk in zip(maps, variants, walks):
+                wall_time, reported = replay(engine, grid, variant_number, walk)
+                total_time += wall_time
+                answers.append(reported)
+            # every engine has to report exactly the same
+            if expected is None:
+                expected = answers
+            elif answers != expected:
+                raise AssertionError(f"engine {engine} reports different surroundings on {n}x{n} maps")
+            print(f"{n:>6} {engine:<10} {moves:>10} {total_time:>9.3f}s {moves / total_time:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
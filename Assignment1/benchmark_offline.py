@@ -0,0 +1,108 @@
+import copy
+import time
+from random import randrange
+from typing import List, Tuple
+from argparse import ArgumentParser, Namespace
+
+from grid import Grid
+from generate_answers import shortest_path
+from generate_tests import create_map
+from offline import SEARCHES, KnownMap
+
+
+DASH_LENGTH = 50
+# name of the path-copying BFS of `generate_answers` in the table
+REFERENCE = "reference"
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Compares the searches of offline.py with the BFS of generate_answers.py")
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="Sizes of the maps (NxN) to benchmark",
+        default=[9, 25, 50, 100, 200],
+    )
+    parser.add_argument(
+        "-k",
+        "--maps",
+        type=int,
+        help="Number of random maps for each size",
+        default=20,
+    )
+    parser.add_argument(
+        "-a",
+        "--avengers",
+        type=int,
+        help="Number of Avengers of each kind on a map (proportional to the area of the map by default)",
+        default=None,
+    )
+    parser.add_argument(
+        "-se",
+        "--searches",
+        type=str,
+        nargs="+",
+        choices=[REFERENCE, *SEARCHES],
+        help="Searches to benchmark",
+        default=[REFERENCE, *SEARCHES],
+    )
+    parser.add_argument(
+        "-p",
+        "--pairs",
+        type=int,
+        help="Number of random pairs of cells on each map (blocked ones too) whose distances are checked "
+        "to be the same for every search of offline.py (not timed)",
+        default=20,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print(f"{'N':>6} {'SEARCH':<10} {'TIME':>10} {'PER MAP':>12} {'SPEEDUP':>8}")
+    print("-" * DASH_LENGTH)
+    for n in args.sizes:
+        maps: List[List[List[str]]] = [create_map(n, args.avengers) for _ in range(args.maps)]
+        known = [KnownMap(n, bytes(Grid.from_rows(rows).cells)) for rows in maps]
+        # start, goal and whether the shield is picked up
+        pairs: List[Tuple[int, int, bool]] = [
+            (randrange(n * n), randrange(n * n), bool(randrange(2))) for _ in range(args.pairs)
+        ]
+        expected = None
+        expected_distances = None
+        first_time = None
+        for search in args.searches:
+            start_time = time.perf_counter()
+            if search == REFERENCE:
+                # the reference changes the map when it considers the shield
+                answers = [shortest_path(copy.deepcopy(rows)) for rows in maps]
+            else:
+                answers = [known_map.answer(search) for known_map in known]
+            total_time = time.perf_counter() - start_time
+            # every search has to find exactly the same answers
+            if expected is None:
+                expected, first_time = answers, total_time
+            elif answers != expected:
+                raise AssertionError(f"search {search} finds different answers on {n}x{n} maps")
+            if search != REFERENCE:
+                # a goal may be blocked here, unlike the Infinity Stone and the shield of the answers
+                distances = [
+                    known_map.distance(start, goal, with_shield, search)
+                    for known_map in known
+                    for start, goal, with_shield in pairs
+                ]
+                if expected_distances is None:
+                    expected_distances = distances
+                elif distances != expected_distances:
+                    raise AssertionError(f"search {search} finds different distances on {n}x{n} maps")
+            print(
+                f"{n:>6} {search:<10} {total_time:>9.3f}s {total_time / len(maps) * 1000:>10.3f}ms "
+                f"{first_time / total_time:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
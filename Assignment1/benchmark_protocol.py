@@ -0,0 +1,151 @@
+import sys
+import time
+import subprocess
+from typing import List, Tuple
+from argparse import ArgumentParser, Namespace
+
+from grid import CODES, N, SYMBOLS
+from protocol import Connection, decode_moves, encode_surroundings
+
+
+DASH_LENGTH = 50
+# codecs to compare:
+#   text   - `print`/`input()` in the solver, a write per line and a decoded `readline` in the interactor
+#   binary - `protocol.Connection` in the solver, a single write per message in the interactor
+#   batch  - the same as binary, but `--batch` moves are sent in one request
+CODECS = ("text", "binary", "batch")
+# surroundings reported after every move (a typical answer for variant 2) as indices and codes
+SURROUNDINGS: List[Tuple[int, int]] = [
+    (x * N + y, CODES[entity])
+    for (x, y), entity in (((0, 2), "P"), ((1, 0), "P"), ((1, 1), "H"), ((1, 2), "P"), ((2, 0), "T"), ((2, 2), "S"))
+]
+
+
+def solve_text(rounds: int) -> None:
+    """Solver's side with the text protocol: moves back and forth between (0, 0) and (0, 1).
+
+    Args:
+        rounds (int): Number of moves.
+    """
+    for i in range(rounds):
+        print(f"m 0 {(i + 1) % 2}")
+        count = int(input())
+        for _ in range(count):
+            x_, y_, e_ = input().split()
+            int(x_), int(y_), CODES[e_]
+    print("e 0")
+
+
+def solve_binary(rounds: int, batch: int) -> None:
+    """Solver's side with `protocol.Connection`: moves back and forth between (0, 0) and (0, 1).
+
+    Args:
+        rounds (int): Number of moves.
+        batch (int): Number of moves sent in one request.
+    """
+    connection = Connection(N)
+    for i in range(0, rounds, batch):
+        connection.move([(j + 1) % 2 for j in range(i, min(i + batch, rounds))])
+    connection.answer(0)
+
+
+def interact(codec: str, rounds: int, batch: int) -> Tuple[float, int, int]:
+    """Runs the solver's side in a subprocess and plays the interactor for it.
+
+    Args:
+        codec (str): Codec to benchmark (see `CODECS`).
+        rounds (int): Number of moves.
+        batch (int): Number of moves sent in one request (only for the batch codec).
+
+    Returns:
+        Tuple[float, int, int]: Wall time, number of round trips, and number of moves.
+    """
+    batch = batch if codec == "batch" else 1
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--solver", codec, "--rounds", str(rounds), "--batch", str(batch)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    assert proc.stdin and proc.stdout
+
+    round_trips = moves = 0
+    start_time = time.time()
+    while True:
+        if codec == "text":
+            output = proc.stdout.readline().decode("UTF-8").split()
+            if output[0] == "e":
+                break
+            proc.stdin.write(f"{len(SURROUNDINGS)}\n".encode("ASCII"))
+            for cell, code in SURROUNDINGS:
+                proc.stdin.write(f"{cell // N} {cell % N} {SYMBOLS[code]}\n".encode("ASCII"))
+            moves += 1
+        else:
+            words = proc.stdout.readline().split()
+            if words[0] == b"e":
+                break
+            move_cells = decode_moves(words) or []
+            proc.stdin.write(b"".join(encode_surroundings(N, SURROUNDINGS) for _ in move_cells))
+            moves += len(move_cells)
+        proc.stdin.flush()
+        round_trips += 1
+    wall_time = time.time() - start_time
+    proc.wait()
+    return wall_time, round_trips, moves
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-r",
+        "--rounds",
+        type=int,
+        help="Number of moves made by the solver",
+        default=20000,
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        type=int,
+        help="Number of moves sent in one request by the batch codec",
+        default=16,
+    )
+    parser.add_argument(
+        "-c",
+        "--codecs",
+        type=str,
+        nargs="+",
+        choices=CODECS,
+        help="Codecs to benchmark",
+        default=list(CODECS),
+    )
+    parser.add_argument(
+        "--solver",
+        type=str,
+        choices=CODECS,
+        help="Run the solver's side with the codec (used internally)",
+        default=None,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.solver == "text":
+        solve_text(args.rounds)
+        return
+    if args.solver:
+        solve_binary(args.rounds, args.batch)
+        return
+
+    print(f"{'CODEC':<10} {'MOVES':>10} {'ROUND TRIPS':>12} {'TIME':>10} {'TRIPS/S':>12} {'MOVES/S':>12}")
+    print("-" * (DASH_LENGTH + 21))
+    for codec in args.codecs:
+        wall_time, round_trips, moves = interact(codec, args.rounds, args.batch)
+        print(
+            f"{codec:<10} {moves:>10} {round_trips:>12} {wall_time:>9.3f}s "
+            f"{round_trips / wall_time:>12.0f} {moves / wall_time:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import asyncio
+from random import randint
+from typing import Dict, List, Tuple
+from argparse import ArgumentParser, Namespace
+
+from grid import Grid
+from generate_tests import create_map
+from interactor import Interactor
+from run_tests import TIME_LIMIT_EXCEEDED, SolverFailed, Worker
+
+
+DASH_LENGTH = 50
+
+
+def play(cmd: str, grid: Grid, variant_number: int, timelimit: float) -> Tuple[int, float, int, Dict[str, float]]:
+    """Runs a solver on the map and plays the interactor for it (see `run_tests.Worker`),
+    so the solver is stopped at the time limit even if it stalls without printing anything.
+
+    Args:
+        cmd (str): Command to execute the solver (the size of the map and `--stats` are appended).
+        grid (Grid): Map with all the entities.
+        variant_number (int): Thanos' perception variant.
+        timelimit (float): Seconds after which the solver is stopped.
+
+    Raises:
+        RuntimeError: If the solver crashes or makes an illegal move.
+
+    Returns:
+        Tuple[int, float, int, Dict[str, float]]: Answer (`TIME_LIMIT_EXCEEDED` on time limit), wall time,
+            number of moves, and statistics reported by the solver.
+    """
+    interactor = Interactor(grid, variant_number)
+    worker = Worker(f"{cmd} --size {grid.n} --stats", session=False)
+    log: List[str] = []
+    statistics: Dict[str, float] = {}
+    try:
+        answer, _, wall_time = asyncio.run(worker.play(interactor, timelimit, log, statistics))
+    except SolverFailed:
+        raise RuntimeError("\n".join(log))
+    return answer if answer is not None else TIME_LIMIT_EXCEEDED, wall_time, interactor.moves, statistics
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="Sizes of the maps (NxN) to benchmark",
+        default=[9, 25, 50, 100],
+    )
+    parser.add_argument(
+        "-k",
+        "--maps",
+        type=int,
+        help="Number of random maps for each size",
+        default=5,
+    )
+    parser.add_argument(
+        "-c",
+        "--cmds",
+        type=str,
+        nargs="+",
+        help="Commands to execute solvers (they should accept --size and --stats)",
+        default=["python3 a_star.py", "python3 backtracking.py"],
+    )
+    parser.add_argument(
+        "-v",
+        "--variant",
+        type=int,
+        help="Which perception variant to use for Thanos (randomly chosen if not 1 or not 2)",
+        default=0,
+    )
+    parser.add_argument(
+        "-tl",
+        "--timelimit",
+        type=float,
+        help="Seconds after which a solver is stopped on a single map",
+        default=60,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print(f"{'N':>6} {'SOLVER':<30} {'SOLVED':>7} {'TIME':>10} {'EXPANDED':>10} {'MOVES':>10}")
+    print("-" * (DASH_LENGTH + 26))
+    for n in args.sizes:
+        maps: List[Grid] = [Grid.from_rows(create_map(n)) for _ in range(args.maps)]
+        variants = [args.variant if args.variant in (1, 2) else randint(1, 2) for _ in maps]
+        for cmd in args.cmds:
+            solved, total_time, total_expanded, total_moves = 0, 0.0, 0, 0
+            for grid, variant_number in zip(maps, variants):
+                answer, wall_time, moves, statistics = play(cmd, grid, variant_number, args.timelimit)
+                solved += answer != TIME_LIMIT_EXCEEDED
+                total_time += wall_time
+                total_expanded += statistics.get("expanded", 0)
+                total_moves += moves
+            print(
+                f"{n:>6} {cmd:<30} {solved:>3}/{len(maps):<3} {total_time / len(maps):>9.3f}s "
+                f"{total_expanded / max(solved, 1):>10.1f} {total_moves / len(maps):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from grid import CAPTAIN_MARVEL, EMPTY, PERCEPTION, SYMBOLS, Grid, tables
+
+
+def mask_of(cells: Iterable[int]) -> int:
+    """Returns the bitboard with bits of `cells` set.
+
+    Args:
+        cells (Iterable[int]): Indices of the cells.
+
+    Returns:
+        int: The bitboard.
+    """
+    mask = 0
+    for cell in cells:
+        mask |= 1 << cell
+    return mask
+
+
+def bits(mask: int) -> Iterator[int]:
+    """Yields indices of the set bits of `mask` in increasing order (row-major order of the cells).
+
+    Args:
+        mask (int): The bitboard.
+
+    Yields:
+        int: Index of the cell.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@lru_cache(maxsize=None)
+def masks(n: int) -> Dict[str, List[int]]:
+    """Returns precomputed bitboards of vision and Captain Marvel's perception zone for every cell of NxN map.
+
+    Args:
+        n (int): Size of the map.
+
+    Returns:
+        Dict[str, List[int]]: Tables by their names, entry `x * n + y` is the bitboard around (x, y).
+    """
+    table = tables(n)
+    return {
+        "vision1": [mask_of(cells) for cells in table["vision1"]],
+        "vision2": [mask_of(cells) for cells in table["vision2"]],
+        "marvel": [mask_of(cells) for cells in table["marvel"]],
+    }
+
+
+# DIGITS[code] translates codes of the cells into "1" for the cells with such code and "0" for others
+DIGITS = [bytes(b"1"[0] if other == code else b"0"[0] for other in range(256)) for code in range(len(SYMBOLS))]
+
+
+def layer_of(cells: bytearray, code: int) -> int:
+    """Returns the bitboard of the cells with `code`.
+
+    Args:
+        cells (bytearray): Codes of the cells.
+        code (int): Code of the entity.
+
+    Returns:
+        int: The bitboard.
+    """
+    digits = cells.translate(DIGITS[code])
+    # the first cell is the lowest bit
+    return int(digits[::-1], 2) if digits else 0
+
+
+class Bitboard:
+    """
+    Map of the interactor as bitboards: one N*N-bit integer per entity, bit `x * n + y` is cell (x, y).
+    The codes of the cells are kept alongside for lookups of a single cell.
+    What Thanos sees is the bitboard of his vision AND the occupied cells (most cells see nothing at all),
+    and the shield replaces the perception layer with the precomputed perception zones of Captain Marvels at once.
+    """
+
+    def __init__(self, grid: Grid):
+        """
+        Args:
+            grid (Grid): Map with all the entities (it is not changed).
+        """
+        self.cells = bytearray(grid.cells)
+        self.masks = masks(grid.n)
+        # layers[code] is the bitboard of the cells with such code
+        self.layers: List[int] = [0 if code == EMPTY else layer_of(grid.cells, code) for code in range(len(SYMBOLS))]
+        self.vision = {1: self.masks["vision1"], 2: self.masks["vision2"]}
+        self.stencils = {1: grid.vision[1], 2: grid.vision[2]}
+        # perception zones of all Captain Marvels
+        self.marvel_zones = 0
+        for captain_marvel in bits(self.layers[CAPTAIN_MARVEL]):
+            self.marvel_zones |= self.masks["marvel"][captain_marvel]
+        self.update()
+
+    def update(self) -> None:
+        """Recomputes the bitboard of occupied cells."""
+        self.occupied = 0
+        for layer in self.layers:
+            self.occupied |= layer
+
+    def code(self, index: int) -> int:
+        """Returns the code of the entity in cell `index`."""
+        return self.cells[index]
+
+    def pick_up_shield(self) -> None:
+        """Removes all the perception zones but Captain Marvel's ones."""
+        perception = self.layers[PERCEPTION]
+        others = self.occupied & ~perception
+        self.layers[PERCEPTION] = self.marvel_zones & ~others
+        # only the cells that changed are written
+        for index in bits(perception & ~self.layers[PERCEPTION]):
+            self.cells[index] = EMPTY
+        for index in bits(self.layers[PERCEPTION] & ~perception):
+            self.cells[index] = PERCEPTION
+        self.update()
+
+    def surroundings(self, index: int, variant_number: int) -> List[Tuple[int, int]]:
+        """Returns what Thanos sees standing in the cell `index`.
+
+        Args:
+            index (int): Index of the cell.
+            variant_number (int): Thanos' perception variant.
+
+        Returns:
+            List[Tuple[int, int]]: Index and code of every non-empty cell in sight (in row-major order).
+        """
+        if not self.vision[variant_number][index] & self.occupied:
+            return []
+        cells = self.cells
+        return [(seen, cells[seen]) for seen in self.stencils[variant_number][index] if cells[seen] != EMPTY]
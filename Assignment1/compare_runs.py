@@ -0,0 +1,62 @@
+import csv
+import argparse
+
+from run_tests import TIME_LIMIT_EXCEEDED
+
+
+DASH_LENGTH = 50
+
+
+def read_run(path):
+    with open(path, "r") as csv_file:
+        return {row["TEST"]: row for row in csv.DictReader(csv_file)}
+
+
+def timed_out(row):
+    return int(row["ANSWER"]) == TIME_LIMIT_EXCEEDED
+
+
+def best_effort(row):
+    # runs written before the PROVEN column have no best effort answers
+    return (row.get("PROVEN") or "1") == "0" and not timed_out(row)
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--csv", type=str, nargs="+", help="paths to .csv files with tests' results", required=True)
+parser.add_argument("--precision", type=int, default=3, help="precision for output time", required=False)
+
+args = parser.parse_args()
+precision = args.precision
+
+runs = [read_run(path) for path in args.csv]
+# compare only the tests present in every run
+tests = [test for test in runs[0] if all(test in run for run in runs[1:])]
+
+baseline_moves = sum(int(runs[0][test].get("MOVES") or 0) for test in tests)
+
+print(f"Comparison of {len(runs)} runs on {len(tests)} common tests (the first run is the baseline)")
+print("TIME is summed over the tests where neither the run nor the baseline exceeded the time limit")
+print(
+    f"{'RUN':<40} {'MOVES':>10} {'DIFF':>8} {'TIME':>10} {'DIFF':>8} {'TIMEOUTS':>9} "
+    f"{'ANSWERS DIFFER':>15} {'BEST EFFORT':>12}"
+)
+print("-" * (DASH_LENGTH + 68))
+for path, run in zip(args.csv, runs):
+    moves = sum(int(run[test].get("MOVES") or 0) for test in tests)
+    # the time of a test over the limit is infinite, so such tests are only counted
+    finished = [test for test in tests if not timed_out(run[test]) and not timed_out(runs[0][test])]
+    total_time = sum(float(run[test]["TIME"]) for test in finished)
+    baseline_time = sum(float(runs[0][test]["TIME"]) for test in finished)
+    timeouts = sum(timed_out(run[test]) for test in tests)
+    # best effort answers are counted apart from the ones that differ
+    differ = sum(
+        run[test]["ANSWER"] != runs[0][test]["ANSWER"]
+        for test in tests
+        if not best_effort(run[test]) and not best_effort(runs[0][test])
+    )
+    unproven = sum(best_effort(run[test]) for test in tests)
+    print(
+        f"{path:<40} {moves:>10} {(moves - baseline_moves) / max(baseline_moves, 1) * 100:>+7.1f}% "
+        f"{round(total_time, precision):>9}s {(total_time - baseline_time) / max(baseline_time, 1e-9) * 100:>+7.1f}% "
+        f"{timeouts:>9} {differ:>15} {unproven:>12}"
+    )
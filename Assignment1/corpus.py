@@ -0,0 +1,375 @@
+import os
+import re
+import mmap
+import glob
+import struct
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+from argparse import ArgumentParser, Namespace
+
+from grid import CODES, PATH, Grid
+
+
+FILE_PATTERN = re.compile(r".*?(\d+).*?")
+CORPUS_EXTENSION = ".corpus"
+# symbols that can be met in a test
+MAP_SYMBOLS = ".PSIHTM"
+MAGIC = b"AVCORPUS"
+VERSION = 1
+# magic, version, size of the map, number of records, size of a record, reserved, offset of the names
+HEADER = struct.Struct("<8sHHIIIQ")
+# every record starts with the answer followed by the codes of the cells (`x * n + y`)
+ANSWER = struct.Struct("<i")
+CELLS_OFFSET = ANSWER.size
+# records are aligned to this number of bytes
+ALIGNMENT = 8
+# answer of a map that is not computed yet
+UNKNOWN = -(2**31)
+# offsets of the names in the names section
+NAME_OFFSET = struct.Struct("<I")
+
+
+def get_order(file):
+    match = FILE_PATTERN.match(os.path.splitext(os.path.basename(file))[0])
+    if not match:
+        return float("inf")
+    return int(match.groups()[0])
+
+
+def record_size(n: int) -> int:
+    """Returns the size in bytes of a record with NxN map."""
+    return (CELLS_OFFSET + n * n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def is_corpus(path: str) -> bool:
+    """Returns whether `path` is a corpus file (an existing file is recognized by its magic, a new one by extension)."""
+    if os.path.isfile(path):
+        with open(path, "rb") as fp:
+            return fp.read(len(MAGIC)) == MAGIC
+    return path.endswith(CORPUS_EXTENSION)
+
+
+class Corpus:
+    """
+    Test maps with their answers in a single memory-mapped file.
+
+    Layout (little-endian):
+        header - `HEADER`, the records start right after it;
+        records - `count` records of `record_size(n)` bytes: the answer (int32, `UNKNOWN` if not computed)
+            and NxN codes of the cells;
+        names - `count + 1` offsets (uint32) into the UTF-8 names of the tests that follow them.
+    Records are accessed without copying: `cells` is a view of the file, so it can be wrapped in a NumPy array as well.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        """
+        Args:
+            path (str): Path to the corpus file.
+            writable (bool): Whether the answers can be changed (`set_answer`).
+
+        Raises:
+            ValueError: If the file is not a corpus of a known version.
+        """
+        self.path = path
+        with open(path, "r+b" if writable else "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, self.n, self.count, self.record_size, _, names_offset = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a corpus of version {VERSION}")
+        view = memoryview(self._mmap)
+        # all records as one buffer
+        self.records = view[HEADER.size : HEADER.size + self.count * self.record_size]
+        blob = names_offset + (self.count + 1) * NAME_OFFSET.size
+        offsets = [offset for (offset,) in NAME_OFFSET.iter_unpack(view[names_offset:blob])]
+        names = bytes(view[blob : blob + offsets[-1]])
+        self.names = [names[start:end].decode("UTF-8") for start, end in zip(offsets, offsets[1:])]
+        view.release()
+        self._indices: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the file (views returned by `cells` have to be released before)."""
+        self.records.release()
+        self._mmap.close()
+
+    def find(self, name: str) -> int:
+        """Returns the index of the record with `name`.
+
+        Raises:
+            KeyError: If there is no such record.
+        """
+        if self._indices is None:
+            self._indices = {name: index for index, name in enumerate(self.names)}
+        return self._indices[name]
+
+    def cells(self, index: int) -> memoryview:
+        """Returns the codes of the cells of the map `index` (a view of the file without copying)."""
+        start = index * self.record_size + CELLS_OFFSET
+        return self.records[start : start + self.n * self.n]
+
+    def answer(self, index: int) -> int:
+        """Returns the answer of the map `index` (`UNKNOWN` if it is not computed)."""
+        return ANSWER.unpack_from(self.records, index * self.record_size)[0]
+
+    def set_answer(self, index: int, answer: int) -> None:
+        """Writes the answer of the map `index` (the corpus has to be opened as writable)."""
+        ANSWER.pack_into(self.records, index * self.record_size, answer)
+
+    def grid(self, index: int) -> Grid:
+        """Returns the map `index` as a grid."""
+        grid = Grid(self.n)
+        grid.cells[:] = self.cells(index)
+        return grid
+
+
+class CorpusWriter:
+    """
+    Writes a corpus record by record, the names and the header are written on `close`.
+    """
+
+    def __init__(self, path: str, n: int):
+        """
+        Args:
+            path (str): Path to the corpus file.
+            n (int): Size of the maps.
+        """
+        self.n = n
+        self.record_size = record_size(n)
+        self.names: List[str] = []
+        self.fp: BinaryIO = open(path, "wb")
+        self.fp.write(bytes(HEADER.size))
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, name: str, cells: bytes, answer: int = UNKNOWN) -> None:
+        """Appends a record.
+
+        Args:
+            name (str): Name of the test.
+            cells (bytes): Codes of the cells of NxN map.
+            answer (int): Length of the shortest path (-1 if it does not exist, `UNKNOWN` if it is not computed).
+
+        Raises:
+            ValueError: If the map has another size.
+        """
+        if len(cells) != self.n * self.n:
+            raise ValueError(f"map {name} has {len(cells)} cells instead of {self.n * self.n}")
+        self.fp.write(ANSWER.pack(answer) + bytes(cells) + bytes(self.record_size - CELLS_OFFSET - len(cells)))
+        self.names.append(name)
+
+    def close(self) -> None:
+        """Writes the names and the header and closes the file."""
+        if self.fp.closed:
+            return
+        names_offset = self.fp.tell()
+        encoded = [name.encode("UTF-8") for name in self.names]
+        offset = 0
+        self.fp.write(NAME_OFFSET.pack(offset))
+        for name in encoded:
+            offset += len(name)
+            self.fp.write(NAME_OFFSET.pack(offset))
+        self.fp.write(b"".join(encoded))
+        self.fp.seek(0)
+        self.fp.write(HEADER.pack(MAGIC, VERSION, self.n, len(self.names), self.record_size, 0, names_offset))
+        self.fp.close()
+
+
+@lru_cache(maxsize=None)
+def open_corpus(path: str) -> Optional[Corpus]:
+    """Returns the corpus opened for reading (shared between the calls) or None if `path` is not a corpus file."""
+    return Corpus(path) if os.path.isfile(path) and is_corpus(path) else None
+
+
+def read_rows(path: str) -> List[List[str]]:
+    """Reads the rows of symbols of a text test."""
+    with open(path, "r") as fp:
+        return [line.split() for line in fp if line.strip()]
+
+
+def read_answer(test: str) -> int:
+    """Returns the answer of a test given as in the TEST column of `run_tests.py`.
+    It is either `<directory>/<name>` with the answer in `<directory>/answers/<name>`
+    or `<corpus>/<name>` with the answer in the record.
+
+    Args:
+        test (str): Path to the test.
+
+    Returns:
+        int: The answer (`UNKNOWN` if it is not computed).
+    """
+    directory, name = os.path.split(test)
+    corpus = open_corpus(directory)
+    if corpus is not None:
+        return corpus.answer(corpus.find(name))
+    with open(os.path.join(directory, "answers", name), "r") as fp:
+        return int(fp.readline())
+
+
+def list_tests(path: str) -> List[str]:
+    """Returns the tests of a directory (ordered by the numbers in their names), a corpus (in the order of the records)
+    or a single text file. Tests of a corpus are named `<corpus>/<name>`.
+
+    Args:
+        path (str): Path to the tests.
+
+    Returns:
+        List[str]: Paths to the tests.
+    """
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.txt")), key=get_order)
+    corpus = open_corpus(path)
+    if corpus is not None:
+        return [os.path.join(path, name) for name in corpus.names]
+    return [path]
+
+
+def load_test(test: str) -> Tuple[int, bytes]:
+    """Returns the size and the codes of the cells of a test (see `list_tests`).
+
+    Args:
+        test (str): Path to the test.
+
+    Raises:
+        ValueError: If the map contains an incorrect entity or is not square.
+
+    Returns:
+        Tuple[int, bytes]: Size of the map and the codes of its cells.
+    """
+    directory, name = os.path.split(test)
+    corpus = open_corpus(directory)
+    if corpus is not None:
+        cells = bytes(corpus.cells(corpus.find(name)))
+        if cells and max(cells) >= PATH:
+            raise ValueError("Incorrect entity in the map")
+        return corpus.n, cells
+    rows = read_rows(test)
+    if any(entity not in MAP_SYMBOLS for row in rows for entity in row):
+        raise ValueError("Incorrect entity in the map")
+    if any(len(row) != len(rows) for row in rows):
+        raise ValueError("The map is not square")
+    return len(rows), bytes(CODES[entity] for row in rows for entity in row)
+
+
+def import_text(directory: str, path: str) -> int:
+    """Packs the text tests of `directory` and their answers (`directory/answers`, if any) into a corpus.
+
+    Args:
+        directory (str): Path to the directory with the tests.
+        path (str): Path to the corpus file.
+
+    Raises:
+        ValueError: If the maps have different sizes.
+
+    Returns:
+        int: Number of the tests.
+    """
+    tests = list_tests(directory)
+    writer: Optional[CorpusWriter] = None
+    try:
+        for test in tests:
+            n, cells = load_test(test)
+            if writer is None:
+                writer = CorpusWriter(path, n)
+            try:
+                answer = read_answer(test)
+            except FileNotFoundError:
+                answer = UNKNOWN
+            writer.add(os.path.basename(test), cells, answer)
+    finally:
+        if writer is not None:
+            writer.close()
+    return len(tests)
+
+
+def export_text(path: str, directory: str) -> int:
+    """Writes the maps of a corpus as text tests into `directory` and the known answers into `directory/answers`.
+
+    Args:
+        path (str): Path to the corpus file.
+        directory (str): Path to the directory.
+
+    Returns:
+        int: Number of the tests.
+    """
+    os.makedirs(os.path.join(directory, "answers"), exist_ok=True)
+    with Corpus(path) as corpus:
+        for index, name in enumerate(corpus.names):
+            with open(os.path.join(directory, name), "w") as fp:
+                fp.write("".join(row + "\n" for row in corpus.grid(index).rows()))
+            if corpus.answer(index) != UNKNOWN:
+                with open(os.path.join(directory, "answers", name), "w") as fp:
+                    fp.write(str(corpus.answer(index)))
+        return len(corpus)
+
+
+def write_maps(path: str, n: int, maps: Iterable[bytes], start: int = 0) -> int:
+    """Writes maps named `<i>.txt` as text tests into the directory `path` or as a corpus if `path` is a corpus.
+
+    Args:
+        path (str): Path to the directory or the corpus file.
+        n (int): Size of the maps.
+        maps (Iterable[bytes]): Codes of the cells of every map.
+        start (int): Number of the first map.
+
+    Returns:
+        int: Number of the maps.
+    """
+    count = 0
+    if is_corpus(path):
+        with CorpusWriter(path, n) as writer:
+            for count, cells in enumerate(maps, 1):
+                writer.add(f"{start + count - 1}.txt", cells)
+        return count
+
+    os.makedirs(path, exist_ok=True)
+    grid = Grid(n)
+    for count, cells in enumerate(maps, 1):
+        grid.cells[:] = cells
+        with open(os.path.join(path, f"{start + count - 1}.txt"), "w") as fp:
+            fp.write("".join(row + "\n" for row in grid.rows()))
+    return count
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Converts text tests into a corpus file and back")
+    parser.add_argument(
+        "-i",
+        "--input",
+        type=str,
+        help="Directory with text tests (and answers/) or a corpus file",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help=f"Corpus file (e.g. tests{CORPUS_EXTENSION}) if the input is a directory, a directory otherwise",
+        required=True,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if is_corpus(args.input):
+        count = export_text(args.input, args.output)
+    else:
+        count = import_text(args.input, args.output)
+    print(f"{count} tests: {args.input} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
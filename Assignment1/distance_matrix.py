@@ -0,0 +1,154 @@
+from typing import List
+
+import numpy as np
+
+from grid import DIRECTIONS, INFINITY_STONE, SHIELD
+from offline import blocked_mask
+from oracle import UNREACHED, distance_fields
+
+
+# number of sources searched at once by the batched BFS
+BATCH_SIZE = 1024
+# next hop of the pairs without a move (the same cell or no path)
+NO_HOP = -1
+
+
+class DistanceMatrix:
+    """
+    All-pairs distances and next hops on a known map: one BFS from every cell (run in batches by `oracle`).
+    `distances[s, t]` is the length of the shortest path from `s` to `t` (`oracle.UNREACHED` if there is none),
+    `hops[s, t]` is the index in `grid.DIRECTIONS` of the first move of such path (`NO_HOP` if there is no move).
+    Both are (n * n, n * n) arrays of 2 and 1 bytes per pair, so the size of the map is limited by the memory
+    (19 MB for a 50x50 map). Queries are answered without searching: a distance is a lookup and a path
+    takes a lookup per move.
+    """
+
+    def __init__(self, n: int, blocked: bytearray, batch_size: int = BATCH_SIZE):
+        """
+        Args:
+            n (int): Size of the map.
+            blocked (bytearray): Cells that can not be entered (see `offline.blocked_mask`),
+                paths start in any cell, even a blocked one.
+            batch_size (int): Number of sources searched at once.
+        """
+        self.n = n
+        cells = n * n
+        passable = ~np.frombuffer(bytes(blocked), dtype=np.uint8).astype(bool).reshape(n, n)
+        self.distances = np.empty((cells, cells), dtype=np.int16)
+        for start in range(0, cells, batch_size):
+            sources = np.arange(start, min(start + batch_size, cells))
+            batch = np.broadcast_to(passable[:, :, None], (n, n, len(sources)))
+            self.distances[sources] = distance_fields(batch, sources).reshape(cells, len(sources)).T
+
+        # the first move goes to a free neighbour that is one move closer to the target
+        self.offsets = [dx * n + dy for dx, dy in DIRECTIONS]
+        xs, ys = np.divmod(np.arange(cells), n)
+        self.hops = np.full((cells, cells), NO_HOP, dtype=np.int8)
+        for start in range(0, cells, batch_size):
+            sources = np.arange(start, min(start + batch_size, cells))
+            distances = self.distances[sources]
+            hops = self.hops[sources]
+            sx, sy = xs[sources], ys[sources]
+            for direction, (dx, dy) in enumerate(DIRECTIONS):
+                inside = (0 <= sx + dx) & (sx + dx < n) & (0 <= sy + dy) & (sy + dy < n)
+                neighbours = np.where(inside, sources + self.offsets[direction], sources)
+                movable = inside & passable.reshape(-1)[neighbours]
+                closer = self.distances[neighbours] == distances - 1
+                hops[(hops == NO_HOP) & movable[:, None] & closer & (distances > 0)] = direction
+            self.hops[sources] = hops
+        # flat views for single queries (indexing the arrays costs more than the lookups themselves)
+        self._distances = self.distances.reshape(-1).data
+        self._hops = self.hops.reshape(-1).data
+
+    def distance(self, start: int, goal: int) -> int:
+        """Returns the length of the shortest path between two cells (`oracle.UNREACHED` if there is no path)."""
+        return self._distances[start * self.n * self.n + goal]
+
+    def next_hop(self, start: int, goal: int) -> int:
+        """Returns the cell of the first move of the shortest path between two cells (-1 if there is no move)."""
+        hop = self._hops[start * self.n * self.n + goal]
+        return start + self.offsets[hop] if hop != NO_HOP else -1
+
+    def path(self, start: int, goal: int) -> List[int]:
+        """Returns the cells of the shortest path between two cells after `start` (empty if there is no path).
+
+        Args:
+            start (int): Index of the start cell.
+            goal (int): Index of the goal cell.
+
+        Returns:
+            List[int]: Indices of the cells to move into one after another.
+        """
+        path: List[int] = []
+        cells, hops, offsets = self.n * self.n, self._hops, self.offsets
+        cell = start
+        while cell != goal:
+            hop = hops[cell * cells + goal]
+            if hop == NO_HOP:
+                return []
+            cell += offsets[hop]
+            path.append(cell)
+        return path
+
+
+class ShieldDistanceMatrix:
+    """
+    Distance matrices of a known map before and after the shield is picked up.
+    The shortest path between two cells either avoids the shield or goes to it first and continues with the shield,
+    so both are looked up and the shorter one is taken.
+    """
+
+    def __init__(self, n: int, cells: bytes, batch_size: int = BATCH_SIZE):
+        """
+        Args:
+            n (int): Size of the map.
+            cells (bytes): Codes of the cells.
+            batch_size (int): Number of sources searched at once.
+        """
+        self.n = n
+        self.cells = cells
+        # the last ones in row-major order, as `generate_answers.shortest_path` finds them
+        self.shield = cells.rfind(SHIELD)
+        self.infinity_stone = cells.rfind(INFINITY_STONE)
+        self.without_shield = DistanceMatrix(n, blocked_mask(n, cells), batch_size)
+        self.with_shield = DistanceMatrix(n, blocked_mask(n, cells, True), batch_size)
+
+    def through_shield(self, start: int, goal: int) -> int:
+        """Returns the length of the shortest path that picks up the shield on the way (`UNREACHED` if none)."""
+        if self.shield == -1:
+            return UNREACHED
+        to_shield = self.without_shield.distance(start, self.shield)
+        from_shield = self.with_shield.distance(self.shield, goal)
+        return to_shield + from_shield if to_shield != UNREACHED and from_shield != UNREACHED else UNREACHED
+
+    def distance(self, start: int, goal: int) -> int:
+        """Returns the length of the shortest path between two cells, maybe through the shield
+        (`UNREACHED` if there is no path)."""
+        direct = self.without_shield.distance(start, goal)
+        through_shield = self.through_shield(start, goal)
+        if through_shield != UNREACHED and (direct == UNREACHED or through_shield < direct):
+            return through_shield
+        return direct
+
+    def path(self, start: int, goal: int) -> List[int]:
+        """Returns the cells of the shortest path between two cells after `start`, maybe through the shield
+        (empty if there is no path)."""
+        direct = self.without_shield.distance(start, goal)
+        through_shield = self.through_shield(start, goal)
+        if through_shield != UNREACHED and (direct == UNREACHED or through_shield < direct):
+            return self.without_shield.path(start, self.shield) + self.with_shield.path(self.shield, goal)
+        return self.without_shield.path(start, goal)
+
+    def answer(self) -> int:
+        """Returns the length of the shortest path from (0, 0) to the Infinity Stone, maybe through the shield
+        (-1 if there is no path or the map has no shield or no stone), as `generate_answers.shortest_path` does."""
+        if self.shield == -1 or self.infinity_stone == -1:
+            return -1
+        # zero distances are not paths (the entity stands in the cell of Thanos)
+        direct = self.without_shield.distance(0, self.infinity_stone)
+        found = direct if direct > 0 else -1
+        to_shield = self.without_shield.distance(0, self.shield)
+        from_shield = self.with_shield.distance(self.shield, self.infinity_stone)
+        if to_shield > 0 and from_shield > 0 and (found < 0 or to_shield + from_shield < found):
+            found = to_shield + from_shield
+        return found
@@ -1,23 +1,30 @@
 import os
 import glob
 import collections
+from typing import Dict, Optional
 from argparse import ArgumentParser
 
+import numpy as np
+
+from answer_cache import BATCH_SIZE, CACHE_PATH, AnswerCache
+from corpus import ANSWER, CELLS_OFFSET, UNKNOWN, Corpus, is_corpus
+from oracle_table import TABLE_PATH
+
 
 N = 9  # size of the map (NxN)
 
 
-def bfs(grid, start, goal):
-    queue = collections.deque([[start]])
+def bfs(grid, start, goal, n=N):
+    # cells are queued with their distances instead of whole paths
+    queue = collections.deque([(start, 0)])
     seen = set([start])
     while queue:
-        path = queue.popleft()
-        x, y = path[-1]
+        (x, y), distance = queue.popleft()
         if (x, y) == goal:
-            return len(path) - 1
+            return distance
         for x2, y2 in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
-            if 0 <= x2 < N and 0 <= y2 < N and grid[x2][y2] in ".SI" and (x2, y2) not in seen:
-                queue.append(path + [(x2, y2)])
+            if 0 <= x2 < n and 0 <= y2 < n and grid[x2][y2] in ".SI" and (x2, y2) not in seen:
+                queue.append(((x2, y2), distance + 1))
                 seen.add((x2, y2))
     return -1
 
@@ -30,65 +37,158 @@ def vonneumann_perception_zone(point, center, r) -> bool:
     return m_dist(point, center) <= r
 
 
+def shortest_path(map_) -> Optional[int]:
+    """Returns the length of the shortest path from (0, 0) to the Infinity Stone, maybe through the shield.
+
+    Args:
+        map_: Rows of symbols (changed when the shield is considered).
+
+    Returns:
+        Optional[int]: The length (-1 if there is no path, None if the map has no stone or no shield or is not square).
+    """
+    n = len(map_)
+    stone = None
+    shield = None
+    for i in range(n):
+        for j in range(n):
+            if map_[i][j] == "I":
+                stone = (i, j)
+            if map_[i][j] == "S":
+                shield = (i, j)
+
+    if not stone or not shield or any(len(row) != n for row in map_):
+        return None
+
+    min_dist_wo_s = bfs(map_, (0, 0), stone, n)
+    min_dist = -1
+    if min_dist_wo_s > 0:
+        min_dist = min_dist_wo_s
+
+    min_dist_t_s = bfs(map_, (0, 0), shield, n)
+    if min_dist_t_s > 0:
+        marvels = []
+        for i in range(n):
+            for j in range(n):
+                if map_[i][j] == "P":
+                    map_[i][j] = "."
+                if map_[i][j] == "M":
+                    marvels.append((i, j))
+        for marvel in marvels:
+            # only cells around Captain Marvel can be in her perception zone
+            for i in range(max(0, marvel[0] - 2), min(n, marvel[0] + 3)):
+                for j in range(max(0, marvel[1] - 2), min(n, marvel[1] + 3)):
+                    if map_[i][j] != ".":
+                        continue
+                    if vonneumann_perception_zone((i, j), marvel, 2):
+                        map_[i][j] = "P"
+        min_dist_t_g = bfs(map_, shield, stone, n)
+
+        if min_dist_t_s > 0 and min_dist_t_g > 0:
+            if min_dist < 0 or min_dist_t_s + min_dist_t_g < min_dist:
+                min_dist = min_dist_t_s + min_dist_t_g
+    return min_dist
+
+
+def answer_corpus(corpus: Corpus, cache: AnswerCache, batch_size: int) -> Optional[str]:
+    """Writes the answers into the records of the corpus at once.
+
+    Args:
+        corpus (Corpus): The corpus opened as writable.
+        cache (AnswerCache): Answers of the maps that were solved before.
+        batch_size (int): Number of maps solved at once.
+
+    Returns:
+        Optional[str]: Name of an incorrect map (nothing is written then).
+    """
+    records = np.frombuffer(corpus.records, dtype=np.uint8).reshape(len(corpus), corpus.record_size)
+    answers = cache.solve(corpus.n, records[:, CELLS_OFFSET : CELLS_OFFSET + corpus.n * corpus.n], batch_size)
+    incorrect = np.flatnonzero(answers == UNKNOWN)
+    if len(incorrect):
+        return corpus.names[incorrect[0]]
+    records[:, :CELLS_OFFSET].view(ANSWER.format)[:, 0] = answers
+    return None
+
+
 def main():
     parser = ArgumentParser()
     parser.add_argument(
         "-t",
         "--tests",
         type=str,
-        help="Path to the directory where test files are located",
+        help="Path to the directory where test files are located or to a corpus file (answers are written into it)",
         required=True,
     )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        type=int,
+        help="Number of maps solved at once by the batched oracle",
+        default=BATCH_SIZE,
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        help="Path to the cache of the answers (only the maps that are not there are solved)",
+        default=CACHE_PATH,
+    )
+    parser.add_argument(
+        "--table",
+        type=str,
+        help="Path to the oracle table of 9x9 maps (built by oracle_table.py, the batched oracle is used without it)",
+        default=TABLE_PATH,
+    )
+    parser.add_argument(
+        "-r",
+        "--reference",
+        action="store_true",
+        help="Solve the maps one by one with plain BFS instead of the batched oracle (the cache is not used)",
+    )
     args = parser.parse_args()
 
+    if is_corpus(args.tests):
+        with Corpus(args.tests, writable=True) as corpus:
+            if not args.reference:
+                with AnswerCache(args.cache, args.table) as cache:
+                    incorrect = answer_corpus(corpus, cache, args.batch)
+                    print(cache.status())
+                if incorrect is not None:
+                    print(f"[ERROR] Incorrect map: {os.path.join(args.tests, incorrect)}")
+                    exit(0)
+                return
+            for index, name in enumerate(corpus.names):
+                min_dist = shortest_path([row.split() for row in corpus.grid(index).rows()])
+                if min_dist is None:
+                    print(f"[ERROR] Incorrect map: {os.path.join(args.tests, name)}")
+                    exit(0)
+                corpus.set_answer(index, min_dist)
+        return
+
     os.makedirs(os.path.join(args.tests, "answers"), exist_ok=True)
 
     tests = glob.glob(os.path.join(args.tests, "*.txt"))
-    for test in tests:
-        map_ = []
-        with open(test, "r") as ip:
-            for row in ip:
-                map_.append(row.strip().split())
-
-        stone = None
-        shield = None
-        for i in range(N):
-            for j in range(N):
-                if map_[i][j] == "I":
-                    stone = (i, j)
-                if map_[i][j] == "S":
-                    shield = (i, j)
-
-        if not stone or not shield or len(map_) != N or len(map_[0]) != N:
-            print(f"[ERROR] Incorrect map: {test}")
-            exit(0)
-
-        min_dist_wo_s = bfs(map_, (0, 0), stone)
-        min_dist = -1
-        if min_dist_wo_s > 0:
-            min_dist = min_dist_wo_s
-
-        min_dist_t_s = bfs(map_, (0, 0), shield)
-        if min_dist_t_s > 0:
-            marvel = (-1, -1)
-            for i in range(N):
-                for j in range(N):
-                    if map_[i][j] == "P":
-                        map_[i][j] = "."
-                    if map_[i][j] == "M":
-                        marvel = (i, j)
-            for i in range(N):
-                for j in range(N):
-                    if map_[i][j] != ".":
-                        continue
-                    if vonneumann_perception_zone((i, j), marvel, 2):
-                        map_[i][j] = "P"
-            min_dist_t_g = bfs(map_, shield, stone)
-
-            if min_dist_t_s > 0 and min_dist_t_g > 0:
-                if min_dist < 0 or min_dist_t_s + min_dist_t_g < min_dist:
-                    min_dist = min_dist_t_s + min_dist_t_g
-
+    answers: Dict[str, int] = {}
+    if args.reference:
+        for test in tests:
+            map_ = []
+            with open(test, "r") as ip:
+                for row in ip:
+                    map_.append(row.strip().split())
+
+            min_dist = shortest_path(map_)
+            if min_dist is None:
+                print(f"[ERROR] Incorrect map: {test}")
+                exit(0)
+            answers[test] = min_dist
+    else:
+        with AnswerCache(args.cache, args.table) as cache:
+            answers = cache.solve_tests(tests, args.batch)
+            print(cache.status())
+        for test, min_dist in answers.items():
+            if min_dist == UNKNOWN:
+                print(f"[ERROR] Incorrect map: {test}")
+                exit(0)
+
+    for test, min_dist in answers.items():
         with open(os.path.join(args.tests, "answers", test.replace("\\", "/").split("/")[-1]), "w") as op:
             op.write(str(min_dist))
 
@@ -0,0 +1,262 @@
+import time
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from argparse import ArgumentParser, Namespace
+
+import numpy as np
+
+from corpus import write_maps
+from generate_tests import avengers_count
+from grid import CAPTAIN_MARVEL, HULK, INFINITY_STONE, N, PERCEPTION, SHIELD, THOR, tables
+
+
+# number of maps drawn at once
+BATCH_SIZE = 4096
+# Avengers in the order they are placed by `generate_tests.create_map` and the names of their perception tables
+AVENGERS: Tuple[Tuple[int, str], ...] = ((THOR, "thor"), (HULK, "hulk"), (CAPTAIN_MARVEL, "marvel"))
+# constants of the 64-bit hash of the packed maps (FNV-1a multiplier and splitmix64 finalizer)
+HASH_PRIME = np.uint64(0x100000001B3)
+HASH_MIX = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+
+@lru_cache(maxsize=None)
+def zone_tables(n: int) -> Dict[int, np.ndarray]:
+    """Returns perception tables of the Avengers as arrays padded with the index `n * n` (a cell outside the map).
+
+    Args:
+        n (int): Size of the map.
+
+    Returns:
+        Dict[int, np.ndarray]: Array of shape (n * n, zone size) for the code of every Avenger.
+    """
+    table = tables(n)
+    zones = {}
+    for code, name in AVENGERS:
+        width = max(map(len, table[name]))
+        zones[code] = np.array([cells + (n * n,) * (width - len(cells)) for cells in table[name]], dtype=np.int64)
+    return zones
+
+
+@lru_cache(maxsize=None)
+def thanos_zones(n: int) -> Dict[int, np.ndarray]:
+    """Returns cells where an Avenger can not be placed, because Thanos at (0, 0) would start in its perception zone.
+
+    Args:
+        n (int): Size of the map.
+
+    Returns:
+        Dict[int, np.ndarray]: Boolean mask of shape (n * n,) for the code of every Avenger.
+    """
+    x, y = np.divmod(np.arange(n * n), n)
+    return {THOR: np.maximum(x, y) <= 1, HULK: x + y <= 1, CAPTAIN_MARVEL: x + y <= 2}
+
+
+def place(allowed: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Picks a random allowed cell in every map of the batch (uniformly, as a rejection loop would).
+
+    Args:
+        allowed (np.ndarray): Boolean mask of shape (batch, n * n).
+        rng (np.random.Generator): Source of randomness.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Index of the picked cell and whether there was any allowed cell in every map.
+    """
+    keys = np.where(allowed, rng.random(allowed.shape), -1.0)
+    cells = keys.argmax(axis=1)
+    return cells, allowed[np.arange(len(cells)), cells]
+
+
+def create_maps(n: int, avengers: int, size: int, rng: np.random.Generator) -> np.ndarray:
+    """Creates a batch of random maps with the same rules as `generate_tests.create_map`.
+    Maps where some entity could not be placed are dropped.
+
+    Args:
+        n (int): Size of the map.
+        avengers (int): Number of Avengers of each kind.
+        size (int): Number of maps to draw.
+        rng (np.random.Generator): Source of randomness.
+
+    Returns:
+        np.ndarray: Codes of the cells of shape (maps, n * n) and type uint8.
+    """
+    rows = np.arange(size)
+    maps = np.zeros((size, n * n + 1), dtype=np.uint8)
+    occupied = np.zeros((size, n * n), dtype=bool)
+    # perception zones of the Avengers (the last column is the cell outside the map)
+    perception = np.zeros((size, n * n + 1), dtype=bool)
+    valid = np.ones(size, dtype=bool)
+
+    zones, forbidden = zone_tables(n), thanos_zones(n)
+    for code, _ in AVENGERS:
+        for _ in range(avengers):
+            cells, placed = place(~occupied & ~forbidden[code], rng)
+            valid &= placed
+            occupied[rows, cells] = True
+            maps[rows, cells] = code
+            perception[rows[:, None], zones[code][cells]] = True
+
+    # the shield and the Infinity Stone are out of the perception zones and not in the cell of Thanos
+    free = ~(perception[:, :-1] | occupied)
+    free[:, 0] = False
+    shields, placed = place(free, rng)
+    valid &= placed
+    free[rows, shields] = False
+    infinity_stones, placed = place(free, rng)
+    valid &= placed
+
+    maps[perception & (maps == 0)] = PERCEPTION
+    maps[rows, shields] = SHIELD
+    maps[rows, infinity_stones] = INFINITY_STONE
+    return maps[valid, :-1]
+
+
+def pack_hash(maps: np.ndarray) -> np.ndarray:
+    """Returns 64-bit hashes of the maps: the codes are packed into 64-bit words and mixed word by word.
+
+    Args:
+        maps (np.ndarray): Codes of the cells of shape (maps, n * n) and type uint8.
+
+    Returns:
+        np.ndarray: Hash of every map (uint64).
+    """
+    width = -maps.shape[1] % 8
+    words = np.ascontiguousarray(np.pad(maps, ((0, 0), (0, width)))).view(np.uint64)
+    hashes = np.zeros(len(maps), dtype=np.uint64)
+    for column in words.T:
+        hashes = (hashes ^ column) * HASH_PRIME
+    # final avalanche, so the hashes of similar maps differ in all bits
+    hashes ^= hashes >> np.uint64(30)
+    hashes *= HASH_MIX[0]
+    hashes ^= hashes >> np.uint64(27)
+    hashes *= HASH_MIX[1]
+    hashes ^= hashes >> np.uint64(31)
+    return hashes
+
+
+class UniqueFilter:
+    """
+    Remembers hashes of the maps that were already produced (8 bytes per map) as sorted runs of disjoint hashes.
+    The hashes of every batch make a new run, and the last two runs are merged while the last one is not shorter,
+    so the runs double in length, there are O(log maps) of them, and every hash is merged O(log maps) times
+    (inserting into a single sorted array would copy all the hashes for every batch).
+    """
+
+    def __init__(self):
+        self.runs: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self.runs)
+
+    def filter(self, maps: np.ndarray) -> np.ndarray:
+        """Returns the maps that were not seen before (each of them once) and remembers them.
+
+        Args:
+            maps (np.ndarray): Codes of the cells of shape (maps, n * n).
+
+        Returns:
+            np.ndarray: New maps in the order of their first occurrence.
+        """
+        hashes, first = np.unique(pack_hash(maps), return_index=True)
+        new = np.ones(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            known = positions < len(run)
+            known[known] = run[positions[known]] == hashes[known]
+            new &= ~known
+        runs = self.runs
+        if new.any():
+            runs.append(hashes[new])
+        while len(runs) > 1 and len(runs[-1]) >= len(runs[-2]):
+            last = runs.pop()
+            # timsort finds the two sorted parts, so the sort is a merge
+            runs[-1] = np.sort(np.concatenate((runs[-1], last)), kind="stable")
+        return maps[np.sort(first[new])]
+
+
+def generate_maps(
+    count: int, n: int = N, avengers: Optional[int] = None, batch_size: int = BATCH_SIZE, seed: Optional[int] = None
+) -> Iterator[np.ndarray]:
+    """Yields batches of unique random maps until `count` maps are produced.
+
+    Args:
+        count (int): Number of maps.
+        n (int): Size of the map.
+        avengers (Optional[int]): Number of Avengers of each kind (proportional to the area of the map by default).
+        batch_size (int): Number of maps drawn at once.
+        seed (Optional[int]): Seed of the random generator (the current time by default).
+
+    Raises:
+        ValueError: If a whole batch brings no new maps (there are fewer than `count` different maps).
+
+    Yields:
+        np.ndarray: Codes of the cells of shape (maps, n * n) and type uint8.
+    """
+    if avengers is None:
+        avengers = avengers_count(n)
+    rng = np.random.default_rng(time.time_ns() if seed is None else seed)
+    unique = UniqueFilter()
+    produced = 0
+    while produced < count:
+        maps = unique.filter(create_maps(n, avengers, batch_size, rng))
+        if not len(maps):
+            raise ValueError(f"only {produced} different maps could be generated")
+        maps = maps[: count - produced]
+        produced += len(maps)
+        yield maps
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--num",
+        type=int,
+        help="Number of tests to generate",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="Path to the directory where to write test files (or to a .corpus file)",
+        required=True,
+    )
+    parser.add_argument(
+        "-s",
+        "--size",
+        type=int,
+        help="Size of the map (NxN)",
+        default=N,
+    )
+    parser.add_argument(
+        "-a",
+        "--avengers",
+        type=int,
+        help="Number of Avengers of each kind (proportional to the area of the map by default)",
+        default=None,
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        type=int,
+        help="Number of maps drawn at once",
+        default=BATCH_SIZE,
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed of the random generator (the current time by default)",
+        default=None,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    batches = generate_maps(args.num, args.size, args.avengers, args.batch, args.seed)
+    write_maps(args.output, args.size, (cells.tobytes() for batch in batches for cells in batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
-import os
 import time
-from typing import List, Set
+from typing import Iterator, List, Set, Tuple
 from random import randint, seed
 from argparse import ArgumentParser
 
+from corpus import write_maps
+from grid import Grid
+
 
 N = 9  # size of the map (NxN)
 seed(time.time())
@@ -21,50 +23,52 @@ def vonneumann_perception_zone(point, center, r) -> bool:
     return m_dist(point, center) <= r
 
 
-def create_thor(thanos=(0, 0)):
+def avengers_count(n=N) -> int:
+    # the number of Avengers of each kind grows proportionally to the area of the map
+    return max(1, round(n * n / (N * N)))
+
+
+def create_thor(occupied, n=N, thanos=(0, 0)):
     while True:
-        thor = (randint(0, N - 1), randint(0, N - 1))
-        if not moore_perception_zone(thanos, thor):
+        thor = (randint(0, n - 1), randint(0, n - 1))
+        if thor not in occupied and not moore_perception_zone(thanos, thor):
             return thor
 
 
-def create_hulk(thor, thanos=(0, 0)):
+def create_hulk(occupied, n=N, thanos=(0, 0)):
     while True:
-        hulk = (randint(0, N - 1), randint(0, N - 1))
-        if thor != hulk and not vonneumann_perception_zone(thanos, hulk, 1):
+        hulk = (randint(0, n - 1), randint(0, n - 1))
+        if hulk not in occupied and not vonneumann_perception_zone(thanos, hulk, 1):
             return hulk
 
 
-def create_captain_marvel(hulk, thor, thanos=(0, 0)):
+def create_captain_marvel(occupied, n=N, thanos=(0, 0)):
     while True:
-        captain_marvel = (randint(0, N - 1), randint(0, N - 1))
-        if (
-            hulk != captain_marvel
-            and thor != captain_marvel
-            and not vonneumann_perception_zone(thanos, captain_marvel, 2)
-        ):
+        captain_marvel = (randint(0, n - 1), randint(0, n - 1))
+        if captain_marvel not in occupied and not vonneumann_perception_zone(thanos, captain_marvel, 2):
             return captain_marvel
 
 
-def create_shield(captain_marvel, hulk, thor, thanos=(0, 0)):
+def in_perception(cell, captain_marvels, hulks, thors) -> bool:
+    return (
+        any(vonneumann_perception_zone(cell, captain_marvel, 2) for captain_marvel in captain_marvels)
+        or any(vonneumann_perception_zone(cell, hulk, 1) for hulk in hulks)
+        or any(moore_perception_zone(cell, thor) for thor in thors)
+    )
+
+
+def create_shield(captain_marvels, hulks, thors, n=N, thanos=(0, 0)):
     while True:
-        shield = (randint(0, N - 1), randint(0, N - 1))
-        if (
-            not vonneumann_perception_zone(shield, captain_marvel, 2)
-            and not vonneumann_perception_zone(shield, hulk, 1)
-            and not moore_perception_zone(shield, thor)
-            and shield != thanos
-        ):
+        shield = (randint(0, n - 1), randint(0, n - 1))
+        if not in_perception(shield, captain_marvels, hulks, thors) and shield != thanos:
             return shield
 
 
-def create_infinity_stone(shield, captain_marvel, hulk, thor, thanos=(0, 0)):
+def create_infinity_stone(shield, captain_marvels, hulks, thors, n=N, thanos=(0, 0)):
     while True:
-        infinity_stone = (randint(0, N - 1), randint(0, N - 1))
+        infinity_stone = (randint(0, n - 1), randint(0, n - 1))
         if (
-            not vonneumann_perception_zone(infinity_stone, captain_marvel, 2)
-            and not vonneumann_perception_zone(infinity_stone, hulk, 1)
-            and not moore_perception_zone(infinity_stone, thor)
+            not in_perception(infinity_stone, captain_marvels, hulks, thors)
             and infinity_stone != shield
             and infinity_stone != thanos
         ):
@@ -72,8 +76,10 @@ def create_infinity_stone(shield, captain_marvel, hulk, thor, thanos=(0, 0)):
 
 
 def populate_perception(map_, entity, center):
-    for i in range(N):
-        for j in range(N):
+    n = len(map_)
+    # only cells around the center can be in the perception zone
+    for i in range(max(0, center[0] - 2), min(n, center[0] + 3)):
+        for j in range(max(0, center[1] - 2), min(n, center[1] + 3)):
             if map_[i][j] != ".":
                 continue
             if entity == "H":
@@ -87,23 +93,39 @@ def populate_perception(map_, entity, center):
                     map_[i][j] = "P"
 
 
-def create_map() -> List[List[str]]:
-    thor = create_thor()
-    hulk = create_hulk(thor)
-    captain_marvel = create_captain_marvel(hulk, thor)
-    shield = create_shield(captain_marvel, hulk, thor)
-    infinity_stone = create_infinity_stone(shield, captain_marvel, hulk, thor)
-
-    map_ = [["." for _ in range(N)] for _ in range(N)]
-
-    map_[thor[0]][thor[1]] = "T"
-    populate_perception(map_, "T", thor)
-
-    map_[hulk[0]][hulk[1]] = "H"
-    populate_perception(map_, "H", hulk)
-
-    map_[captain_marvel[0]][captain_marvel[1]] = "M"
-    populate_perception(map_, "M", captain_marvel)
+def create_map(n=N, avengers=None) -> List[List[str]]:
+    if avengers is None:
+        avengers = avengers_count(n)
+
+    occupied: Set[Tuple[int, int]] = set()
+    thors = []
+    for _ in range(avengers):
+        thors.append(create_thor(occupied, n))
+        occupied.add(thors[-1])
+    hulks = []
+    for _ in range(avengers):
+        hulks.append(create_hulk(occupied, n))
+        occupied.add(hulks[-1])
+    captain_marvels = []
+    for _ in range(avengers):
+        captain_marvels.append(create_captain_marvel(occupied, n))
+        occupied.add(captain_marvels[-1])
+    shield = create_shield(captain_marvels, hulks, thors, n)
+    infinity_stone = create_infinity_stone(shield, captain_marvels, hulks, thors, n)
+
+    map_ = [["." for _ in range(n)] for _ in range(n)]
+
+    for thor in thors:
+        map_[thor[0]][thor[1]] = "T"
+        populate_perception(map_, "T", thor)
+
+    for hulk in hulks:
+        map_[hulk[0]][hulk[1]] = "H"
+        populate_perception(map_, "H", hulk)
+
+    for captain_marvel in captain_marvels:
+        map_[captain_marvel[0]][captain_marvel[1]] = "M"
+        populate_perception(map_, "M", captain_marvel)
 
     map_[shield[0]][shield[1]] = "S"
     map_[infinity_stone[0]][infinity_stone[1]] = "I"
@@ -124,24 +146,36 @@ def main():
         "-o",
         "--output",
         type=str,
-        help="Path to the directory where to write test files",
+        help="Path to the directory where to write test files (or to a .corpus file)",
         required=True,
     )
+    parser.add_argument(
+        "-s",
+        "--size",
+        type=int,
+        help="Size of the map (NxN)",
+        default=N,
+    )
+    parser.add_argument(
+        "-a",
+        "--avengers",
+        type=int,
+        help="Number of Avengers of each kind (proportional to the area of the map by default)",
+        default=None,
+    )
     args = parser.parse_args()
 
-    os.makedirs(args.output, exist_ok=True)
-
-    created_maps: Set[str] = set()
-    for i in range(args.num):
-        while True:
-            map_ = create_map()
-            if str(map_) not in created_maps:
-                created_maps.add(str(map_))
-                break
-
-        with open(os.path.join(args.output, f"{i}.txt"), "w") as fp:
-            for row in map_:
-                fp.write(" ".join(row) + "\n")
+    def unique_maps() -> Iterator[bytes]:
+        created_maps: Set[str] = set()
+        for _ in range(args.num):
+            while True:
+                map_ = create_map(args.size, args.avengers)
+                if str(map_) not in created_maps:
+                    created_maps.add(str(map_))
+                    break
+            yield bytes(Grid.from_rows(map_).cells)
+
+    write_maps(args.output, args.size, unique_maps())
 
 
 if __name__ == "__main__":
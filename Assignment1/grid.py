@@ -0,0 +1,181 @@
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+
+N = 9  # size of the map (NxN)
+
+
+class Character(str, Enum):
+    """
+    Enum for characters that can be found on the map:
+        Hulk, Thor, Captain Marvel, Infinity Stone, Shield, and Perception Zone.
+    Note: EMPTY and PATH are technical entities.
+    """
+
+    HULK = "H"
+    INFINITY_STONE = "I"
+    THOR = "T"
+    CAPTAIN_MARVEL = "M"
+    SHIELD = "S"
+    PERCEPTION = "P"
+    EMPTY = "."
+    PATH = "*"
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return self.value
+
+
+# small integer codes of the characters stored in `Grid.cells`
+EMPTY = 0
+HULK = 1
+INFINITY_STONE = 2
+THOR = 3
+CAPTAIN_MARVEL = 4
+SHIELD = 5
+PERCEPTION = 6
+PATH = 7
+
+# symbol of each code
+SYMBOLS = ".HITMSP*"
+# code of each symbol (both `str` and `Character` can be used as keys)
+CODES: Dict[str, int] = {symbol: code for code, symbol in enumerate(SYMBOLS)}
+# BLOCKED[code] is 1 if one can not move into a cell with such code
+BLOCKED = bytes(code in (HULK, THOR, CAPTAIN_MARVEL, PERCEPTION) for code in range(len(SYMBOLS)))
+
+# 4 directions of movement (the order defines the order of neighbours)
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+# Thor's perception zone (Moore neighbourhood of radius 1)
+THOR_ZONE = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+# Hulk's perception zone (von Neumann neighbourhood of radius 1)
+HULK_ZONE = ((1, 0), (0, 1), (-1, 0), (0, -1))
+# Captain Marvel's perception zone (von Neumann neighbourhood of radius 2)
+MARVEL_ZONE = THOR_ZONE + ((2, 0), (0, 2), (-2, 0), (0, -2))
+# Thanos' vision for each variant (including the cell Thanos is standing in)
+VISION: Dict[int, Tuple[Tuple[int, int], ...]] = {
+    1: ((0, 0),) + THOR_ZONE,
+    2: ((0, 0),) + THOR_ZONE + ((2, 2), (2, -2), (-2, 2), (-2, -2)),
+}
+
+
+def build_stencil(n: int, offsets: Iterable[Tuple[int, int]], ordered: bool = False) -> List[Tuple[int, ...]]:
+    """Builds a table with in-bound cells at `offsets` from every cell of NxN map.
+
+    Args:
+        n (int): Size of the map.
+        offsets (Iterable[Tuple[int, int]]): Offsets from the center cell.
+        ordered (bool): Whether to sort cells of every entry by their index (row-major order).
+
+    Returns:
+        List[Tuple[int, ...]]: Entry `x * n + y` holds the indices of cells around (x, y).
+    """
+    offsets = tuple(offsets)
+    table: List[Tuple[int, ...]] = []
+    for x in range(n):
+        for y in range(n):
+            cells = [(x + dx) * n + y + dy for dx, dy in offsets if 0 <= x + dx < n and 0 <= y + dy < n]
+            table.append(tuple(sorted(cells) if ordered else cells))
+    return table
+
+
+@lru_cache(maxsize=None)
+def tables(n: int) -> Dict[str, List[Tuple[int, ...]]]:
+    """Returns precomputed neighbour and perception tables for NxN map (shared between grids of the same size).
+
+    Args:
+        n (int): Size of the map.
+
+    Returns:
+        Dict[str, List[Tuple[int, ...]]]: Tables by their names.
+    """
+    return {
+        "neighbours": build_stencil(n, DIRECTIONS),
+        "thor": build_stencil(n, THOR_ZONE),
+        "hulk": build_stencil(n, HULK_ZONE),
+        "marvel": build_stencil(n, MARVEL_ZONE),
+        "vision1": build_stencil(n, VISION[1], ordered=True),
+        "vision2": build_stencil(n, VISION[2], ordered=True),
+    }
+
+
+class Grid:
+    """
+    NxN map stored as a flat `bytearray` of character codes.
+    Cell (x, y) has index `x * n + y`.
+    """
+
+    def __init__(self, n: int = N):
+        self.n = n
+        self.cells = bytearray(n * n)
+        table = tables(n)
+        # in-bound neighbours of every cell in the order of `DIRECTIONS`
+        self.neighbours = table["neighbours"]
+        # perception zones of the Avengers standing in every cell
+        self.thor_zone = table["thor"]
+        self.hulk_zone = table["hulk"]
+        self.marvel_zone = table["marvel"]
+        # cells seen by Thanos standing in every cell (in row-major order)
+        self.vision = {1: table["vision1"], 2: table["vision2"]}
+
+    @classmethod
+    def from_rows(cls, rows: List[List[str]]) -> "Grid":
+        """Creates the grid from rows of symbols.
+
+        Args:
+            rows (List[List[str]]): Rows of the map.
+
+        Returns:
+            Grid: Grid with the same content.
+        """
+        grid = cls(len(rows))
+        for x, row in enumerate(rows):
+            for y, symbol in enumerate(row):
+                grid.cells[x * grid.n + y] = CODES[symbol]
+        return grid
+
+    def copy(self) -> "Grid":
+        """Returns a copy of the grid."""
+        grid = Grid(self.n)
+        grid.cells[:] = self.cells
+        return grid
+
+    def index(self, x: int, y: int) -> int:
+        """Returns the index of cell (x, y)."""
+        return x * self.n + y
+
+    def coords(self, index: int) -> Tuple[int, int]:
+        """Returns the coordinates (x, y) of the cell with `index`."""
+        return divmod(index, self.n)
+
+    def manhattan(self, a: int, b: int) -> int:
+        """Returns manhattan distance between cells with indices `a` and `b`."""
+        ax, ay = divmod(a, self.n)
+        bx, by = divmod(b, self.n)
+        return abs(ax - bx) + abs(ay - by)
+
+    def find(self, code: int) -> int:
+        """Returns the index of the first cell with `code` (-1 if there is no such cell)."""
+        return self.cells.find(code)
+
+    def replace(self, old: int, new: int) -> None:
+        """Replaces all cells with `old` code by `new` code."""
+        self.cells[:] = self.cells.replace(bytes((old,)), bytes((new,)))
+
+    def neighbours_towards(self, goal: int) -> List[Tuple[int, ...]]:
+        """Returns neighbours of every cell sorted by their manhattan distance to `goal`.
+
+        Args:
+            goal (int): Index of the goal cell.
+
+        Returns:
+            List[Tuple[int, ...]]: Entry `i` holds sorted neighbours of cell `i`.
+        """
+        return [tuple(sorted(cells, key=lambda cell: self.manhattan(cell, goal))) for cells in self.neighbours]
+
+    def rows(self) -> List[str]:
+        """Returns the rows of the map as strings of space separated symbols."""
+        n = self.n
+        return [" ".join(SYMBOLS[code] for code in self.cells[x * n : (x + 1) * n]) for x in range(n)]
@@ -0,0 +1,191 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from bitboard import Bitboard
+from grid import CAPTAIN_MARVEL, EMPTY, HULK, INFINITY_STONE, PERCEPTION, SHIELD, THOR, Grid
+
+
+class IllegalMove(Exception):
+    """
+    Raised when Thanos tries to make a move that is not allowed.
+    """
+
+    def __init__(self, message: str, curr: Tuple[int, int], future: Tuple[int, int]):
+        """
+        Args:
+            message (str): Why the move is not allowed.
+            curr (Tuple[int, int]): Cell Thanos is standing in.
+            future (Tuple[int, int]): Cell Thanos tried to move into.
+        """
+        super().__init__(message)
+        self.message = message
+        self.curr = curr
+        self.future = future
+
+
+def m_dist(this, other) -> int:
+    return abs(this[0] - other[0]) + abs(this[1] - other[1])
+
+
+class GridMap:
+    """
+    Map of the interactor as a grid of codes.
+    Kept only for benchmarking against `bitboard.Bitboard`.
+    """
+
+    def __init__(self, grid: Grid):
+        """
+        Args:
+            grid (Grid): Map with all the entities (it is not changed).
+        """
+        self.grid = grid.copy()
+        self.captain_marvels = [index for index, code in enumerate(grid.cells) if code == CAPTAIN_MARVEL]
+
+    def code(self, index: int) -> int:
+        """Returns the code of the entity in cell `index`."""
+        return self.grid.cells[index]
+
+    def pick_up_shield(self) -> None:
+        """Removes all the perception zones but Captain Marvel's ones."""
+        grid = self.grid
+        grid.replace(PERCEPTION, EMPTY)
+        for captain_marvel in self.captain_marvels:
+            for index in grid.marvel_zone[captain_marvel]:
+                if grid.cells[index] == EMPTY:
+                    grid.cells[index] = PERCEPTION
+
+    def surroundings(self, index: int, variant_number: int) -> List[Tuple[int, int]]:
+        """Returns what Thanos sees standing in the cell `index`.
+
+        Args:
+            index (int): Index of the cell.
+            variant_number (int): Thanos' perception variant.
+
+        Returns:
+            List[Tuple[int, int]]: Index and code of every non-empty cell in sight.
+        """
+        cells = self.grid.cells
+        return [(seen, cells[seen]) for seen in self.grid.vision[variant_number][index] if cells[seen] != EMPTY]
+
+
+# map engines of the interactor by their names
+ENGINES: Dict[str, Callable[[Grid], Any]] = {
+    "bitboard": Bitboard,
+    "grid": GridMap,
+}
+
+
+class Interactor:
+    """
+    Interactor of the task: knows the whole map, validates the moves of Thanos and reports what he sees.
+    It implements `protocol.Channel`, so a solver imported into the same process can talk to it directly
+    instead of the standard streams.
+    """
+
+    def __init__(self, grid: Grid, variant_number: int, engine: str = "bitboard"):
+        """
+        Args:
+            grid (Grid): Map with all the entities (it is not changed).
+            variant_number (int): Thanos' perception variant.
+            engine (str): Name of the map engine (see `ENGINES`).
+        """
+        self.grid = grid
+        self.variant_number = variant_number
+        # current state of the map (the perception zones change when the shield is picked up)
+        self.map = ENGINES[engine](grid)
+        self.infinity_stone = grid.find(INFINITY_STONE)
+        # cell Thanos is standing in
+        self.position = (0, 0)
+        # number of moves made by Thanos
+        self.moves = 0
+        # the answer of the solver (None until it is given)
+        self.result: Optional[int] = None
+        # whether the answer is proven to be the shortest (False for a best effort answer)
+        self.proven = True
+        # surroundings after the moves that are not received by the solver yet
+        self._replies: Deque[List[Tuple[int, int]]] = deque()
+
+    def check(self, move_cell: Tuple[int, int]) -> Optional[str]:
+        """Returns why Thanos can not move into `move_cell` (None if the move is legal).
+
+        Args:
+            move_cell (Tuple[int, int]): Coordinates of the cell.
+
+        Returns:
+            Optional[str]: Error message.
+        """
+        grid = self.grid
+        if m_dist(move_cell, self.position) > 1:
+            return "Can't teleport"
+        if not (0 <= move_cell[0] < grid.n and 0 <= move_cell[1] < grid.n):
+            return "Can't move outside the map"
+        code = self.map.code(grid.index(*move_cell))
+        if code in (CAPTAIN_MARVEL, HULK, THOR):
+            return "Can't move into a cell with Avengers"
+        if code == PERCEPTION:
+            return "Can't move into perception zone of Avengers"
+        return None
+
+    def step(self, move_cell: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Moves Thanos into `move_cell` and returns what he sees there.
+
+        Args:
+            move_cell (Tuple[int, int]): Coordinates of the cell.
+
+        Raises:
+            IllegalMove: If the move is not allowed.
+
+        Returns:
+            List[Tuple[int, int]]: Index and code of every non-empty cell in sight.
+        """
+        error = self.check(move_cell)
+        if error:
+            raise IllegalMove(error, self.position, move_cell)
+        self.position = move_cell
+        self.moves += 1
+        index = self.grid.index(*move_cell)
+        if self.map.code(index) == SHIELD:
+            self.map.pick_up_shield()
+        return self.map.surroundings(index, self.variant_number)
+
+    def read_task(self) -> Tuple[int, int]:
+        """Returns the variant of Thanos' vision and the index of the cell with the Infinity Stone."""
+        return self.variant_number, self.infinity_stone
+
+    def send_moves(self, path: List[int]) -> None:
+        """Moves Thanos along `path` (cells are given by their indices).
+
+        Args:
+            path (List[int]): Indices of the cells to move into one after another.
+
+        Raises:
+            IllegalMove: If a move is not allowed.
+        """
+        for cell in path:
+            self._replies.append(self.step(self.grid.coords(cell)))
+
+    def receive(self) -> List[Tuple[int, int]]:
+        """Returns the surroundings after the earliest move that is not received yet."""
+        return self._replies.popleft()
+
+    def move(self, path: List[int]) -> List[List[Tuple[int, int]]]:
+        """Moves Thanos along `path` and returns the surroundings after every move.
+
+        Args:
+            path (List[int]): Indices of the cells to move into one after another.
+
+        Returns:
+            List[List[Tuple[int, int]]]: Index and code of every reported cell for every move.
+        """
+        self.send_moves(path)
+        return [self.receive() for _ in path]
+
+    def answer(self, length: int, proven: bool = True) -> None:
+        """Remembers the answer of the solver.
+
+        Args:
+            length (int): Length of the shortest path (-1 if it does not exist).
+            proven (bool): Whether the path is proven to be the shortest (a best effort answer otherwise).
+        """
+        self.result = length
+        self.proven = proven
@@ -0,0 +1,354 @@
+import time
+import heapq
+from typing import Callable, Dict, List, Optional
+from argparse import ArgumentParser, Namespace
+
+import numpy as np
+
+from corpus import list_tests, load_test
+from grid import CAPTAIN_MARVEL, EMPTY, HULK, INFINITY_STONE, PERCEPTION, SHIELD, THOR, tables
+
+
+def blocked_mask(n: int, cells: bytes, with_shield: bool = False) -> bytearray:
+    """Returns the cells of a complete map that can not be entered.
+    With the shield the perception zones are gone except Captain Marvel's ones,
+    which are painted over the empty cells again (as `generate_answers.shortest_path` does).
+
+    Args:
+        n (int): Size of the map.
+        cells (bytes): Codes of the cells.
+        with_shield (bool): Whether the shield is picked up.
+
+    Returns:
+        bytearray: `blocked[i]` is 1 if cell `i` can not be entered.
+    """
+    if not with_shield:
+        return bytearray(code in (HULK, THOR, CAPTAIN_MARVEL, PERCEPTION) for code in cells)
+    blocked = bytearray(code in (HULK, THOR, CAPTAIN_MARVEL) for code in cells)
+    marvel_zone = tables(n)["marvel"]
+    for marvel, code in enumerate(cells):
+        if code == CAPTAIN_MARVEL:
+            for cell in marvel_zone[marvel]:
+                if cells[cell] in (EMPTY, PERCEPTION):
+                    blocked[cell] = 1
+    return blocked
+
+
+class Board:
+    """
+    Free cells of a map surrounded by a border of blocked cells, so the searches step from cell to cell
+    without checking the bounds. Cell (x, y) of the map has index `(x + 1) * width + y + 1` on the board.
+    """
+
+    def __init__(self, n: int, blocked: bytearray):
+        """
+        Args:
+            n (int): Size of the map.
+            blocked (bytearray): Blocked cells of the map (see `blocked_mask`).
+        """
+        self.n = n
+        self.width = width = n + 2
+        self.free = bytearray(width * width)
+        for x in range(n):
+            row = blocked[x * n : (x + 1) * n]
+            self.free[(x + 1) * width + 1 : (x + 1) * width + 1 + n] = row.translate(bytes((1, 0)) + bytes(254))
+        self._stops: Optional[Dict[int, bytes]] = None
+
+    def index(self, cell: int) -> int:
+        """Returns the index on the board of the cell of the map with index `cell` (`x * n + y`)."""
+        x, y = divmod(cell, self.n)
+        return (x + 1) * self.width + y + 1
+
+    @property
+    def stops(self) -> Dict[int, bytes]:
+        """Cells where the jumps of Jump Point Search stop (built on the first use).
+        A jump moving by `step` stops in a blocked cell, in a cell with a free cell at its side while the one before
+        that is blocked (a forced neighbour) and, when moving vertically, in a cell from which a horizontal jump stops
+        in a free cell. `stops[step][i]` is 1 if the jump stops in the cell, horizontal ones are indexed
+        as the board and vertical ones by `y * width + x` (column after column), so a jump is a single `find`.
+        """
+        if self._stops is None:
+            width = self.width
+            free = np.frombuffer(self.free, dtype=np.uint8).reshape(width, width).astype(bool)
+
+            def at(dx: int, dy: int) -> np.ndarray:
+                # free[x + dx, y + dy] for every cell (x, y) (the border of the board is never shifted in)
+                return np.roll(free, (-dx, -dy), axis=(0, 1))
+
+            blocked = ~free
+            right = blocked | (at(1, 0) & ~at(1, -1)) | (at(-1, 0) & ~at(-1, -1))
+            left = blocked | (at(1, 0) & ~at(1, 1)) | (at(-1, 0) & ~at(-1, 1))
+            # the first cell where a jump to the right (to the left) from every cell stops
+            columns = np.arange(width)
+            next_right = np.minimum.accumulate(np.where(right, columns, width - 1)[:, ::-1], axis=1)[:, ::-1]
+            next_left = np.maximum.accumulate(np.where(left, columns, 0), axis=1)
+            rows = np.arange(width)[:, None]
+            turns = np.zeros_like(free)
+            turns[:, 1:-1] = free[rows, next_right[:, 2:]] | free[rows, next_left[:, :-2]]
+            down = blocked | (at(0, 1) & ~at(-1, 1)) | (at(0, -1) & ~at(-1, -1)) | turns
+            up = blocked | (at(0, 1) & ~at(1, 1)) | (at(0, -1) & ~at(1, -1)) | turns
+            self._stops = {
+                1: right.astype(np.uint8).tobytes(),
+                -1: left.astype(np.uint8).tobytes(),
+                width: down.T.astype(np.uint8).tobytes(),
+                -width: up.T.astype(np.uint8).tobytes(),
+            }
+        return self._stops
+
+
+def bfs(board: Board, start: int, goal: int) -> int:
+    """Returns the length of the shortest path by breadth-first search (-1 if there is no path).
+
+    Args:
+        board (Board): The board.
+        start (int): Index of the start cell on the board (it does not have to be free).
+        goal (int): Index of the goal cell on the board.
+
+    Returns:
+        int: Number of moves.
+    """
+    width = board.width
+    # free cells that are not reached yet are marked with 1
+    reached = bytearray(board.free)
+    reached[start] = 0
+    frontier = [start]
+    step = 0
+    while frontier:
+        if goal in frontier:
+            return step
+        step += 1
+        expanded = []
+        for cell in frontier:
+            for neighbour in (cell + 1, cell - 1, cell + width, cell - width):
+                if reached[neighbour]:
+                    reached[neighbour] = 0
+                    expanded.append(neighbour)
+        frontier = expanded
+    return -1
+
+
+def a_star(board: Board, start: int, goal: int) -> int:
+    """Returns the length of the shortest path by A* with the manhattan distance (-1 if there is no path).
+
+    Args:
+        board (Board): The board.
+        start (int): Index of the start cell on the board (it does not have to be free).
+        goal (int): Index of the goal cell on the board.
+
+    Returns:
+        int: Number of moves.
+    """
+    free, width = board.free, board.width
+    gx, gy = divmod(goal, width)
+    distance = {start: 0}
+    open_list = [(abs(start // width - gx) + abs(start % width - gy), 0, start)]
+    while open_list:
+        _, d, cell = heapq.heappop(open_list)
+        if cell == goal:
+            return d
+        # the cell was reached by a shorter path after this entry was pushed
+        if d > distance[cell]:
+            continue
+        for neighbour in (cell + 1, cell - 1, cell + width, cell - width):
+            if free[neighbour] and d + 1 < distance.get(neighbour, d + 2):
+                distance[neighbour] = d + 1
+                x, y = divmod(neighbour, width)
+                heapq.heappush(open_list, (d + 1 + abs(x - gx) + abs(y - gy), d + 1, neighbour))
+    return -1
+
+
+def jump(board: Board, stops: Dict[int, bytes], cell: int, step: int, goal: int) -> int:
+    """Moves from `cell` by `step` until the jump stops (see `Board.stops`) or passes the goal,
+    and returns the cell where it stopped (a jump point).
+    Moving vertically, the cell in the row of the goal is a jump point if a horizontal jump from it reaches the goal.
+
+    Args:
+        board (Board): The board.
+        stops (Dict[int, bytes]): Stops of the jumps on the board (`board.stops`).
+        cell (int): Index of the cell the jump starts from.
+        step (int): Difference of the indices of two consecutive cells (1, -1, `width` or `-width`).
+        goal (int): Index of the goal cell.
+
+    Returns:
+        int: Index of the jump point (-1 if the jump ends in a blocked cell).
+    """
+    width = board.width
+    if step == 1:
+        stop = stops[1].find(1, cell + 1)
+        if cell < goal <= stop:
+            return goal
+    elif step == -1:
+        stop = stops[-1].rfind(1, 0, cell)
+        if stop <= goal < cell:
+            return goal
+    else:
+        x, y = divmod(cell, width)
+        gx, gy = divmod(goal, width)
+        if step > 0:
+            sx = stops[width].find(1, y * width + x + 1) - y * width
+            ahead = x < gx < sx
+        else:
+            sx = stops[-width].rfind(1, 0, y * width + x) - y * width
+            ahead = sx < gx < x
+        if y == gy and (ahead or gx == sx):
+            return goal
+        if ahead and jump(board, stops, gx * width + y, 1 if gy > y else -1, goal) == goal:
+            return gx * width + y
+        stop = sx * width + y
+    return stop if board.free[stop] else -1
+
+
+def jump_point_search(board: Board, start: int, goal: int) -> int:
+    """Returns the length of the shortest path by Jump Point Search on the 4-connected grid (-1 if there is no path).
+    Only jump points are pushed to the open list, and a jump point is expanded in every direction except back.
+    The cells between two jump points are on a straight line, so the distance between them is their manhattan one.
+
+    Args:
+        board (Board): The board.
+        start (int): Index of the start cell on the board (it does not have to be free).
+        goal (int): Index of the goal cell on the board.
+
+    Returns:
+        int: Number of moves.
+    """
+    # jumps stop at blocked cells as well, so a blocked goal would be reached by them
+    if goal != start and not board.free[goal]:
+        return -1
+    width, stops = board.width, board.stops
+    gx, gy = divmod(goal, width)
+    distance = {start: 0}
+    closed = set()
+    # entries are the estimate, the distance, the cell and the step it was reached with (0 for the start)
+    open_list = [(abs(start // width - gx) + abs(start % width - gy), 0, start, 0)]
+    while open_list:
+        _, d, cell, arrival = heapq.heappop(open_list)
+        if cell == goal:
+            return d
+        if cell in closed:
+            continue
+        closed.add(cell)
+        for step in (1, -1, width, -width):
+            if step == -arrival:
+                continue
+            point = jump(board, stops, cell, step, goal)
+            if point == -1:
+                continue
+            length = d + abs(point - cell) // abs(step)
+            if length < distance.get(point, length + 1):
+                distance[point] = length
+                x, y = divmod(point, width)
+                heapq.heappush(open_list, (length + abs(x - gx) + abs(y - gy), length, point, step))
+    return -1
+
+
+# searches for the shortest path between two cells of a board
+SEARCHES: Dict[str, Callable[[Board, int, int], int]] = {
+    "jps": jump_point_search,
+    "a_star": a_star,
+    "bfs": bfs,
+}
+
+
+class KnownMap:
+    """
+    Complete map known in advance, solved without the interactor.
+    The free cells before and after the shield is picked up are kept as two boards.
+    """
+
+    def __init__(self, n: int, cells: bytes):
+        """
+        Args:
+            n (int): Size of the map.
+            cells (bytes): Codes of the cells.
+        """
+        self.n = n
+        self.cells = cells
+        self.boards = {with_shield: Board(n, blocked_mask(n, cells, with_shield)) for with_shield in (False, True)}
+
+    @classmethod
+    def load(cls, test: str) -> "KnownMap":
+        """Loads the map of a test: a text file or a record of a corpus (see `corpus.list_tests`).
+
+        Raises:
+            ValueError: If the map contains an incorrect entity or is not square.
+        """
+        return cls(*load_test(test))
+
+    def distance(self, start: int, goal: int, with_shield: bool = False, search: str = "jps") -> int:
+        """Returns the length of the shortest path between two cells (-1 if there is no path).
+
+        Args:
+            start (int): Index of the start cell (`x * n + y`).
+            goal (int): Index of the goal cell.
+            with_shield (bool): Whether the shield is picked up.
+            search (str): Name of the search (see `SEARCHES`).
+
+        Returns:
+            int: Number of moves.
+        """
+        board = self.boards[with_shield]
+        return SEARCHES[search](board, board.index(start), board.index(goal))
+
+    def answer(self, search: str = "jps") -> int:
+        """Returns the length of the shortest path from (0, 0) to the Infinity Stone, maybe through the shield.
+
+        Args:
+            search (str): Name of the search (see `SEARCHES`).
+
+        Raises:
+            ValueError: If the map has no shield or no Infinity Stone.
+
+        Returns:
+            int: The length (-1 if there is no path).
+        """
+        # the last ones in row-major order, as `generate_answers.shortest_path` finds them
+        stone, shield = self.cells.rfind(INFINITY_STONE), self.cells.rfind(SHIELD)
+        if stone == -1 or shield == -1:
+            raise ValueError("The map has no shield or no Infinity Stone")
+        # zero distances are not paths (the entity stands in the cell of Thanos)
+        found = self.distance(0, stone, search=search)
+        found = found if found > 0 else -1
+        to_shield = self.distance(0, shield, search=search)
+        if to_shield > 0:
+            through_shield = self.distance(shield, stone, True, search)
+            if through_shield > 0 and (found < 0 or to_shield + through_shield < found):
+                found = to_shield + through_shield
+        return found
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Solves complete maps without the interactor")
+    parser.add_argument(
+        "-t",
+        "--tests",
+        type=str,
+        help="Path to the tests folder, a corpus file (see corpus.py) or a single file",
+        required=True,
+    )
+    parser.add_argument(
+        "-s",
+        "--search",
+        type=str,
+        choices=list(SEARCHES),
+        help="Search for the shortest paths: Jump Point Search, plain A* or BFS",
+        default="jps",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    tests: List[str] = list_tests(args.tests)
+    start_time = time.perf_counter()
+    for test in tests:
+        try:
+            answer = KnownMap.load(test).answer(args.search)
+        except ValueError as error:
+            print(f"[ERROR] {test}: {error}")
+            continue
+        print(f"{test} {answer}")
+    print(f"[INFO] Solved {len(tests)} maps in {time.perf_counter() - start_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
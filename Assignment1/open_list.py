@@ -0,0 +1,147 @@
+import heapq
+from queue import PriorityQueue
+from typing import Any, Callable, Dict, Generic, List, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class HeapOpenList(Generic[T]):
+    """
+    Open list based on a plain binary heap (`heapq`).
+    Unlike `queue.PriorityQueue` it does not take a lock on every operation.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[int, T]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, priority: int, item: T) -> None:
+        """Adds `item` with `priority` to the open list.
+
+        Args:
+            priority (int): Priority of the item (lower is popped first).
+            item (T): Item itself.
+        """
+        heapq.heappush(self._heap, (priority, item))
+
+    def pop(self) -> Tuple[int, T]:
+        """Removes and returns the item with the lowest priority.
+
+        Returns:
+            Tuple[int, T]: Priority and the item.
+        """
+        return heapq.heappop(self._heap)
+
+    def peek(self) -> int:
+        """Returns the lowest priority in the open list without removing the item.
+
+        Returns:
+            int: The lowest priority.
+        """
+        return self._heap[0][0]
+
+
+class BucketOpenList(Generic[T]):
+    """
+    Open list based on a bucket queue for small non-negative integer priorities.
+    Items with the same priority are popped in LIFO order.
+    Both `push` and `pop` work in amortized O(1) when priorities are monotone (as in A* with a consistent heuristic).
+    """
+
+    def __init__(self) -> None:
+        self._buckets: List[List[T]] = []
+        # index of the lowest bucket that may be non-empty
+        self._lowest = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, priority: int, item: T) -> None:
+        """Adds `item` with `priority` to the open list.
+
+        Args:
+            priority (int): Priority of the item (lower is popped first), must be non-negative.
+            item (T): Item itself.
+        """
+        if priority >= len(self._buckets):
+            self._buckets.extend([] for _ in range(priority + 1 - len(self._buckets)))
+        self._buckets[priority].append(item)
+        if priority < self._lowest:
+            self._lowest = priority
+        self._size += 1
+
+    def pop(self) -> Tuple[int, T]:
+        """Removes and returns the item with the lowest priority.
+
+        Returns:
+            Tuple[int, T]: Priority and the item.
+        """
+        if not self._size:
+            raise IndexError("pop from an empty open list")
+        while not self._buckets[self._lowest]:
+            self._lowest += 1
+        self._size -= 1
+        return self._lowest, self._buckets[self._lowest].pop()
+
+    def peek(self) -> int:
+        """Returns the lowest priority in the open list without removing the item.
+
+        Returns:
+            int: The lowest priority.
+        """
+        if not self._size:
+            raise IndexError("peek from an empty open list")
+        while not self._buckets[self._lowest]:
+            self._lowest += 1
+        return self._lowest
+
+
+class PriorityQueueOpenList(Generic[T]):
+    """
+    Open list based on `queue.PriorityQueue`.
+    Kept only for benchmarking against the other open lists.
+    """
+
+    def __init__(self) -> None:
+        self._queue: PriorityQueue = PriorityQueue()
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def push(self, priority: int, item: T) -> None:
+        """Adds `item` with `priority` to the open list.
+
+        Args:
+            priority (int): Priority of the item (lower is popped first).
+            item (T): Item itself.
+        """
+        self._queue.put((priority, item))
+
+    def pop(self) -> Tuple[int, T]:
+        """Removes and returns the item with the lowest priority.
+
+        Returns:
+            Tuple[int, T]: Priority and the item.
+        """
+        return self._queue.get()
+
+    def peek(self) -> int:
+        """Returns the lowest priority in the open list without removing the item.
+
+        Returns:
+            int: The lowest priority.
+        """
+        with self._queue.mutex:
+            return self._queue.queue[0][0]
+
+
+# available open lists by their names
+OPEN_LISTS: Dict[str, Callable[[], Any]] = {
+    "bucket": BucketOpenList,
+    "heap": HeapOpenList,
+    "queue": PriorityQueueOpenList,
+}
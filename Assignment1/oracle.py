@@ -0,0 +1,107 @@
+import numpy as np
+
+from grid import CAPTAIN_MARVEL, EMPTY, INFINITY_STONE, MARVEL_ZONE, PERCEPTION, SHIELD
+
+
+# distance of the cells that are not reached
+UNREACHED = -1
+
+
+def last_cell(mask: np.ndarray) -> np.ndarray:
+    """Returns the last marked cell in row-major order of every map (as `generate_answers.shortest_path` finds it).
+
+    Args:
+        mask (np.ndarray): Boolean array of shape (batch, n * n), every map has a marked cell.
+
+    Returns:
+        np.ndarray: Index of the cell in every map.
+    """
+    return mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+
+
+def shift_or(target: np.ndarray, source: np.ndarray, offsets) -> None:
+    """ORs `source` shifted by every offset into `target` (cells shifted outside the map are dropped).
+
+    Args:
+        target (np.ndarray): Boolean array of shape (n, n, batch) to update.
+        source (np.ndarray): Boolean array of the same shape.
+        offsets: Offsets (dx, dy) of the shifts.
+    """
+    n = source.shape[0]
+    for dx, dy in offsets:
+        if abs(dx) >= n or abs(dy) >= n:
+            continue
+        target[max(dx, 0) : n + min(dx, 0), max(dy, 0) : n + min(dy, 0)] |= source[
+            max(-dx, 0) : n - max(dx, 0), max(-dy, 0) : n - max(dy, 0)
+        ]
+
+
+def distance_fields(passable: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    """Runs BFS in every map of the batch at once: the frontiers of all maps are expanded together by array shifts.
+    The batch is the last axis, so every shift moves contiguous blocks of memory.
+
+    Args:
+        passable (np.ndarray): Boolean array of shape (n, n, batch) with the cells that can be entered.
+        sources (np.ndarray): Index of the start cell (`x * n + y`) in every map, it is reached even if not passable.
+
+    Returns:
+        np.ndarray: Distance from the start to every cell (`UNREACHED` if there is no path) of shape (n, n, batch).
+    """
+    n, _, batch = passable.shape
+    distances = np.full(passable.shape, UNREACHED, dtype=np.int32)
+    frontier = np.zeros(passable.shape, dtype=bool)
+    frontier.reshape(n * n, batch)[sources, np.arange(batch)] = True
+    reached = frontier.copy()
+    step = 0
+    while frontier.any():
+        distances[frontier] = step
+        expanded = np.zeros_like(frontier)
+        shift_or(expanded, frontier, ((1, 0), (-1, 0), (0, 1), (0, -1)))
+        frontier = expanded & passable & ~reached
+        reached |= frontier
+        step += 1
+    return distances
+
+
+def shortest_paths(maps: np.ndarray, n: int) -> np.ndarray:
+    """Returns the answers of the maps: the length of the shortest path from (0, 0) to the Infinity Stone,
+    maybe through the shield (-1 if there is no path).
+    Distances without the shield and after it are found in the same pass over a batch of twice the size.
+
+    Args:
+        maps (np.ndarray): Codes of the cells of shape (batch, n * n), every map has the shield and the stone.
+        n (int): Size of the maps.
+
+    Returns:
+        np.ndarray: Answer of every map (int32).
+    """
+    batch = len(maps)
+    rows = np.arange(batch)
+    stones = last_cell(maps == INFINITY_STONE)
+    shields = last_cell(maps == SHIELD)
+
+    cells = np.ascontiguousarray(maps.T).reshape(n, n, batch)
+    targets = (cells == SHIELD) | (cells == INFINITY_STONE)
+    free = cells == EMPTY
+    # with the shield only Captain Marvel's perception zones stay (they are painted over the empty cells only)
+    marvel_zones = np.zeros_like(free)
+    shift_or(marvel_zones, cells == CAPTAIN_MARVEL, MARVEL_ZONE)
+    without_perception = free | (cells == PERCEPTION)
+    passable = np.concatenate((free | targets, (without_perception & ~marvel_zones) | targets), axis=2)
+
+    distances = distance_fields(passable, np.concatenate((np.zeros(batch, dtype=np.int64), shields)))
+    distances = distances.reshape(n * n, 2 * batch)
+    to_stone, to_shield = distances[stones, rows], distances[shields, rows]
+    through_shield = distances[stones, rows + batch]
+
+    # zero distances are not paths (the entity stands in the cell of Thanos)
+    answers = np.where(to_stone > 0, to_stone, -1)
+    with_shield = (to_shield > 0) & (through_shield > 0)
+    length = to_shield + through_shield
+    improves = with_shield & ((answers < 0) | (length < answers))
+    return np.where(improves, length, answers).astype(np.int32)
+
+
+def incorrect_maps(maps: np.ndarray) -> np.ndarray:
+    """Returns the indices of the maps without the shield or without the Infinity Stone."""
+    return np.flatnonzero(~((maps == SHIELD).any(axis=1) & (maps == INFINITY_STONE).any(axis=1)))
@@ -0,0 +1,261 @@
+import os
+import time
+from functools import lru_cache, partial
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Set, Tuple
+from argparse import ArgumentParser, Namespace
+
+import numpy as np
+
+from corpus import UNKNOWN
+from grid import CAPTAIN_MARVEL, EMPTY, HULK, INFINITY_STONE, PERCEPTION, SHIELD, THOR, tables
+from oracle import UNREACHED, distance_fields, shortest_paths
+
+
+# size of the maps covered by the table
+TABLE_N = 9
+# default location of the table (next to the scripts)
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "oracle_9x9.npy")
+# Avengers in the order of the axes of the table and the names of their perception tables
+AVENGERS = ((THOR, "thor"), (HULK, "hulk"), (CAPTAIN_MARVEL, "marvel"))
+
+
+@lru_cache(maxsize=None)
+def zone_masks(n: int) -> Dict[int, np.ndarray]:
+    """Returns the perception zones of the Avengers as boolean arrays.
+
+    Args:
+        n (int): Size of the map.
+
+    Returns:
+        Dict[int, np.ndarray]: Array of shape (n * n, n * n) for the code of every Avenger,
+            row `i` is the zone around `i`.
+    """
+    table = tables(n)
+    masks = {}
+    for code, name in AVENGERS:
+        masks[code] = np.zeros((n * n, n * n), dtype=bool)
+        for cell, zone in enumerate(table[name]):
+            masks[code][cell, list(zone)] = True
+    return masks
+
+
+def build_thor(path: str, thor: int) -> int:
+    """Fills the distance fields of all the maps with Thor in the cell `thor` (a task of the process pool).
+
+    Args:
+        path (str): Path to the table.
+        thor (int): Index of Thor's cell.
+
+    Returns:
+        int: Index of Thor's cell.
+    """
+    n = TABLE_N
+    cells = n * n
+    zones = zone_masks(n)
+    hulks, marvels = np.divmod(np.arange(cells * cells), cells)
+    # maps without Thanos' start among the Avengers and with every Avenger in its own cell
+    valid = (hulks != thor) & (marvels != thor) & (hulks != marvels)
+    blocked = zones[THOR][thor] | zones[HULK][hulks] | zones[CAPTAIN_MARVEL][marvels]
+    rows = np.arange(len(hulks))
+    blocked[:, thor] = True
+    blocked[rows, hulks] = True
+    blocked[rows, marvels] = True
+    # the shield and the stone stand in free cells, so they do not change the fields
+    passable = np.ascontiguousarray((~blocked).T).reshape(n, n, len(hulks))
+    fields = distance_fields(passable, np.zeros(len(hulks), dtype=np.int64)).reshape(cells, len(hulks)).T
+    fields[~valid] = UNREACHED
+
+    table = np.load(path, mmap_mode="r+")
+    table[thor] = fields.reshape(cells, cells, cells)
+    table.flush()
+    return thor
+
+
+def build(path: str = TABLE_PATH, jobs: Optional[int] = None) -> None:
+    """Builds the table: distances from (0, 0) without the shield for every placement of Thor, Hulk and Captain Marvel.
+
+    Args:
+        path (str): Path to the table (a `.npy` file).
+        jobs (Optional[int]): Number of processes (all the cores by default).
+    """
+    cells = TABLE_N * TABLE_N
+    table = np.lib.format.open_memmap(path, mode="w+", dtype=np.int8, shape=(cells, cells, cells, cells))
+    del table
+    with Pool(jobs) as pool:
+        for _ in pool.imap_unordered(partial(build_thor, path), range(cells)):
+            pass
+
+
+def distance(start: int, goal: int, blocked: Set[int], neighbours: List[Tuple[int, ...]]) -> int:
+    """Returns the length of the shortest path between two cells found by BFS (`UNREACHED` if there is no path).
+
+    Args:
+        start (int): Index of the start cell.
+        goal (int): Index of the goal cell.
+        blocked (Set[int]): Cells that can not be entered.
+        neighbours (List[Tuple[int, ...]]): Neighbours of every cell (`grid.tables`).
+
+    Returns:
+        int: Number of moves.
+    """
+    seen = set(blocked)
+    seen.add(start)
+    frontier = [start]
+    step = 0
+    while frontier:
+        if goal in frontier:
+            return step
+        step += 1
+        expanded = []
+        for cell in frontier:
+            for neighbour in neighbours[cell]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    expanded.append(neighbour)
+        frontier = expanded
+    return UNREACHED
+
+
+class OracleTable:
+    """
+    Answers of 9x9 maps with one Avenger of each kind looked up in the precomputed table.
+    `table[thor, hulk, marvel]` is the distance field from (0, 0) without the shield, so the answer without the shield
+    is a single lookup. The path through the shield also needs the distance from the shield to the stone after
+    the shield is picked up, which depends on both cells, so only maps where the shield can make the path shorter
+    (by the manhattan bound) are solved by the batched oracle.
+    """
+
+    def __init__(self, path: str = TABLE_PATH):
+        """
+        Args:
+            path (str): Path to the table built by `build`.
+
+        Raises:
+            ValueError: If the file is not a table of 9x9 maps.
+        """
+        self.path = path
+        self.table = np.load(path, mmap_mode="r")
+        cells = TABLE_N * TABLE_N
+        if self.table.shape != (cells, cells, cells, cells) or self.table.dtype != np.int8:
+            raise ValueError(f"{path} is not an oracle table of {TABLE_N}x{TABLE_N} maps")
+        self._zones = zone_masks(TABLE_N)
+        # flat view for single lookups (indexing the memory map itself costs microseconds)
+        self._fields = memoryview(self.table.reshape(-1))
+
+    def lookup(self, maps: np.ndarray) -> np.ndarray:
+        """Returns the answers of 9x9 maps.
+
+        Args:
+            maps (np.ndarray): Codes of the cells of shape (maps, 81).
+
+        Returns:
+            np.ndarray: Answer of every map (int64), `corpus.UNKNOWN` for the maps that are not covered by the table
+                (not exactly one entity of each kind or perception zones that differ from the Avengers' ones).
+        """
+        n = TABLE_N
+        answers = np.full(len(maps), UNKNOWN, dtype=np.int64)
+        if not len(maps):
+            return answers
+        counts = [(maps == code).sum(axis=1) for code in (THOR, HULK, CAPTAIN_MARVEL, SHIELD, INFINITY_STONE)]
+        covered = np.logical_and.reduce([count == 1 for count in counts])
+        positions = [(maps == code).argmax(axis=1) for code in (THOR, HULK, CAPTAIN_MARVEL, SHIELD, INFINITY_STONE)]
+        thors, hulks, marvels, shields, stones = positions
+
+        # the map has to be exactly the one painted from the positions of the entities,
+        # with the shield and the stone out of the perception zones (the fields treat these cells as blocked)
+        rows = np.arange(len(maps))
+        perception = self._zones[THOR][thors] | self._zones[HULK][hulks] | self._zones[CAPTAIN_MARVEL][marvels]
+        covered &= ~perception[rows, shields] & ~perception[rows, stones]
+        painted = np.where(perception, PERCEPTION, 0).astype(np.uint8)
+        for code, cells in zip((THOR, HULK, CAPTAIN_MARVEL, SHIELD, INFINITY_STONE), positions):
+            painted[rows, cells] = code
+        covered &= (painted == maps).all(axis=1)
+
+        fields = self.table[thors[covered], hulks[covered], marvels[covered]].astype(np.int64)
+        covered_rows = np.arange(len(fields))
+        to_stone = fields[covered_rows, stones[covered]]
+        to_shield = fields[covered_rows, shields[covered]]
+        # zero distances are not paths (the entity stands in the cell of Thanos)
+        found = np.where(to_stone > 0, to_stone, -1)
+        sx, sy = np.divmod(shields[covered], n)
+        ix, iy = np.divmod(stones[covered], n)
+        shortest_through_shield = to_shield + np.abs(sx - ix) + np.abs(sy - iy)
+        uncertain = (to_shield > 0) & ((found < 0) | (shortest_through_shield < found))
+        indices = np.flatnonzero(covered)
+        answers[indices] = found
+        if uncertain.any():
+            answers[indices[uncertain]] = shortest_paths(maps[indices[uncertain]], n)
+        return answers
+
+    def answer(self, cells: bytes) -> int:
+        """Returns the answer of a single 9x9 map, the same as `lookup` without the overhead of NumPy calls.
+
+        Args:
+            cells (bytes): Codes of the cells.
+
+        Returns:
+            int: Answer of the map, `corpus.UNKNOWN` if it is not covered by the table.
+        """
+        n = TABLE_N
+        codes = (THOR, HULK, CAPTAIN_MARVEL, SHIELD, INFINITY_STONE)
+        if len(cells) != n * n or any(cells.count(code) != 1 for code in codes):
+            return UNKNOWN
+        thor, hulk, marvel, shield, stone = (cells.index(code) for code in codes)
+        zones = tables(n)
+        perception = set(zones["thor"][thor]) | set(zones["hulk"][hulk]) | set(zones["marvel"][marvel])
+        perception -= {thor, hulk, marvel}
+        if shield in perception or stone in perception:
+            return UNKNOWN
+        if cells.count(PERCEPTION) != len(perception) or cells.count(EMPTY) != n * n - len(codes) - len(perception):
+            return UNKNOWN
+        if any(cells[cell] != PERCEPTION for cell in perception):
+            return UNKNOWN
+
+        offset = ((thor * n * n + hulk) * n * n + marvel) * n * n
+        to_stone, to_shield = self._fields[offset + stone], self._fields[offset + shield]
+        found = to_stone if to_stone > 0 else -1
+        (sx, sy), (ix, iy) = divmod(shield, n), divmod(stone, n)
+        if to_shield > 0 and (found < 0 or to_shield + abs(sx - ix) + abs(sy - iy) < found):
+            # with the shield only Captain Marvel's perception zone stays
+            through_shield = distance(
+                shield, stone, {thor, hulk, marvel, *zones["marvel"][marvel]}, zones["neighbours"]
+            )
+            if through_shield > 0 and (found < 0 or to_shield + through_shield < found):
+                return to_shield + through_shield
+        return found
+
+
+def open_table(path: str = TABLE_PATH) -> Optional[OracleTable]:
+    """Returns the table if it is built."""
+    return OracleTable(path) if os.path.exists(path) else None
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description=f"Builds the oracle table of all {TABLE_N}x{TABLE_N} maps")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="Path to the table",
+        default=TABLE_PATH,
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of processes (all the cores by default)",
+        default=None,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start_time = time.time()
+    build(args.output, args.jobs)
+    print(f"[INFO] Built {args.output} in {time.time() - start_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
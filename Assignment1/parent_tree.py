@@ -0,0 +1,104 @@
+from typing import Dict, List
+
+
+class ParentTree:
+    """
+    Tree of cells linked to their parents with depths and binary lifting,
+    so the nearest common ancestor of two cells is found in O(log(depth)).
+    Cells can only be added as leaves and their parents never change afterwards.
+    """
+
+    def __init__(self, size: int, root: int):
+        self.root = root
+        # depth[i] is the number of edges between cell `i` and the root (-1 if `i` is not in the tree)
+        self.depth: List[int] = [-1] * size
+        self.depth[root] = 0
+        # jumps[i][k] is the ancestor of cell `i` 2^k levels above it
+        self.jumps: Dict[int, List[int]] = {root: []}
+
+    def __contains__(self, cell: int) -> bool:
+        return self.depth[cell] != -1
+
+    def add(self, cell: int, parent: int) -> None:
+        """Adds `cell` as a child of `parent` that is already in the tree.
+
+        Args:
+            cell (int): Index of the new cell.
+            parent (int): Index of its parent.
+        """
+        self.depth[cell] = self.depth[parent] + 1
+        jumps = [parent]
+        while len(self.jumps[jumps[-1]]) >= len(jumps):
+            jumps.append(self.jumps[jumps[-1]][len(jumps) - 1])
+        self.jumps[cell] = jumps
+
+    def parent(self, cell: int) -> int:
+        """Returns the parent of `cell` (-1 for the root)."""
+        jumps = self.jumps[cell]
+        return jumps[0] if jumps else -1
+
+    def ancestor(self, cell: int, depth: int) -> int:
+        """Returns the ancestor of `cell` at `depth`.
+
+        Args:
+            cell (int): Index of the cell.
+            depth (int): Depth of the ancestor (not greater than the depth of `cell`).
+
+        Returns:
+            int: Index of the ancestor.
+        """
+        difference = self.depth[cell] - depth
+        k = 0
+        while difference:
+            if difference & 1:
+                cell = self.jumps[cell][k]
+            difference >>= 1
+            k += 1
+        return cell
+
+    def lca(self, a: int, b: int) -> int:
+        """Returns the nearest common ancestor of `a` and `b`.
+
+        Args:
+            a (int): Index of the first cell.
+            b (int): Index of the second cell.
+
+        Returns:
+            int: Index of the nearest common ancestor.
+        """
+        if self.depth[a] > self.depth[b]:
+            a = self.ancestor(a, self.depth[b])
+        else:
+            b = self.ancestor(b, self.depth[a])
+        if a == b:
+            return a
+        for k in range(len(self.jumps[a]) - 1, -1, -1):
+            # both cells have the same depth, so they have the same number of jumps
+            if k < len(self.jumps[a]) and self.jumps[a][k] != self.jumps[b][k]:
+                a, b = self.jumps[a][k], self.jumps[b][k]
+        return self.jumps[a][0]
+
+    def distance(self, a: int, b: int) -> int:
+        """Returns the number of moves between `a` and `b` along the tree."""
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self.lca(a, b)]
+
+    def path(self, a: int, b: int) -> List[int]:
+        """Returns the path along the tree from `a` to `b` through their nearest common ancestor.
+
+        Args:
+            a (int): Index of the first cell.
+            b (int): Index of the second cell.
+
+        Returns:
+            List[int]: Cells after `a` up to and including `b`.
+        """
+        lca = self.lca(a, b)
+        up: List[int] = []
+        while a != lca:
+            a = self.jumps[a][0]
+            up.append(a)
+        down: List[int] = []
+        while b != lca:
+            down.append(b)
+            b = self.jumps[b][0]
+        return up + down[::-1]
@@ -0,0 +1,370 @@
+import sys
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+from argparse import ArgumentParser, Namespace
+
+from grid import CAPTAIN_MARVEL, EMPTY, HULK, N, PERCEPTION, SHIELD, THOR, Grid
+from open_list import OPEN_LISTS
+from protocol import Channel, Connection, serve
+from parent_tree import ParentTree
+
+
+# status of a cell in a layer of the state space
+FREE = 0
+TAKEN = 1
+UNKNOWN = 2
+
+# counters reported with `--stats`
+statistics: Dict[str, int] = {"expanded": 0}
+
+
+def heuristics(grid: Grid, start: int, goal: int) -> int:
+    """Heuristics function for A*. Returns manhattan distance between `start` and `goal`.
+
+    Args:
+        grid (Grid): Map.
+        start (int): Index of the start cell.
+        goal (int): Index of the goal cell.
+
+    Returns:
+        int: Manhattan distance between `start` and `goal`.
+    """
+    return grid.manhattan(start, goal)
+
+
+class Knowledge:
+    """
+    What Thanos knows about the map in both layers of the state space:
+    without the shield (layer 0) and with it (layer 1).
+    With the shield only Captain Marvel's perception zone remains, so a cell free in layer 0 is free in layer 1.
+    Perception zones that can not be seen in the current layer are derived from the Avengers around.
+    """
+
+    def __init__(self, grid: Grid, variant_number: int):
+        """
+        Args:
+            grid (Grid): Map to store the Avengers, the shield and the stone in (perception zones are not stored).
+            variant_number (int): Thanos' vision variant.
+        """
+        self.grid = grid
+        self.variant_number = variant_number
+        self.with_shield = False
+        # seen[i] is 1 if the content of cell `i` was seen by Thanos
+        self.seen = bytearray(grid.n * grid.n)
+        # status[layer][i] is the status of cell `i` in the layer
+        self.status = (bytearray([UNKNOWN]) * (grid.n * grid.n), bytearray([UNKNOWN]) * (grid.n * grid.n))
+
+    def observe(self, pos: int, reported: Dict[int, int]) -> None:
+        """Remembers what Thanos sees standing in `pos`.
+
+        Args:
+            pos (int): Index of the cell Thanos is standing in.
+            reported (Dict[int, int]): Codes of the reported cells by their indices (others are empty).
+        """
+        cells, seen = self.grid.cells, self.seen
+        layer0, layer1 = self.status
+        for cell in self.grid.vision[self.variant_number][pos]:
+            code = reported.get(cell, EMPTY)
+            seen[cell] = 1
+            if code in (HULK, THOR, CAPTAIN_MARVEL):
+                cells[cell] = code
+                layer0[cell] = layer1[cell] = TAKEN
+            elif code == PERCEPTION:
+                layer0[cell] = TAKEN
+                if self.with_shield:
+                    layer1[cell] = TAKEN
+            else:
+                cells[cell] = code
+                layer1[cell] = FREE
+                # without the shield the empty cell may be in perception zones of Hulk and Thor
+                if not self.with_shield or code != EMPTY:
+                    layer0[cell] = FREE
+
+    def get(self, layer: int, cell: int) -> int:
+        """Returns the status of `cell` in `layer` deriving it from the Avengers around if possible.
+
+        Args:
+            layer (int): Layer of the state space (1 if Thanos is with the shield).
+            cell (int): Index of the cell.
+
+        Returns:
+            int: FREE, TAKEN, or UNKNOWN.
+        """
+        status = self.status[layer][cell]
+        if status != UNKNOWN or not self.seen[cell]:
+            return status
+        if layer == 0:
+            # perception zones with the shield are a part of the ones without it
+            if self.status[1][cell] == TAKEN:
+                return TAKEN
+            status = self.derive(cell, ((HULK, self.grid.hulk_zone), (THOR, self.grid.thor_zone)))
+        else:
+            status = self.derive(cell, ((CAPTAIN_MARVEL, self.grid.marvel_zone),))
+        self.status[layer][cell] = status
+        return status
+
+    def derive(self, cell: int, avengers: Tuple[Tuple[int, List[Tuple[int, ...]]], ...]) -> int:
+        """Derives whether `cell` is in perception zones of `avengers`.
+
+        Args:
+            cell (int): Index of the cell.
+            avengers (Tuple[Tuple[int, List[Tuple[int, ...]]], ...]): Codes of the Avengers and their perception zones.
+
+        Returns:
+            int: FREE, TAKEN, or UNKNOWN.
+        """
+        cells, seen = self.grid.cells, self.seen
+        everything_seen = True
+        for code, zone in avengers:
+            # perception zones are symmetric, so the Avengers are in the same zone around the cell
+            for around in zone[cell]:
+                if cells[around] == code:
+                    return TAKEN
+                if not seen[around]:
+                    everything_seen = False
+        return FREE if everything_seen else UNKNOWN
+
+
+class ProductAStar:
+    """
+    A* over the product state space (cell, whether the shield is picked up).
+    State `layer * n * n + cell` is cell `cell` without the shield for layer 0 and with it for layer 1.
+    Stepping into the shield moves to layer 1, so the first popped goal state is the true optimum.
+    Thanos moves only to expand states with unknown surroundings, and the shield is picked up
+    only when the search needs to look around a state of layer 1.
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        start: int,
+        goal: int,
+        variant_number: int,
+        h: Callable[[Grid, int, int], int],
+        open_list: str = "bucket",
+        connection: Optional[Channel] = None,
+    ):
+        """
+        Args:
+            grid (Grid): Map (knowledge of Thanos).
+            start (int): Index of the start cell (Thanos is standing there).
+            goal (int): Index of the goal cell.
+            variant_number (int): Thanos' vision variant.
+            h (Callable[[Grid, int, int], int]): Function for heuristics (for both layers).
+            open_list (str): Name of the open list implementation (see `OPEN_LISTS`).
+            connection (Optional[Channel]): Interactor (the standard streams by default).
+        """
+        self.grid = grid
+        self.connection = connection if connection is not None else Connection(grid.n)
+        self.size = grid.n * grid.n
+        self.start = start
+        self.goal = goal
+        self.h = h
+        self.knowledge = Knowledge(grid, variant_number)
+
+        # set of discovered states that may need to be expanded
+        self.open_set = OPEN_LISTS[open_list]()
+        self.open_set.push(h(grid, start, goal), start)
+        # closed[i] is 1 if state `i` was already expanded
+        self.closed = bytearray(2 * self.size)
+        # parent list (stores the closest parent)
+        self.parent: List[int] = [-1] * (2 * self.size)
+        # g_score[i] is the shortest distance from `start` to state `i`
+        self.g_score: List[int] = [grid.n**3] * (2 * self.size)
+        self.g_score[start] = 0
+        # f_score[i] is the guess for the shortest distance from `start` to `goal` through state `i`
+        self.f_score: List[int] = [grid.n**3] * (2 * self.size)
+        self.f_score[start] = h(grid, start, goal)
+        # tree of expanded states (their parents and g-scores are final)
+        self.tree = ParentTree(2 * self.size, start)
+
+        # state Thanos is standing in
+        self.position = start
+        self.move(start)
+
+    def move(self, state: int) -> None:
+        """Moves Thanos into the cell of an adjacent `state` and remembers what he sees there.
+
+        Args:
+            state (int): Index of the state.
+        """
+        self.walk([state])
+
+    def walk(self, path: List[int]) -> None:
+        """Moves Thanos along `path` with a single request to the interactor and remembers what he sees.
+
+        Args:
+            path (List[int]): Indices of the states to move into one after another (their cells are adjacent).
+        """
+        for state, reported in zip(path, self.connection.move([state % self.size for state in path])):
+            cell = state % self.size
+            # the interactor picks up the shield before reporting the surroundings
+            if self.grid.cells[cell] == SHIELD:
+                self.knowledge.with_shield = True
+            self.knowledge.observe(cell, dict(reported))
+            self.position = state
+
+    def walk_to(self, state: int) -> None:
+        """Moves Thanos into expanded `state` along the expanded states.
+        The route enters layer 1 through the shield, so the shield is picked up on the way if needed.
+        The route goes through known cells, so it is sent to the interactor as a whole.
+
+        Args:
+            state (int): Index of the state.
+        """
+        if state == self.position:
+            return
+        cell, position = state % self.size, self.position % self.size
+        # a cell of layer 1 may be in perception zones while Thanos is without the shield
+        if self.grid.manhattan(cell, position) != 1 or (state >= self.size and not self.knowledge.with_shield):
+            self.walk(self.tree.path(self.position, self.parent[state]) + [state])
+        else:
+            self.move(state)
+
+    def successors(self, state: int) -> List[Tuple[int, int]]:
+        """Returns the layers and the statuses of the successors of `state` (in the order of the neighbours).
+
+        Args:
+            state (int): Index of the state.
+
+        Returns:
+            List[Tuple[int, int]]: Layer and status of the successor through every neighbour.
+        """
+        knowledge = self.knowledge
+        layer, cell = divmod(state, self.size)
+        result: List[Tuple[int, int]] = []
+        for neighbor in self.grid.neighbours[cell]:
+            # stepping into the shield picks it up
+            if layer == 0 and knowledge.seen[neighbor] and self.grid.cells[neighbor] == SHIELD:
+                result.append((1, FREE))
+            else:
+                result.append((layer, knowledge.get(layer, neighbor)))
+        return result
+
+    def look_around(self, state: int) -> List[Tuple[int, int]]:
+        """Moves Thanos to find out the successors of `state` if they are unknown.
+
+        Args:
+            state (int): Index of the state.
+
+        Returns:
+            List[Tuple[int, int]]: Layer and status of the successor through every neighbour.
+        """
+        successors = self.successors(state)
+        if all(status != UNKNOWN for _, status in successors):
+            return successors
+        self.walk_to(state)
+        successors = self.successors(state)
+        cell = state % self.size
+        physical_layer = int(self.knowledge.with_shield)
+        for neighbor, (_, status) in zip(self.grid.neighbours[cell], successors):
+            # with the shield perception zones of Hulk and Thor around layer 0 cells are not visible,
+            # so step into the neighbor to see the Avengers around it
+            if status == UNKNOWN and self.knowledge.get(physical_layer, neighbor) == FREE:
+                self.walk([self.position - cell + neighbor, state])
+        return self.successors(state)
+
+    def search(self) -> int:
+        """Finds the shortest distance from the start to the goal with or without the shield.
+
+        Returns:
+            int: Shortest distance from the start to the goal (-1 if not found).
+        """
+        grid, size = self.grid, self.size
+        closed, parent, g_score, f_score = self.closed, self.parent, self.g_score, self.f_score
+        open_set = self.open_set
+
+        while open_set:
+            # get the state with the lowest f_score
+            f, current = open_set.pop()
+            # skip outdated entries
+            if closed[current] or f > f_score[current]:
+                continue
+            # both layers have the same goal
+            if current % size == self.goal:
+                return g_score[current]
+
+            closed[current] = 1
+            statistics["expanded"] += 1
+            if current != self.start:
+                self.tree.add(current, parent[current])
+
+            # check the successors
+            g_score_neighbor = g_score[current] + 1
+            successors = self.look_around(current)
+            for neighbor, (layer, status) in zip(grid.neighbours[current % size], successors):
+                # unknown cells are in perception zones which Thanos can not enter to look at them
+                if status != FREE:
+                    continue
+                successor = layer * size + neighbor
+                if closed[successor]:
+                    continue
+
+                # if we found a shorter path through `current`
+                if g_score_neighbor < g_score[successor]:
+                    parent[successor] = current
+                    g_score[successor] = g_score_neighbor
+                    f_score[successor] = g_score_neighbor + self.h(grid, neighbor, self.goal)
+                    open_set.push(f_score[successor], successor)
+
+        # path from the start to the goal does not exist
+        return -1
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--size",
+        dest="n",
+        type=int,
+        help="Size of the map (NxN) for a single test (in a session it is given by the interactor)",
+        default=N,
+    )
+    parser.add_argument(
+        "-ol",
+        "--open-list",
+        type=str,
+        choices=sorted(OPEN_LISTS),
+        help="Open list implementation to use in A*",
+        default="bucket",
+    )
+    parser.add_argument(
+        "-st",
+        "--stats",
+        action="store_true",
+        help="Whether to print search statistics as JSON to stderr at exit",
+    )
+    return parser.parse_args()
+
+
+def main(n: int = N, open_list: str = "bucket", stats: bool = False, connection: Optional[Channel] = None):
+    """Main function of the solution.
+
+    Args:
+        n (int): Size of the map (NxN).
+        open_list (str): Name of the open list implementation (see `OPEN_LISTS`).
+        stats (bool): Whether to print search statistics as JSON to stderr at exit.
+        connection (Optional[Channel]): Interactor (the standard streams by default).
+    """
+    grid = Grid(n)
+    if connection is None:
+        connection = Connection(n)
+    statistics["expanded"] = 0
+
+    variant_number, goal = connection.read_task()
+    start = grid.index(0, 0)
+
+    # one search over both layers finds the shortest path with or without the shield
+    min_dist = ProductAStar(grid, start, goal, variant_number, heuristics, open_list, connection).search()
+
+    # print the length of the shortest path from `start` to `goal`
+    # note: if the path does not exist, then -1 will be printed
+    connection.answer(min_dist)
+    if stats:
+        print(json.dumps(statistics), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    serve(args.n, lambda n, connection: main(n, args.open_list, args.stats, connection))
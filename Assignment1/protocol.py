@@ -0,0 +1,293 @@
+import sys
+import json
+from typing import BinaryIO, Callable, Dict, List, Optional, Protocol, Tuple
+
+from grid import SYMBOLS
+
+
+# ENTITIES[byte] is the code of the entity with such symbol (e.g. `ENTITIES[ord("H")] == HULK`)
+ENTITIES = bytearray(256)
+for _code, _symbol in enumerate(SYMBOLS):
+    ENTITIES[ord(_symbol)] = _code
+
+# symbol of each code as a byte
+SYMBOLS_BYTES = SYMBOLS.encode("ASCII")
+
+# number of bytes requested from the stream at once
+CHUNK_SIZE = 1 << 16
+
+# counters a solver prints to stderr as a JSON line after every test with `--stats`
+# (`run_tests.py --telemetry` writes them into extra columns, a solver may report only some of them):
+#   expanded, pruned - cells expanded and branches cut by the search;
+#   pushes, pops, stale_pops - operations on the open list and popped entries that were outdated;
+#   moves_explore, moves_back, moves_shield - moves into the cells being explored, moves through known cells
+#       (walking back), and moves made to pick up the shield and after it;
+#   bytes_sent, bytes_received - bytes exchanged with the interactor (0 in the same process);
+#   time_search, time_shield - seconds spent before and after the decision to pick up the shield.
+TELEMETRY = (
+    "expanded",
+    "pruned",
+    "pushes",
+    "pops",
+    "stale_pops",
+    "moves_explore",
+    "moves_back",
+    "moves_shield",
+    "bytes_sent",
+    "bytes_received",
+    "time_search",
+    "time_shield",
+)
+
+
+class Channel(Protocol):
+    """
+    Solver's view of the interactor.
+    Implemented by `Connection` (another process) and `interactor.Interactor` (the same process).
+    """
+
+    def read_task(self) -> Tuple[int, int]: ...
+
+    def send_moves(self, path: List[int]) -> None: ...
+
+    def receive(self) -> List[Tuple[int, int]]: ...
+
+    def move(self, path: List[int]) -> List[List[Tuple[int, int]]]: ...
+
+    def answer(self, length: int, proven: bool = True) -> None: ...
+
+
+class Connection:
+    """
+    Solver's side of the interactive protocol working on binary streams.
+    Every message is written with a single `write` and `flush`.
+    Incoming data is split into tokens in bulk, so several answers that arrived together are decoded at once.
+
+    Messages of the solver:
+        `m x y` - move into cell (x, y);
+        `b k x1 y1 ... xk yk` - move into `k` cells one after another;
+        `e length` - the answer, `e length ?` if it is the best one found in time but not proven to be the shortest.
+    The interactor answers every move with the number of reported cells followed by `x y entity` for each of them.
+    In a session the interactor starts every test with `t n` (the size of the map) before the task,
+    so one process solves test after test until the stream is closed.
+    """
+
+    def __init__(self, n: int, reader: Optional[BinaryIO] = None, writer: Optional[BinaryIO] = None):
+        """
+        Args:
+            n (int): Size of the map (cells are passed around as indices `x * n + y`).
+            reader (Optional[BinaryIO]): Stream of the interactor's messages (`sys.stdin.buffer` by default).
+            writer (Optional[BinaryIO]): Stream of the solver's messages (`sys.stdout.buffer` by default).
+        """
+        self.n = n
+        self.reader = reader if reader is not None else sys.stdin.buffer
+        self.writer = writer if writer is not None else sys.stdout.buffer
+        # tokens that were read but not consumed yet
+        self._tokens: List[bytes] = []
+        self._next = 0
+        # incomplete token at the end of the last chunk
+        self._tail = b""
+        # numbers of bytes written and read (for the telemetry)
+        self.sent = 0
+        self.received = 0
+
+    def _fill(self) -> None:
+        """Reads the next chunk of the stream and splits it into tokens."""
+        read = getattr(self.reader, "read1", self.reader.read)
+        chunk = read(CHUNK_SIZE)
+        if not chunk:
+            raise EOFError("the interactor closed the stream")
+        self.received += len(chunk)
+        data = self._tail + chunk
+        tokens = data.split()
+        # the last token may continue in the next chunk
+        self._tail = tokens.pop() if tokens and not data[-1:].isspace() else b""
+        self._tokens = self._tokens[self._next :] + tokens
+        self._next = 0
+
+    def _take(self, count: int) -> List[bytes]:
+        """Returns the next `count` tokens of the stream.
+
+        Args:
+            count (int): Number of tokens.
+
+        Returns:
+            List[bytes]: The tokens.
+        """
+        while len(self._tokens) - self._next < count:
+            self._fill()
+        tokens = self._tokens[self._next : self._next + count]
+        self._next += count
+        return tokens
+
+    def peek(self) -> bytes:
+        """Returns the next token of the stream without consuming it."""
+        while len(self._tokens) == self._next:
+            self._fill()
+        return self._tokens[self._next]
+
+    def next_test(self) -> bool:
+        """Starts the next test of a session reading `t n`.
+
+        Returns:
+            bool: False if the interactor closed the stream (there are no more tests).
+        """
+        try:
+            command, n = self._take(2)
+        except EOFError:
+            return False
+        if command != b"t":
+            raise ValueError(f"expected the start of a test, got {command!r}")
+        self.n = int(n)
+        return True
+
+    def read_task(self) -> Tuple[int, int]:
+        """Reads the variant of Thanos' vision and the cell with the Infinity Stone.
+
+        Returns:
+            Tuple[int, int]: Variant number and index of the goal cell.
+        """
+        variant, x, y = map(int, self._take(3))
+        return variant, x * self.n + y
+
+    def send_moves(self, path: List[int]) -> None:
+        """Asks the interactor to move along `path` with a single message.
+
+        Args:
+            path (List[int]): Indices of the cells to move into one after another.
+        """
+        n = self.n
+        if len(path) == 1:
+            message = b"m %d %d\n" % divmod(path[0], n)
+        else:
+            message = b"b %d %b\n" % (len(path), b" ".join(b"%d %d" % divmod(cell, n) for cell in path))
+        self.sent += len(message)
+        self.writer.write(message)
+        self.writer.flush()
+
+    def receive(self) -> List[Tuple[int, int]]:
+        """Reads the surroundings reported after one move.
+
+        Returns:
+            List[Tuple[int, int]]: Index and code of every reported cell.
+        """
+        count = int(self._take(1)[0])
+        tokens = self._take(3 * count)
+        n = self.n
+        return [
+            (int(x) * n + int(y), ENTITIES[entity[0]]) for x, y, entity in zip(tokens[0::3], tokens[1::3], tokens[2::3])
+        ]
+
+    def move(self, path: List[int]) -> List[List[Tuple[int, int]]]:
+        """Moves along `path` and returns the surroundings after every move.
+
+        Args:
+            path (List[int]): Indices of the cells to move into one after another.
+
+        Returns:
+            List[List[Tuple[int, int]]]: Index and code of every reported cell for every move.
+        """
+        self.send_moves(path)
+        return [self.receive() for _ in path]
+
+    def answer(self, length: int, proven: bool = True) -> None:
+        """Sends the length of the shortest path (-1 if it does not exist).
+
+        Args:
+            length (int): Length of the path.
+            proven (bool): Whether the path is proven to be the shortest (a best effort answer otherwise).
+        """
+        message = b"e %d\n" % length if proven else b"e %d ?\n" % length
+        self.sent += len(message)
+        self.writer.write(message)
+        self.writer.flush()
+
+
+def serve(n: int, solve: Callable[[int, Channel], None]) -> None:
+    """Runs a solver on the standard streams for a single test or for every test of a session.
+    A session is recognized by `t n` at the beginning of the stream.
+
+    Args:
+        n (int): Size of the map for a single test.
+        solve (Callable[[int, Channel], None]): Solves one test given the size of the map and the connection.
+    """
+    connection = Connection(n)
+    if connection.peek() != b"t":
+        solve(n, connection)
+        return
+    while connection.next_test():
+        solve(connection.n, connection)
+
+
+def decode_moves(words: List[bytes]) -> Optional[List[Tuple[int, int]]]:
+    """Decodes a move command of a solver.
+    `m x y` is a single move, `b k x1 y1 ... xk yk` is `k` moves in a row sent at once.
+
+    Args:
+        words (List[bytes]): Words of the line printed by the solver.
+
+    Returns:
+        Optional[List[Tuple[int, int]]]: Cells to move into one after another (None if it is not a move command).
+    """
+    if not words or not all(word.isdigit() for word in words[1:]):
+        return None
+    if words[0] == b"m" and len(words) == 3:
+        return [(int(words[1]), int(words[2]))]
+    if words[0] == b"b" and len(words) >= 2 and len(words) == 2 * int(words[1]) + 2:
+        coordinates = list(map(int, words[2:]))
+        return list(zip(coordinates[::2], coordinates[1::2]))
+    return None
+
+
+def decode_answer(words: List[bytes]) -> Optional[Tuple[int, bool]]:
+    """Decodes the answer of a solver: `e length` or `e length ?` for a best effort answer.
+
+    Args:
+        words (List[bytes]): Words of the line printed by the solver.
+
+    Returns:
+        Optional[Tuple[int, bool]]: The length and whether it is proven to be the shortest
+            (None if it is not an answer).
+    """
+    if len(words) not in (2, 3) or words[0] != b"e" or not words[1].replace(b"-", b"", 1).isdigit():
+        return None
+    if len(words) == 3 and words[2] != b"?":
+        return None
+    return int(words[1]), len(words) == 2
+
+
+def decode_telemetry(output: bytes) -> Optional[Dict[str, float]]:
+    """Decodes the telemetry of a solver: the last line of its stderr that is a JSON object.
+
+    Args:
+        output (bytes): Everything the solver printed to stderr during the test.
+
+    Returns:
+        Optional[Dict[str, float]]: The counters of `TELEMETRY` that are reported (None if there is no such line).
+    """
+    for line in reversed(output.splitlines()):
+        line = line.strip()
+        if not line.startswith(b"{"):
+            continue
+        try:
+            counters = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(counters, dict):
+            return {key: counters[key] for key in TELEMETRY if key in counters}
+    return None
+
+
+def encode_surroundings(n: int, reported: List[Tuple[int, int]]) -> bytes:
+    """Encodes the surroundings after one move as they are sent to a solver.
+
+    Args:
+        n (int): Size of the map.
+        reported (List[Tuple[int, int]]): Index and code of every reported cell.
+
+    Returns:
+        bytes: The message.
+    """
+    lines = [b"%d\n" % len(reported)]
+    lines.extend(b"%d %d %c\n" % (cell // n, cell % n, SYMBOLS_BYTES[code]) for cell, code in reported)
+    return b"".join(lines)
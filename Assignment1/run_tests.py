@@ -1,86 +1,53 @@
+import io
 import os
-import re
-import glob
+import csv
+import sys
 import time
-import subprocess
+import asyncio
+import contextlib
+import collections
+import importlib
+import traceback
 from random import randint
-from typing import Tuple, List
+from types import ModuleType
+from typing import Deque, Dict, List, Optional, TextIO, Tuple
 from argparse import ArgumentParser, Namespace
 
+from corpus import list_tests, load_test
+from grid import Grid
+from interactor import IllegalMove, Interactor
+from protocol import TELEMETRY, decode_answer, decode_moves, decode_telemetry, encode_surroundings
 
-N = 9  # size of the map (NxN)
 DASH_LENGTH = 50
-FILE_PATTERN = re.compile(r".*?(\d+).*?")
-
-
-def m_dist(this, other) -> int:
-    return abs(this[0] - other[0]) + abs(this[1] - other[1])
-
-
-def moore_perception_zone(point, center, r=1) -> bool:
-    return abs(point[0] - center[0]) <= r and abs(point[1] - center[1]) <= r
-
-
-def moore_corner_perception_zone(point, center, r=1) -> bool:
-    return moore_perception_zone(point, center, r) or (
-        abs(point[0] - center[0]) == r + 1 and abs(point[1] - center[1]) == r + 1
-    )
-
-
-def vonneumann_perception_zone(point, center, r) -> bool:
-    return m_dist(point, center) <= r
-
-
-def remove_perception(map_):
-    for i in range(N):
-        for j in range(N):
-            if map_[i][j] == "P":
-                map_[i][j] = "."
-
-
-def get_surroundings(map_, perception, cell) -> List[Tuple[Tuple[int, int], str]]:
-    output = []
-    for i in range(N):
-        for j in range(N):
-            if map_[i][j] == ".":
-                continue
-            if perception == 1:
-                if moore_perception_zone((i, j), cell):
-                    output.append(((i, j), map_[i][j]))
-            elif perception == 2:
-                if moore_corner_perception_zone((i, j), cell):
-                    output.append(((i, j), map_[i][j]))
-    return output
-
-
-def illegal_move(msg, curr, future):
-    print(f"[ERROR] {msg}:")
-    print("-" * DASH_LENGTH)
-    print("Tried to move to cell:")
-    print(future)
-    print("From cell:")
-    print(curr)
-    print("-" * DASH_LENGTH)
-
-
-def get_order(file):
-    match = FILE_PATTERN.match(os.path.splitext(os.path.basename(file))[0])
-    if not match:
-        return float("inf")
-    return int(match.groups()[0])
-
-
-def kill(process):
-    if os.name == "nt":  # Windows
-        subprocess.Popen(
-            "TASKKILL /F /PID {pid} /T".format(pid=process.pid),
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-    else:
-        import signal
-
-        os.kill(process.pid, signal.SIGTERM)
+# codes written into the csv file instead of the answer
+TIME_LIMIT_EXCEEDED = -2
+# the longest line a solution can print (batched moves on big maps make long lines)
+STREAM_LIMIT = 1 << 24
+# seconds a solution is given to exit by itself after the answer before it is killed
+GRACE_PERIOD = 1
+# number of tests per worker that are read and queued ahead of the one written next
+# (a big corpus is never loaded at once)
+IN_FLIGHT = 2
+# seconds between the checks of stderr for the telemetry printed after the answer
+TELEMETRY_POLL = 0.001
+
+
+def illegal_move(msg, curr, future) -> List[str]:
+    return [
+        f"[ERROR] {msg}:",
+        "-" * DASH_LENGTH,
+        "Tried to move to cell:",
+        str(future),
+        "From cell:",
+        str(curr),
+        "-" * DASH_LENGTH,
+    ]
+
+
+class SolverFailed(Exception):
+    """
+    Raised when a solution crashes or breaks the rules, so the whole run is stopped.
+    """
 
 
 def parse_args() -> Namespace:
@@ -89,14 +56,15 @@ def parse_args() -> Namespace:
         "-t",
         "--tests",
         type=str,
-        help="Path to the tests folder or a single file",
+        help="Path to the tests folder, a corpus file (see corpus.py) or a single file",
         required=True,
     )
     parser.add_argument(
         "-c",
         "--cmd",
         type=str,
-        help='Command to execute program (e.g. "python3 main.py" or "./main.out")',
+        help='Command to execute program (e.g. "python3 main.py" or "./main.out"). '
+        'Bundled solvers need the size of bigger maps, e.g. "python3 a_star.py -n 100"',
         required=True,
     )
     parser.add_argument(
@@ -120,142 +88,543 @@ def parse_args() -> Namespace:
         help="Whether to stop a solution after specified amount of seconds. -1 means no time limit",
         default=-1,
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of solutions run at the same time (not used in the in-process mode)",
+        default=1,
+    )
+    parser.add_argument(
+        "-s",
+        "--session",
+        action="store_true",
+        help="Whether to keep every solution running between tests: each test starts with `t n` (the size of the map). "
+        "Bundled solvers support it",
+    )
+    parser.add_argument(
+        "-ip",
+        "--in-process",
+        action="store_true",
+        help="Whether to import the Python solver from the command and run it in this process "
+        "(much faster for small maps; the time limit is checked only after the solution finishes)",
+    )
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        type=str,
+        help="Path to the output csv file of an earlier run to compare the number of moves with",
+        default=None,
+    )
+    parser.add_argument(
+        "-a",
+        "--answers",
+        action="store_true",
+        help="Whether to check the answers (expected answers are taken from the answer cache, "
+        "only the maps that are not there are solved)",
+    )
+    parser.add_argument(
+        "-tm",
+        "--telemetry",
+        action="store_true",
+        help="Whether to append `--stats` to the command and write the counters the solution prints to stderr "
+        "after every test into extra columns (see `protocol.TELEMETRY`). Bundled solvers support it",
+    )
     return parser.parse_args()
 
 
-def main():
-    args = parse_args()
+def read_moves(path: str) -> Dict[str, int]:
+    moves = {}
+    with open(path, "r") as fp:
+        for row in csv.DictReader(fp):
+            if row.get("MOVES"):
+                moves[row["TEST"]] = int(row["MOVES"])
+    return moves
+
+
+def report_moves(moves: Dict[str, int], baseline: Optional[str]) -> None:
+    print(f"[INFO] Total moves: {sum(moves.values())}")
+    if not baseline:
+        return
+    baseline_moves = read_moves(baseline)
+    common = [test for test in moves if test in baseline_moves]
+    if not common:
+        print("[INFO] No common tests with the baseline")
+        return
+    before = sum(baseline_moves[test] for test in common)
+    after = sum(moves[test] for test in common)
+    print(
+        f"[INFO] Moves on {len(common)} common tests: {after} (baseline {before}, "
+        f"drop {before - after} = {(before - after) / max(before, 1) * 100:.1f}%)"
+    )
 
-    if os.path.isdir(args.tests):
-        tests = glob.glob(os.path.join(args.tests, "*.txt"))
-    else:
-        tests = [args.tests]
 
-    with open(args.output, "w") as fp:
-        fp.write("TEST,ANSWER,TIME\n")
-
-        for test in sorted(tests, key=get_order):
-            print("-" * (DASH_LENGTH // 2) + test + "-" * (DASH_LENGTH // 2))
-
-            print("[INFO] Current map:")
-            map_ = [["." for _ in range(N)] for _ in range(N)]
-            infinity_stone = (-1, -1)
-            captain_marvel = (-1, -1)
-            with open(test, "r") as test_fp:
-                for i, line in enumerate(test_fp):
-                    for j, entity in enumerate(line.split()):
-                        if entity not in ".PSIHTM":
-                            print("[ERROR] Incorrect entity in the map")
-                            exit(1)
-                        if entity == "I":
-                            infinity_stone = (i, j)
-                        elif entity == "M":
-                            captain_marvel = (i, j)
-                        map_[i][j] = entity
-                    print(" ".join(map_[i]))
-
-            prev_cell = (0, 0)
+def report_answers(answers: Dict[str, Optional[int]], expected: Dict[str, int]) -> None:
+    wrong = [test for test, answer in answers.items() if answer is not None and answer != expected[test]]
+    for test in wrong:
+        print(f"[ERROR] Wrong answer on {test}: e {answers[test]} (expected e {expected[test]})")
+    print(f"[INFO] Wrong answers: {len(wrong)} of {len(answers)}")
+
+
+def load_solver(cmd: str) -> Tuple[ModuleType, Namespace]:
+    """Imports the Python solver from the command and parses the arguments given to it.
+
+    Args:
+        cmd (str): Command to execute the solver (e.g. "python3 a_star.py -n 100").
+
+    Returns:
+        Tuple[ModuleType, Namespace]: Module of the solver and its arguments.
+    """
+    words = cmd.split()
+    scripts = [i for i, word in enumerate(words) if word.endswith(".py")]
+    if not scripts:
+        print("[ERROR] In-process mode needs a command running a Python solver")
+        exit(1)
+    script = words[scripts[0]]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    module = importlib.import_module(os.path.splitext(os.path.basename(script))[0])
+    # the solver parses its own command line arguments
+    argv = sys.argv
+    sys.argv = words[scripts[0] :]
+    try:
+        solver_args = module.parse_args()
+    finally:
+        sys.argv = argv
+    return module, solver_args
+
+
+def read_test(test: str, log: List[str]) -> Grid:
+    """Reads the map of the test.
+
+    Args:
+        test (str): Path to the test (a text file or a record of a corpus, see `corpus.list_tests`).
+        log (List[str]): Output of the test to append to.
+
+    Raises:
+        SolverFailed: If the map contains an incorrect entity.
+
+    Returns:
+        Grid: The map.
+    """
+    log.append("[INFO] Current map:")
+    try:
+        n, cells = load_test(test)
+    except ValueError as error:
+        log.append(f"[ERROR] {error}")
+        raise SolverFailed(test)
+    # the size of the map is defined by the test itself
+    grid = Grid(n)
+    grid.cells[:] = cells
+    log.extend(grid.rows())
+    return grid
+
+
+def play_in_process(
+    solver: ModuleType,
+    solver_args: Namespace,
+    interactor: Interactor,
+    log: List[str],
+    telemetry: Optional[Dict[str, float]] = None,
+) -> int:
+    """Runs the imported solver with the interactor instead of the standard streams.
+
+    Args:
+        solver (ModuleType): Module of the solver.
+        solver_args (Namespace): Arguments of the solver.
+        interactor (Interactor): Interactor for the test.
+        log (List[str]): Output of the test to append to.
+        telemetry (Optional[Dict[str, float]]): Counters of the solver to fill (its stderr is captured then).
+
+    Raises:
+        SolverFailed: If the solver crashes, makes an illegal move, or does not answer.
+
+    Returns:
+        int: Answer of the solver (whether it is proven is in `interactor.proven`).
+    """
+    # the size of the map is known from the test, so it does not have to be given in the command
+    kwargs = {**vars(solver_args), "n": interactor.grid.n}
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr) if telemetry is not None else contextlib.nullcontext():
+            solver.main(**kwargs, connection=interactor)
+    except IllegalMove as error:
+        log.extend(illegal_move(error.message, error.curr, error.future))
+        raise SolverFailed() from error
+    except Exception as error:
+        log.append("[ERROR] An exception was raised while running:")
+        log.append("-" * DASH_LENGTH)
+        log.append(traceback.format_exc().rstrip())
+        log.append("-" * DASH_LENGTH)
+        raise SolverFailed() from error
+    if interactor.result is None:
+        log.append("[ERROR] The solution finished without an answer")
+        raise SolverFailed()
+    if telemetry is not None:
+        telemetry.update(decode_telemetry(stderr.getvalue().encode("UTF-8")) or {})
+    return interactor.result
+
+
+async def drain(stream: asyncio.StreamReader, chunks: List[bytes]) -> None:
+    """Reads `stream` until its end, so a solution never blocks on writing into a full pipe.
+
+    Args:
+        stream (asyncio.StreamReader): Stream to read.
+        chunks (List[bytes]): Read data to append to.
+    """
+    while True:
+        chunk = await stream.read(1 << 16)
+        if not chunk:
+            return
+        chunks.append(chunk)
+
+
+class Worker:
+    """
+    Solution running in a subprocess.
+    A new process is started for every test unless the worker is in a session:
+    then the process is kept warm between tests and every test starts with `t n` (the size of the map).
+    The process is restarted after a time limit, since its state is unknown then.
+    """
+
+    def __init__(self, cmd: str, session: bool):
+        """
+        Args:
+            cmd (str): Command to execute the solver.
+            session (bool): Whether the process solves test after test.
+        """
+        self.cmd = cmd
+        self.session = session
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        # stderr of the process during the current test
+        self.stderr: List[bytes] = []
+        self.stderr_task: Optional[asyncio.Future] = None
+
+    async def start(self) -> None:
+        """Starts the process."""
+        self.proc = await asyncio.create_subprocess_exec(
+            *self.cmd.split(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+        )
+        assert self.proc.stderr
+        self.stderr = []
+        self.stderr_task = asyncio.ensure_future(drain(self.proc.stderr, self.stderr))
+
+    async def stop(self, grace_period: float = 0) -> None:
+        """Stops the process.
+
+        Args:
+            grace_period (float): Seconds given to the process to exit by itself after its stdin is closed.
+        """
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        # let the solution exit by itself: killing a process that has just exited races with asyncio
+        if grace_period and proc.returncode is None and proc.stdin:
+            proc.stdin.close()
+            try:
+                await asyncio.wait_for(proc.wait(), grace_period)
+            except asyncio.TimeoutError:
+                pass
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if self.stderr_task:
+            self.stderr_task.cancel()
+
+    async def wait_telemetry(self, telemetry: Dict[str, float]) -> None:
+        """Waits for the counters the solver prints to stderr after the answer.
+        A solver that prints nothing is given `GRACE_PERIOD` seconds (or until its stderr ends).
+
+        Args:
+            telemetry (Dict[str, float]): Counters of the solver to fill.
+        """
+        assert self.stderr_task
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + GRACE_PERIOD
+        while True:
+            counters = decode_telemetry(b"".join(self.stderr))
+            if counters is not None:
+                telemetry.update(counters)
+                return
+            if self.stderr_task.done() or loop.time() >= deadline:
+                return
+            await asyncio.sleep(TELEMETRY_POLL)
+
+    async def play(
+        self,
+        interactor: Interactor,
+        timelimit: float,
+        log: List[str],
+        telemetry: Optional[Dict[str, float]] = None,
+    ) -> Tuple[Optional[int], bool, float]:
+        """Plays the interactor for the solver over the standard streams.
+
+        Args:
+            interactor (Interactor): Interactor for the test.
+            timelimit (float): Seconds after which the solver is stopped (-1 means no time limit).
+            log (List[str]): Output of the test to append to.
+            telemetry (Optional[Dict[str, float]]): Counters of the solver to fill
+                (they are awaited on its stderr after the answer).
+
+        Raises:
+            SolverFailed: If the solver crashes or makes an illegal move.
+
+        Returns:
+            Tuple[Optional[int], bool, float]: Answer of the solver (None if the time limit is exceeded),
+                whether it is proven to be the shortest and the time of the solver in seconds.
+        """
+        grid = interactor.grid
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        deadline = start_time + timelimit if timelimit >= 0 else None
+        if self.proc is None:
+            await self.start()
+        proc = self.proc
+        assert proc and proc.stdin and proc.stdout and self.stderr_task
+        self.stderr.clear()
+
+        answered = False
+        try:
+            infinity_stone = grid.coords(interactor.infinity_stone) if interactor.infinity_stone != -1 else (-1, -1)
+            task = f"{interactor.variant_number}\n{infinity_stone[0]} {infinity_stone[1]}\n"
+            proc.stdin.write((f"t {grid.n}\n" + task if self.session else task).encode("ASCII"))
+
+            while True:
+                try:
+                    await proc.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    # the solution has exited, the reason is reported when its output ends
+                    pass
+                try:
+                    timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                    # the line is parsed as bytes, only unknown output is decoded to be printed
+                    output = (await asyncio.wait_for(proc.stdout.readline(), timeout)).strip()
+                except asyncio.TimeoutError:
+                    return None, False, loop.time() - start_time
+                if not output:
+                    await proc.wait()
+                    await self.stderr_task
+                    log.append("[ERROR] An exception was raised while running:")
+                    log.append("-" * DASH_LENGTH)
+                    log.extend(line.rstrip() for line in b"".join(self.stderr).decode("cp1251").splitlines())
+                    log.append("-" * DASH_LENGTH)
+                    raise SolverFailed()
+                output_splitted = output.split()
+                move_cells = decode_moves(output_splitted)
+                answer = decode_answer(output_splitted) if move_cells is None else None
+                if move_cells is not None:
+                    # every move is validated and answered in order, the answers are sent at once
+                    message = []
+                    for move_cell in move_cells:
+                        try:
+                            reported = interactor.step(move_cell)
+                        except IllegalMove as error:
+                            log.extend(illegal_move(error.message, error.curr, error.future))
+                            raise SolverFailed() from error
+                        message.append(encode_surroundings(grid.n, reported))
+                    proc.stdin.write(b"".join(message))
+                elif answer is not None:
+                    answered = True
+                    elapsed = loop.time() - start_time
+                    if telemetry is not None:
+                        await self.wait_telemetry(telemetry)
+                    return answer[0], answer[1], elapsed
+                else:
+                    log.append(output.decode("UTF-8"))
+                if deadline is not None and loop.time() >= deadline:
+                    return None, False, loop.time() - start_time
+        finally:
+            if not (answered and self.session):
+                await self.stop(GRACE_PERIOD if answered else 0)
+
+
+async def run_subprocesses(
+    args: Namespace,
+    tests: List[str],
+    fp: TextIO,
+    moves: Dict[str, int],
+    answers: Dict[str, Optional[int]],
+    best_effort: List[str],
+) -> None:
+    """Runs the tests with up to `args.jobs` solutions at the same time (a pool of workers).
+    The output and the rows of the csv file are written in the order of the tests,
+    and only `IN_FLIGHT` tests per worker are read ahead.
+
+    Args:
+        args (Namespace): Arguments of the runner.
+        tests (List[str]): Paths to the tests in order.
+        fp (TextIO): The output csv file.
+        moves (Dict[str, int]): Number of moves for every test to fill.
+        answers (Dict[str, Optional[int]]): Answer of the solution for every test to fill
+            (None if the time limit is exceeded or the answer is a best effort one).
+        best_effort (List[str]): Tests with best effort answers to fill.
+    """
+    # idle workers
+    pool: "asyncio.Queue[Worker]" = asyncio.Queue()
+    workers = [Worker(args.cmd, args.session) for _ in range(max(args.jobs, 1))]
+    for worker in workers:
+        pool.put_nowait(worker)
+
+    async def run_test(
+        test: str, variant_number: int, log: List[str], telemetry: Optional[Dict[str, float]]
+    ) -> Tuple[Optional[int], bool, float, int]:
+        grid = read_test(test, log)
+        interactor = Interactor(grid, variant_number)
+        log.append(f"[INFO] Variant number: {variant_number}")
+        log.append("[INFO] Program output:")
+        worker = await pool.get()
+        try:
+            answer, proven, elapsed = await worker.play(interactor, args.timelimit, log, telemetry)
+        finally:
+            pool.put_nowait(worker)
+        return answer, proven, elapsed, interactor.moves
+
+    # tests that are started but not written yet, in order: the test, its log, its telemetry and its task
+    pending: Deque[Tuple[str, List[str], Optional[Dict[str, float]], asyncio.Future]] = collections.deque()
+
+    async def write_next() -> None:
+        test, log, telemetry, task = pending.popleft()
+        try:
+            answer, proven, elapsed, moves[test] = await task
+        except SolverFailed:
+            print_test(test, log, finished=False)
+            exit(1)
+        answers[test] = answer if proven else None
+        if answer is not None and not proven:
+            best_effort.append(test)
+        write_result(fp, test, log, answer, proven, elapsed, moves[test], telemetry)
+        print_test(test, log)
+
+    try:
+        for test in tests:
+            # variants are chosen in the order of the tests, as in the in-process mode
             variant_number = args.variant if args.variant in (1, 2) else randint(1, 2)
+            log: List[str] = []
+            telemetry: Optional[Dict[str, float]] = {} if args.telemetry else None
+            task = asyncio.ensure_future(run_test(test, variant_number, log, telemetry))
+            pending.append((test, log, telemetry, task))
+            if len(pending) >= IN_FLIGHT * len(workers):
+                await write_next()
+        while pending:
+            await write_next()
+    finally:
+        started = [future for _, _, _, future in pending]
+        for future in started:
+            future.cancel()
+        await asyncio.gather(*started, return_exceptions=True)
+        # solutions in a session exit when their stdin is closed
+        await asyncio.gather(*(worker.stop(GRACE_PERIOD) for worker in workers))
+
+
+def write_result(
+    fp: TextIO,
+    test: str,
+    log: List[str],
+    answer: Optional[int],
+    proven: bool,
+    elapsed: float,
+    moves: int,
+    telemetry: Optional[Dict[str, float]] = None,
+) -> None:
+    """Writes the result of the test into the csv file.
+    The PROVEN column is 0 for a best effort answer (the solution ran out of its own time budget
+    and answered with the best path it found) and for an exceeded time limit.
+    The counters that were not reported are left empty.
+
+    Args:
+        fp (TextIO): The output csv file.
+        test (str): Path to the test.
+        log (List[str]): Output of the test to append to.
+        answer (Optional[int]): Answer of the solution (None if the time limit is exceeded).
+        proven (bool): Whether the answer is proven to be the shortest.
+        elapsed (float): Time of the solution in seconds.
+        moves (int): Number of moves.
+        telemetry (Optional[Dict[str, float]]): Counters reported by the solution (no extra columns if None).
+    """
+    columns = "" if telemetry is None else "".join(f",{telemetry.get(key, '')}" for key in TELEMETRY)
+    if answer is None:
+        log.append("[ERROR] Time limit exceeded")
+        fp.write(f"{test},{TIME_LIMIT_EXCEEDED},{float('inf')},{moves},0{columns}\n")
+    elif not proven:
+        log.append(f"[WARNING] Best effort answer: e {answer} (not proven to be the shortest)")
+        fp.write(f"{test},{answer},{elapsed},{moves},0{columns}\n")
+    else:
+        log.append(f"[INFO] Answer: e {answer}")
+        fp.write(f"{test},{answer},{elapsed},{moves},1{columns}\n")
 
-            print("[INFO] Variant number:", variant_number)
-            print("[INFO] Program output:")
-
-            proc = subprocess.Popen(
-                args.cmd.split(),
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            if not proc.stdin or not proc.stdout or not proc.stderr:
-                print("[ERROR] stdin, stdout, or stderr in subprocess.Popen is not assigned to subprocess.PIPE")
-                kill(proc)
-                exit(1)
 
-            start_time = time.time()
+def print_test(test: str, log: List[str], finished: bool = True) -> None:
+    print("-" * (DASH_LENGTH // 2) + test + "-" * (DASH_LENGTH // 2))
+    for line in log:
+        print(line)
+    if finished:
+        print("-" * (DASH_LENGTH + len(test)))
 
-            proc.stdin.write(f"{variant_number}\n".encode("ASCII"))
-            proc.stdin.write(f"{infinity_stone[0]} {infinity_stone[1]}\n".encode("ASCII"))
-            proc.stdin.flush()
 
-            while True:
+def main():
+    args = parse_args()
+    if args.telemetry:
+        args.cmd += " --stats"
+
+    tests = list_tests(args.tests)
+    expected: Dict[str, int] = {}
+    if args.answers:
+        # the oracle behind the cache needs NumPy, so it is imported only to check the answers
+        from answer_cache import AnswerCache
+
+        with AnswerCache() as cache:
+            expected = cache.solve_tests(tests)
+        print(cache.status())
+
+    moves: Dict[str, int] = {}
+    answers: Dict[str, Optional[int]] = {}
+    best_effort: List[str] = []
+    with open(args.output, "w") as fp:
+        header = ["TEST", "ANSWER", "TIME", "MOVES", "PROVEN"]
+        if args.telemetry:
+            header.extend(key.upper() for key in TELEMETRY)
+        fp.write(",".join(header) + "\n")
+
+        if not args.in_process:
+            try:
+                asyncio.run(run_subprocesses(args, tests, fp, moves, answers, best_effort))
+            except KeyboardInterrupt:
+                exit(1)
+        else:
+            solver, solver_args = load_solver(args.cmd)
+            for test in tests:
+                log: List[str] = []
                 try:
-                    output = proc.stdout.readline().decode("UTF-8").strip()
-                    if not output:
-                        print("[ERROR] An exception was raised while running:")
-                        print("-" * DASH_LENGTH)
-                        lines = proc.stderr.readlines()
-                        for line in lines:
-                            print(line.decode("cp1251").rstrip())
-                        print("-" * DASH_LENGTH)
-
-                        kill(proc)
-                        exit(1)
-                    output_splitted = output.split()
-                    if (
-                        len(output_splitted) == 3
-                        and output_splitted[0] == "m"
-                        and output_splitted[1].isdigit()
-                        and output_splitted[2].isdigit()
-                    ):
-                        _, x, y = output.split()
-                        move_cell = (int(x), int(y))
-                        if m_dist(move_cell, prev_cell) > 1:
-                            illegal_move("Can't teleport", prev_cell, move_cell)
-
-                            kill(proc)
-                            exit(1)
-                        elif map_[move_cell[0]][move_cell[1]] in ("M", "H", "T"):
-                            illegal_move("Can't move into a cell with Avengers", prev_cell, move_cell)
-
-                            kill(proc)
-                            exit(1)
-                        elif map_[move_cell[0]][move_cell[1]] == "P":
-                            illegal_move("Can't move into perception zone of Avengers", prev_cell, move_cell)
-
-                            kill(proc)
-                            exit(1)
-                        else:
-                            prev_cell = move_cell
-                        if map_[move_cell[0]][move_cell[1]] == "S":
-                            for i in range(N):
-                                for j in range(N):
-                                    if map_[i][j] == "P":
-                                        map_[i][j] = "."
-                            for i in range(N):
-                                for j in range(N):
-                                    if map_[i][j] != ".":
-                                        continue
-                                    if vonneumann_perception_zone((i, j), captain_marvel, 2):
-                                        map_[i][j] = "P"
-
-                        surroundings = get_surroundings(map_, variant_number, move_cell)
-                        proc.stdin.write(f"{len(surroundings)}\n".encode("ASCII"))
-                        for cell, entity in surroundings:
-                            proc.stdin.write(f"{cell[0]} {cell[1]} {entity}\n".encode("ASCII"))
-                        proc.stdin.flush()
-                    elif (
-                        len(output_splitted) == 2
-                        and output_splitted[0] == "e"
-                        and output_splitted[1].replace("-", "", 1).isdigit()
-                    ):
-                        print("[INFO] Answer:", output)
-                        end_time = time.time()
-                        fp.write(f"{test},{output.split()[1]},{end_time - start_time}\n")
-
-                        kill(proc)
-                        break
-                    else:
-                        print(output)
-                    if args.timelimit >= 0 and time.time() - start_time >= args.timelimit:
-                        print("[ERROR] Time limit exceeded")
-                        fp.write(f"{test},{-2},{float('inf')}\n")
-                        kill(proc)
-                        break
-                except KeyboardInterrupt:
-                    kill(proc)
+                    grid = read_test(test, log)
+                    variant_number = args.variant if args.variant in (1, 2) else randint(1, 2)
+                    interactor = Interactor(grid, variant_number)
+                    log.append(f"[INFO] Variant number: {variant_number}")
+                    log.append("[INFO] Program output:")
+                    telemetry: Optional[Dict[str, float]] = {} if args.telemetry else None
+                    start_time = time.time()
+                    answer: Optional[int] = play_in_process(solver, solver_args, interactor, log, telemetry)
+                except SolverFailed:
+                    print_test(test, log, finished=False)
                     exit(1)
-
-            print("-" * (DASH_LENGTH + len(test)))
+                elapsed = time.time() - start_time
+                moves[test] = interactor.moves
+                # the solver in this process can not be stopped, so its time is checked afterwards
+                if args.timelimit >= 0 and elapsed >= args.timelimit:
+                    answer = None
+                answers[test] = answer if interactor.proven else None
+                if answer is not None and not interactor.proven:
+                    best_effort.append(test)
+                write_result(fp, test, log, answer, interactor.proven, elapsed, moves[test], telemetry)
+                print_test(test, log)
+
+    report_moves(moves, args.baseline)
+    if best_effort:
+        print(f"[INFO] Best effort answers: {len(best_effort)} of {len(tests)}")
+    if args.answers:
+        report_answers(answers, expected)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,10 @@
+from typing import List
+
 import pandas as pd
 
+from answer_cache import AnswerCache
+from run_tests import TIME_LIMIT_EXCEEDED
+
 
 a_star_1 = pd.read_csv("a_star_variant_1.csv")
 a_star_2 = pd.read_csv("a_star_variant_2.csv")
@@ -8,11 +13,27 @@ backtracking_2 = pd.read_csv("backtracking_variant_2.csv")
 
 tests = a_star_1["TEST"]
 
+# only the maps that were not solved before are solved
+with AnswerCache() as cache:
+    expected = cache.solve_tests(tests.tolist())
+print(cache.status())
+
 answers_a_star_1 = a_star_1["ANSWER"].tolist()
 answers_a_star_2 = a_star_2["ANSWER"].tolist()
 answers_backtracking_1 = backtracking_1["ANSWER"].tolist()
 answers_backtracking_2 = backtracking_2["ANSWER"].tolist()
 
+
+def proven_column(run: pd.DataFrame) -> List[bool]:
+    # runs written before the PROVEN column have no best effort answers
+    return run["PROVEN"].astype(bool).tolist() if "PROVEN" in run else [True] * len(run)
+
+
+proven_a_star_1 = proven_column(a_star_1)
+proven_a_star_2 = proven_column(a_star_2)
+proven_backtracking_1 = proven_column(backtracking_1)
+proven_backtracking_2 = proven_column(backtracking_2)
+
 times_a_star_1 = a_star_1["TIME"].tolist()
 times_a_star_2 = a_star_2["TIME"].tolist()
 times_backtracking_1 = backtracking_1["TIME"].tolist()
@@ -29,38 +50,25 @@ for test, time in zip(tests, times_backtracking_1):
     if time >= 3:
         print(test, time)
 
-print("A* variant 1:")
-for t, a in zip(tests, answers_a_star_1):
-    ans = -1
-    with open(f"{'/'.join(t.split('/')[:-1]) + '/answers/' + t.split('/')[-1]}", "r") as fp:
-        ans = int(fp.readline())
-    if ans != a:
-        print(f"\t{t}\t{a}\t{ans}")
-print()
-
-print("A* variant 2:")
-for t, a in zip(tests, answers_a_star_2):
-    ans = -1
-    with open(f"{'/'.join(t.split('/')[:-1]) + '/answers/' + t.split('/')[-1]}", "r") as fp:
-        ans = int(fp.readline())
-    if ans != a:
-        print(f"\t{t}\t{a}\t{ans}")
-print()
-
-print("Backtracking variant 1:")
-for t, a in zip(tests, answers_backtracking_1):
-    ans = -1
-    with open(f"{'/'.join(t.split('/')[:-1]) + '/answers/' + t.split('/')[-1]}", "r") as fp:
-        ans = int(fp.readline())
-    if ans != a:
-        print(f"\t{t}\t{a}\t{ans}")
-print()
-
-print("Backtracking variant 2:")
-for t, a in zip(tests, answers_backtracking_2):
-    ans = -1
-    with open(f"{'/'.join(t.split('/')[:-1]) + '/answers/' + t.split('/')[-1]}", "r") as fp:
-        ans = int(fp.readline())
-    if ans != a:
-        print(f"\t{t}\t{a}\t{ans}")
-print()
+
+def report(name: str, answers: List[int], proven: List[bool]) -> None:
+    """Prints the wrong answers of a run, and the best effort ones (not proven to be the shortest) apart from them."""
+    print(f"{name}:")
+    best_effort = []
+    for t, a, p in zip(tests, answers, proven):
+        ans = expected[t]
+        if not p and a != TIME_LIMIT_EXCEEDED:
+            best_effort.append((t, a, ans))
+        elif ans != a:
+            print(f"\t{t}\t{a}\t{ans}")
+    if best_effort:
+        print("\tbest effort (got / expected):")
+        for t, a, ans in best_effort:
+            print(f"\t\t{t}\t{a}\t{ans}")
+    print()
+
+
+report("A* variant 1", answers_a_star_1, proven_a_star_1)
+report("A* variant 2", answers_a_star_2, proven_a_star_2)
+report("Backtracking variant 1", answers_backtracking_1, proven_backtracking_1)
+report("Backtracking variant 2", answers_backtracking_2, proven_backtracking_2)
@@ -1,9 +1,15 @@
+import os
 import sys
 import pandas as pd
 
+from answer_cache import AnswerCache
+from corpus import is_corpus, read_answer
+from run_tests import TIME_LIMIT_EXCEEDED
 
-if len(sys.argv) != 3:
-    print("Usage: python test_one.py PATH_TO_CSV PATH_TO_ANSWERS")
+
+if len(sys.argv) not in (2, 3):
+    print("Usage: python test_one.py PATH_TO_CSV [PATH_TO_ANSWERS (a directory or a corpus file)]")
+    print("Without PATH_TO_ANSWERS the answers are taken from the answer cache (new maps are solved)")
     exit(1)
 
 
@@ -11,6 +17,8 @@ df = pd.read_csv(sys.argv[1])
 
 tests = df["TEST"]
 answers = df["ANSWER"].tolist()
+# runs written before the PROVEN column have no best effort answers
+proven = df["PROVEN"].astype(bool).tolist() if "PROVEN" in df else [True] * len(df)
 times = df["TIME"].tolist()
 
 print("MAX TIME:", max(times))
@@ -19,11 +27,29 @@ for test, time in zip(tests, times):
     if time >= 3:
         print(test, time)
 
+expected = {}
+if len(sys.argv) == 2:
+    with AnswerCache() as cache:
+        expected = cache.solve_tests(tests.tolist())
+    print(cache.status())
+
 print("ANSWERS:")
-for t, a in zip(tests, answers):
-    ans = -1
-    with open(sys.argv[2] + t.split('/')[-1], "r") as fp:
-        ans = int(fp.readline())
-    if ans != a:
+best_effort = []
+for t, a, p in zip(tests, answers, proven):
+    if t in expected:
+        ans = expected[t]
+    elif is_corpus(sys.argv[2]):
+        ans = read_answer(os.path.join(sys.argv[2], t.split("/")[-1]))
+    else:
+        with open(sys.argv[2] + t.split("/")[-1], "r") as fp:
+            ans = int(fp.readline())
+    # answers not proven to be the shortest are listed apart from the wrong ones
+    if not p and a != TIME_LIMIT_EXCEEDED:
+        best_effort.append((t, a, ans))
+    elif ans != a:
+        print(f"\t{t}\t{a}\t{ans}")
+if best_effort:
+    print("BEST EFFORT (got / expected):")
+    for t, a, ans in best_effort:
         print(f"\t{t}\t{a}\t{ans}")
 print()